@@ -3,6 +3,7 @@ Baby Development Timeline - Main Application
 A digital family photo album to document baby's growth with photos and measurements.
 """
 
+import calendar
 import streamlit as st
 from datetime import datetime
 from src.auth import (
@@ -13,8 +14,29 @@ from src.auth import (
     get_supabase_client,
     init_supabase
 )
-from src.sharing import validate_share_token
-from src.ui_helpers import load_css
+from src.sharing import (
+    validate_share_token,
+    resume_viewer_session,
+    start_viewer_session,
+    end_viewer_session
+)
+from src.storage import get_display_image
+from src.upload_queue import upload_queue, JOB_PROCESSING
+from src.database import (
+    get_timeline_page,
+    get_timeline_month,
+    get_timeline_month_index,
+    get_babies,
+    get_baby_info,
+    create_baby_profile
+)
+from src.constants import (
+    TIMELINE_PHOTO_DISPLAY_WIDTH,
+    UPLOAD_STATUS_REFRESH_SECONDS,
+    VIEWER_SESSION_QUERY_PARAM,
+    SESSION_VIEWER_CREDENTIAL
+)
+from src.ui_helpers import load_css, render_progressive_image
 
 # ============================================================================
 # Page Configuration (MUST be first Streamlit command)
@@ -140,76 +162,59 @@ def show_sidebar():
             logout()
 
 
-def show_timeline():
-    """Display main timeline view with photos and measurements"""
+@st.fragment(run_every=UPLOAD_STATUS_REFRESH_SECONDS)
+def render_upload_placeholders(baby_id: str) -> None:
+    """
+    Show placeholder cards for photos still in the background upload queue.
 
-    st.title("👶 Baby Development Timeline")
+    Polls the in-memory queue every UPLOAD_STATUS_REFRESH_SECONDS; when a
+    photo finishes, the whole page reruns so the feed picks it up.
+    """
+    jobs = upload_queue.active_jobs(baby_id)
 
-    try:
-        supabase = get_supabase_client()
+    in_flight_before = st.session_state.get("timeline_uploads_in_flight", 0)
+    st.session_state["timeline_uploads_in_flight"] = len(jobs)
+    if len(jobs) < in_flight_before:
+        st.rerun()
 
-        # ========================================================================
-        # Step 1: Check if baby profile exists (MVP: single baby support)
-        # ========================================================================
-        babies = supabase.table("babies").select("*").execute()
+    if jobs:
+        st.caption(f"📤 {len(jobs)} photo{'s' if len(jobs) != 1 else ''} uploading...")
 
-        if not babies.data:
-            # No baby profile yet - show setup prompt
-            st.warning("👋 **Welcome!** Let's set up your baby's profile first.")
+    for job in jobs:
+        with st.container():
+            col_img, col_info = st.columns([1, 3])
 
-            with st.form("create_baby_profile"):
-                st.markdown("### Create Baby Profile")
+            with col_img:
+                st.markdown("### ⏳" if job.state != JOB_PROCESSING else "### ⚙️")
 
-                col1, col2 = st.columns(2)
-                with col1:
-                    baby_name = st.text_input(
-                        "Baby's Name",
-                        placeholder="e.g., Emma",
-                        help="First name or nickname"
-                    )
-                with col2:
-                    birthdate = st.date_input(
-                        "Birthdate",
-                        value=datetime.now(),
-                        max_value=datetime.now(),
-                        help="When was your baby born?"
-                    )
+            with col_info:
+                st.markdown(f"**📅 {job.photo_date.strftime('%Y-%m-%d')}**")
+                st.caption(f"{job.filename} — {job.message}")
 
-                submitted = st.form_submit_button("✨ Create Profile", use_container_width=True)
+            st.divider()
 
-                if submitted:
-                    if not baby_name:
-                        st.error("❌ Please enter a name")
-                    else:
-                        try:
-                            from src.auth import get_user_id
-
-                            # Insert baby profile
-                            supabase.table("babies").insert({
-                                "name": baby_name,
-                                "birthdate": str(birthdate),
-                                "created_by": get_user_id()
-                            }).execute()
 
-                            st.success(f"✅ Profile created for {baby_name}!")
-                            st.balloons()
-                            st.rerun()
+@st.fragment
+def render_timeline_feed(supabase, baby_id: str, baby_name: str) -> None:
+    """
+    Render the sort/filter controls and the timeline cards.
 
-                        except Exception as e:
-                            st.error(f"❌ Error creating profile: {str(e)}")
-
-            st.stop()
-
-        # Get baby info
-        baby = babies.data[0]
-        baby_id = baby["baby_id"]
-        baby_name = baby["name"]
+    Runs as a fragment, so changing sort/filter or clicking "Load more"
+    re-executes only this region. Pages come from the query cache and URLs
+    from the signed-URL cache; only the first visit to a view (or a newly
+    loaded page) queries the database.
 
+    Args:
+        supabase: Supabase client
+        baby_id: UUID of the baby
+        baby_name: Name used in headings and alt text
+    """
+    try:
         # ========================================================================
         # Step 2: Fetch photos and measurements for timeline
         # ========================================================================
 
-        col1, col2, col3 = st.columns([2, 1, 1])
+        col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
         with col1:
             st.markdown(f"### {baby_name}'s Timeline")
         with col2:
@@ -226,52 +231,79 @@ def show_timeline():
                 label_visibility="collapsed"
             )
 
-        # Fetch data
-        with st.spinner("Loading timeline..."):
-            photos_response = supabase.table("photos") \
-                .select("*") \
-                .eq("baby_id", baby_id) \
-                .order("photo_date", desc=True) \
-                .limit(50) \
-                .execute()
-
-            measurements_response = supabase.table("measurements") \
-                .select("*") \
-                .eq("baby_id", baby_id) \
-                .order("measurement_date", desc=True) \
-                .limit(50) \
-                .execute()
-
-            photos = photos_response.data if photos_response.data else []
-            measurements = measurements_response.data if measurements_response.data else []
+        newest_first = (sort_order == "Newest First")
+        item_types = {
+            "All": ("photo", "measurement"),
+            "Photos Only": ("photo",),
+            "Measurements Only": ("measurement",)
+        }[filter_option]
+
+        # Jump-to-month picker, built from the cached per-month counts
+        month_counts = {
+            (entry["year"], entry["month"]): entry
+            for entry in reversed(get_timeline_month_index(supabase, baby_id))
+            if ("photo" in item_types and entry["photo_count"])
+            or ("measurement" in item_types and entry["measurement_count"])
+        }
+
+        def format_month(key):
+            if key is None:
+                return "All months"
+            entry = month_counts[key]
+            counts = []
+            if "photo" in item_types and entry["photo_count"]:
+                counts.append(f"{entry['photo_count']} 📸")
+            if "measurement" in item_types and entry["measurement_count"]:
+                counts.append(f"{entry['measurement_count']} 📏")
+            return f"{calendar.month_name[key[1]]} {key[0]} ({', '.join(counts)})"
+
+        with col4:
+            jump_month = st.selectbox(
+                "Month",
+                [None] + list(month_counts),
+                format_func=format_month,
+                label_visibility="collapsed",
+                key="timeline_jump_month"
+            )
+
+        # Each "Load more" click appends a cursor; changing sort/filter resets
+        view_key = (baby_id, newest_first, item_types)
+        if st.session_state.get("timeline_view") != view_key:
+            st.session_state["timeline_view"] = view_key
+            st.session_state["timeline_page_cursors"] = [None]
 
         # ========================================================================
-        # Step 3: Combine and sort timeline items
+        # Step 3: Fetch timeline pages (keyset-paginated, merged by date)
         # ========================================================================
 
         timeline_items = []
+        next_cursor = None
+
+        with st.spinner("Loading timeline..."):
+            if jump_month is not None:
+                # One date-bounded window; the months in between are never read
+                timeline_items = get_timeline_month(
+                    supabase,
+                    baby_id,
+                    *jump_month,
+                    newest_first=newest_first,
+                    item_types=item_types,
+                    columns="timeline_card"
+                )
+            else:
+                for cursor in st.session_state["timeline_page_cursors"]:
+                    page_items, next_cursor = get_timeline_page(
+                        supabase,
+                        baby_id,
+                        cursor=cursor,
+                        newest_first=newest_first,
+                        item_types=item_types,
+                        columns="timeline_card"
+                    )
+                    timeline_items.extend(page_items)
 
-        # Add photos
-        if filter_option in ["All", "Photos Only"]:
-            for photo in photos:
-                timeline_items.append({
-                    "type": "photo",
-                    "date": photo["photo_date"],
-                    "data": photo
-                })
-
-        # Add measurements
-        if filter_option in ["All", "Measurements Only"]:
-            for measurement in measurements:
-                timeline_items.append({
-                    "type": "measurement",
-                    "date": measurement["measurement_date"],
-                    "data": measurement
-                })
-
-        # Sort by date based on user preference
-        reverse_sort = (sort_order == "Newest First")
-        timeline_items.sort(key=lambda x: x["date"], reverse=reverse_sort)
+                    if next_cursor is None:
+                        break
 
         # ========================================================================
         # Step 4: Display timeline
@@ -307,15 +339,19 @@ def show_timeline():
                                 if photo_data.get("caption"):
                                     alt_text += f": {photo_data['caption']}"
 
-                                st.image(
-                                    photo_data["file_url"],
-                                    caption=alt_text,
-                                    use_container_width=True
+                                image = get_display_image(photo_data, TIMELINE_PHOTO_DISPLAY_WIDTH)
+                                render_progressive_image(
+                                    image["url"],
+                                    photo_data.get("placeholder"),
+                                    image["width"],
+                                    image["height"],
+                                    alt_text,
+                                    image["sources"]
                                 )
                             except Exception as e:
                                 st.error(f"Could not load image")
                                 with st.expander("Debug info"):
-                                    st.write(f"URL: {photo_data['file_url']}")
+                                    st.write(f"Path: {photo_data.get('storage_path')}")
                                     st.write(f"Error: {str(e)}")
 
                         with col_info:
@@ -363,6 +399,91 @@ def show_timeline():
 
                         st.divider()
 
+            # Older (or newer) entries are fetched one page at a time
+            if next_cursor is not None:
+                if st.button("⬇️ Load more", use_container_width=True, key="timeline_load_more"):
+                    st.session_state["timeline_page_cursors"].append(next_cursor)
+                    st.rerun(scope="fragment")
+
+    except Exception as e:
+        st.error(f"❌ Error loading timeline: {str(e)}")
+        st.exception(e)  # Show full stack trace in development
+
+
+def show_timeline():
+    """Display main timeline view with photos and measurements"""
+
+    st.title("👶 Baby Development Timeline")
+
+    try:
+        supabase = get_supabase_client()
+
+        # ========================================================================
+        # Step 1: Check if baby profile exists (MVP: single baby support)
+        # ========================================================================
+        babies = get_babies(supabase)
+
+        if not babies:
+            # No baby profile yet - show setup prompt
+            st.warning("👋 **Welcome!** Let's set up your baby's profile first.")
+
+            with st.form("create_baby_profile"):
+                st.markdown("### Create Baby Profile")
+
+                col1, col2 = st.columns(2)
+                with col1:
+                    baby_name = st.text_input(
+                        "Baby's Name",
+                        placeholder="e.g., Emma",
+                        help="First name or nickname"
+                    )
+                with col2:
+                    birthdate = st.date_input(
+                        "Birthdate",
+                        value=datetime.now(),
+                        max_value=datetime.now(),
+                        help="When was your baby born?"
+                    )
+
+                submitted = st.form_submit_button("✨ Create Profile", use_container_width=True)
+
+                if submitted:
+                    if not baby_name:
+                        st.error("❌ Please enter a name")
+                    else:
+                        from src.auth import get_user_id
+
+                        # Insert baby profile
+                        success, message, _ = create_baby_profile(
+                            supabase, baby_name, birthdate, get_user_id()
+                        )
+
+                        if success:
+                            st.success(message)
+                            st.balloons()
+                            st.rerun()
+                        else:
+                            st.error(message)
+
+            st.stop()
+
+        # Get baby info
+        baby = babies[0]
+        baby_id = baby["baby_id"]
+        baby_name = baby["name"]
+
+        # ========================================================================
+        # Steps 2-4: Controls and timeline feed (fragment)
+        # ========================================================================
+
+        # Placeholders for photos still uploading (admin only)
+        if not st.session_state.get("viewer_mode") and upload_queue.active_jobs(baby_id):
+            render_upload_placeholders(baby_id)
+        else:
+            st.session_state.pop("timeline_uploads_in_flight", None)
+
+        render_timeline_feed(supabase, baby_id, baby_name)
+
     except ValueError as e:
         # Environment not configured
         st.error(str(e))
@@ -403,10 +524,8 @@ def show_viewer_login(share_token: str):
                         is_valid, result = validate_share_token(supabase, share_token, password)
 
                     if is_valid:
-                        # Store validated session
-                        st.session_state["viewer_authenticated"] = True
-                        st.session_state["viewer_baby_id"] = result
-                        st.session_state["viewer_mode"] = True
+                        # Store validated session (signed, so bcrypt runs once)
+                        start_viewer_session(share_token, result)
                         st.success("✅ Access granted!")
                         st.balloons()
                         import time
@@ -445,9 +564,7 @@ def show_viewer_sidebar(baby_name: str):
         # Exit viewer mode
         if st.button("🚪 Exit Viewer Mode", use_container_width=True, type="secondary"):
             # Clear viewer session
-            for key in ["viewer_authenticated", "viewer_baby_id", "viewer_mode"]:
-                if key in st.session_state:
-                    del st.session_state[key]
+            end_viewer_session()
             st.rerun()
 
 
@@ -462,24 +579,35 @@ def main():
 
     if share_token:
         # ==================== Viewer Mode ====================
-        # Check if already validated
-        if st.session_state.get("viewer_authenticated") and \
-           st.session_state.get("viewer_baby_id"):
-            # Viewer is authenticated - show read-only timeline
-            baby_id = st.session_state["viewer_baby_id"]
+        supabase = init_supabase()
 
-            try:
-                supabase = init_supabase()
+        # Links copied before credentials were kept server-side may still
+        # carry one; never honour it, just drop it from the URL
+        if VIEWER_SESSION_QUERY_PARAM in query_params:
+            del query_params[VIEWER_SESSION_QUERY_PARAM]
+
+        # Check if already validated: a signed credential from this session
+        # skips bcrypt (HMAC + cached revocation check only)
+        credential = st.session_state.get(SESSION_VIEWER_CREDENTIAL)
+        baby_id = resume_viewer_session(supabase, share_token, credential)
+
+        if baby_id:
+            start_viewer_session(share_token, baby_id, credential)
+        elif credential:
+            # Expired credential or revoked link - validate from scratch
+            end_viewer_session()
 
+        if baby_id:
+            # Viewer is authenticated - show read-only timeline
+            try:
                 # Fetch baby info
-                baby_result = supabase.table("babies").select("*").eq("baby_id", baby_id).execute()
+                baby = get_baby_info(supabase, baby_id)
 
-                if not baby_result.data:
+                if not baby:
                     st.error("❌ Timeline not found or access has been revoked")
                     st.info("The share link may have been deactivated by the family. Please ask for a new link.")
                     st.stop()
 
-                baby = baby_result.data[0]
                 baby_name = baby["name"]
 
                 # Show viewer sidebar and timeline (read-only)
@@ -496,14 +624,11 @@ def main():
         else:
             # Token exists but not validated yet
             # Check if password is required
-            supabase = init_supabase()
             is_valid, result = validate_share_token(supabase, share_token, password=None)
 
             if is_valid:
                 # No password required - grant access
-                st.session_state["viewer_authenticated"] = True
-                st.session_state["viewer_baby_id"] = result
-                st.session_state["viewer_mode"] = True
+                start_viewer_session(share_token, result)
                 st.rerun()
             elif result == "password_required":
                 # Password required - show password form
@@ -0,0 +1,9 @@
+"""
+Benchmarks for Baby Timeline
+Offline performance suite running against the local SQLite backend.
+
+Usage:
+    python -m benchmarks.run --scale small --output benchmarks/results/latest.json
+    python -m benchmarks.run --baseline benchmarks/results/baseline.json
+    python -m benchmarks.compare baseline.json latest.json
+"""
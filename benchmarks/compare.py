@@ -0,0 +1,99 @@
+"""
+Benchmark Comparison
+Flags scenarios whose median time regressed against a stored baseline.
+
+Usage:
+    python -m benchmarks.compare baseline.json latest.json --threshold 0.15
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List
+
+# A scenario regresses when its median is this much slower than the baseline
+DEFAULT_THRESHOLD = 0.15
+
+# Ignore differences below this (timer noise on very fast scenarios)
+MIN_ABSOLUTE_DELTA_MS = 0.5
+
+
+def load_results(path: str) -> Dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """
+    Compare two result files scenario by scenario.
+
+    Args:
+        baseline: Parsed baseline JSON
+        current: Parsed JSON of the run under test
+        threshold: Allowed relative slowdown of the median (0.15 = 15%)
+
+    Returns:
+        One dict per scenario present in both files:
+        {"scenario", "baseline_ms", "current_ms", "change", "status"}
+        where status is "regression", "improvement" or "ok"
+    """
+    rows = []
+    for name, current_stats in current["scenarios"].items():
+        baseline_stats = baseline["scenarios"].get(name)
+        if baseline_stats is None:
+            continue
+
+        before, after = baseline_stats["median_ms"], current_stats["median_ms"]
+        change = (after - before) / before if before else 0.0
+
+        status = "ok"
+        if abs(after - before) >= MIN_ABSOLUTE_DELTA_MS:
+            if change > threshold:
+                status = "regression"
+            elif change < -threshold:
+                status = "improvement"
+
+        rows.append({
+            "scenario": name,
+            "baseline_ms": before,
+            "current_ms": after,
+            "change": change,
+            "status": status
+        })
+
+    return rows
+
+
+def print_comparison(rows: List[Dict]) -> None:
+    icons = {"regression": "❌", "improvement": "🚀", "ok": "✅"}
+
+    print(f"{'':3}{'scenario':36}{'baseline':>12}{'current':>12}{'change':>10}")
+    for row in rows:
+        print(
+            f"{icons[row['status']]:3}{row['scenario']:36}"
+            f"{row['baseline_ms']:>10.2f}ms{row['current_ms']:>10.2f}ms{row['change']:>+10.1%}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline", help="Baseline results JSON")
+    parser.add_argument("current", help="Results JSON to check")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed relative slowdown (default {DEFAULT_THRESHOLD})")
+    args = parser.parse_args()
+
+    rows = compare_results(load_results(args.baseline), load_results(args.current), args.threshold)
+    print_comparison(rows)
+
+    regressions = [r for r in rows if r["status"] == "regression"]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+
+    print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
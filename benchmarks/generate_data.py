@@ -0,0 +1,240 @@
+"""
+Synthetic Family History Generator
+Fills a local backend with babies, years of measurements and thousands of
+photos (with real JPEG files of realistic size) for benchmarking.
+"""
+
+import math
+import os
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import bcrypt
+import numpy as np
+from PIL import Image
+
+from src.constants import DEFAULT_MAX_IMAGE_WIDTH, THUMBNAIL_SIZES
+from src.storage import get_derivative_path, get_variant_path, generate_derivatives, optimize_image
+
+# Camera-sized source image (12 MP phone photo)
+CAMERA_WIDTH = 4032
+CAMERA_HEIGHT = 3024
+
+# Rows per bulk insert
+INSERT_CHUNK_SIZE = 500
+
+# Distinct stored images; every photo row hard-links one of these
+POOL_SIZE = 8
+
+# Password of the protected share links (hashed like generate_share_link does)
+BENCH_PASSWORD = "grandma-2025"
+
+
+@dataclass(frozen=True)
+class Scale:
+    babies: int
+    years: int
+    photos_per_baby: int
+
+
+SCALES = {
+    "small": Scale(babies=3, years=2, photos_per_baby=300),
+    "medium": Scale(babies=10, years=3, photos_per_baby=1000),
+    "large": Scale(babies=25, years=5, photos_per_baby=3000)
+}
+
+
+def make_camera_jpeg(seed: int, orientation: int = 6, taken: datetime = datetime(2025, 6, 1, 10, 30)) -> bytes:
+    """
+    Render a camera-sized JPEG with EXIF date and orientation.
+
+    Smooth gradients plus sensor-like noise compress to roughly the size
+    of a real phone photo (a few MB at quality 92).
+    """
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:CAMERA_HEIGHT, 0:CAMERA_WIDTH].astype(np.float32)
+
+    channels = []
+    for phase in rng.uniform(0, 2 * math.pi, 3):
+        channel = 128 + 90 * np.sin(x / 400 + phase) * np.cos(y / 300 - phase)
+        channel += rng.normal(0, 6, channel.shape)
+        channels.append(np.clip(channel, 0, 255).astype(np.uint8))
+
+    img = Image.fromarray(np.stack(channels, axis=-1), "RGB")
+
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    exif.get_ifd(0x8769)[0x9003] = taken.strftime("%Y:%m:%d %H:%M:%S")
+
+    buffer = BytesIO()
+    img.save(buffer, format="JPEG", quality=92, exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+def _expected_growth(age_days: int) -> Tuple[float, float]:
+    """Rough median weight (kg) and length (cm) for an age."""
+    months = age_days / 30.4375
+    weight = 3.3 + 6.0 * (1 - math.exp(-months / 6)) + 0.12 * months
+    height = 50.0 + 24.0 * (1 - math.exp(-months / 8)) + 0.6 * months
+    return weight, height
+
+
+def _measurement_days(total_days: int) -> List[int]:
+    """Weekly for 3 months, fortnightly to 1 year, monthly after."""
+    days, day = [], 0
+    while day <= total_days:
+        days.append(day)
+        day += 7 if day < 91 else 14 if day < 365 else 30
+    return days
+
+
+def _build_pool(storage_root: Path, rng: random.Random) -> List[Tuple[str, dict]]:
+    """Write POOL_SIZE optimized photos (+ derivatives) to storage/_pool."""
+    pool_dir = storage_root / "baby-photos" / "_pool"
+    pool_dir.mkdir(parents=True, exist_ok=True)
+
+    pool = []
+    for index in range(POOL_SIZE):
+        source = BytesIO(make_camera_jpeg(seed=rng.randint(0, 2 ** 31), orientation=1))
+        source.name = f"pool_{index}.jpg"
+        optimized, metadata = optimize_image(source, max_width=DEFAULT_MAX_IMAGE_WIDTH)
+
+        pool_path = f"_pool/pool_{index}.jpg"
+        (storage_root / "baby-photos" / pool_path).write_bytes(optimized.getvalue())
+
+        derivatives = {}
+        for size_name, (d_buffer, d_meta, variants) in generate_derivatives(optimized, THUMBNAIL_SIZES).items():
+            d_path = get_derivative_path(pool_path, size_name)
+            (storage_root / "baby-photos" / d_path).write_bytes(d_buffer.getvalue())
+            for fmt, variant_bytes in variants.items():
+                (storage_root / "baby-photos" / get_variant_path(d_path, fmt)).write_bytes(variant_bytes)
+            derivatives[size_name] = d_meta
+
+        metadata["derivatives"] = derivatives
+        pool.append((pool_path, metadata))
+
+    return pool
+
+
+def _link(storage_root: Path, source: str, target: str) -> None:
+    """Hard-link a pool file to a photo path (real file, no extra disk)."""
+    bucket = storage_root / "baby-photos"
+    destination = bucket / target
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if not destination.exists():
+        os.link(bucket / source, destination)
+
+
+def _insert_chunks(supabase, table: str, rows: List[Dict]) -> List[Dict]:
+    inserted = []
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        inserted += supabase.table(table).insert(rows[start:start + INSERT_CHUNK_SIZE]).execute().data
+    return inserted
+
+
+def generate_family_history(supabase, scale: Scale, seed: int = 42) -> Dict[str, List[str]]:
+    """
+    Populate a LocalClient with synthetic family data.
+
+    Args:
+        supabase: LocalClient (its storage root receives the photo files)
+        scale: How many babies, years and photos to create
+        seed: Random seed (same seed = same dataset)
+
+    Returns:
+        {"baby_ids": [...], "share_tokens": [...], "password_tokens": [...]}
+
+    Example:
+        client = LocalClient(None)
+        ids = generate_family_history(client, SCALES["small"])
+    """
+    rng = random.Random(seed)
+    storage_root = supabase.storage.root
+    pool = _build_pool(storage_root, rng)
+
+    today = date.today()
+    babies = _insert_chunks(supabase, "babies", [
+        {
+            "name": f"Baby {index + 1}",
+            "birthdate": (today - timedelta(days=scale.years * 365 + rng.randint(0, 60))).isoformat(),
+            "created_by": None
+        }
+        for index in range(scale.babies)
+    ])
+
+    share_tokens, password_tokens = [], []
+    password_hash = bcrypt.hashpw(BENCH_PASSWORD.encode(), bcrypt.gensalt()).decode()
+
+    for baby in babies:
+        baby_id = baby["baby_id"]
+        birthdate = date.fromisoformat(baby["birthdate"])
+        total_days = (today - birthdate).days
+
+        # Measurements along a noisy growth curve
+        measurements = []
+        for day in _measurement_days(total_days):
+            weight, height = _expected_growth(day)
+            measurements.append({
+                "baby_id": baby_id,
+                "measurement_date": (birthdate + timedelta(days=day)).isoformat(),
+                "weight_kg": round(weight * rng.uniform(0.93, 1.07), 2),
+                "height_cm": round(height * rng.uniform(0.97, 1.03), 1) if rng.random() < 0.8 else None,
+                "notes": rng.choice([None, None, "Checkup", "Measured at home"])
+            })
+        _insert_chunks(supabase, "measurements", measurements)
+
+        # Photos spread across the baby's life
+        photos = []
+        for index in range(scale.photos_per_baby):
+            photo_date = birthdate + timedelta(days=rng.randint(0, total_days))
+            pool_path, metadata = pool[rng.randrange(POOL_SIZE)]
+            path = f"{baby_id}/{photo_date:%Y/%m}/{photo_date:%Y%m%d}_{index:05d}.jpg"
+
+            _link(storage_root, pool_path, path)
+            derivatives = {}
+            for size_name, d_meta in metadata["derivatives"].items():
+                d_path = get_derivative_path(path, size_name)
+                pool_d_path = get_derivative_path(pool_path, size_name)
+                _link(storage_root, pool_d_path, d_path)
+
+                variants = {}
+                for fmt, v_meta in d_meta["variants"].items():
+                    v_path = get_variant_path(d_path, fmt)
+                    _link(storage_root, get_variant_path(pool_d_path, fmt), v_path)
+                    variants[fmt] = {**v_meta, "path": v_path}
+                derivatives[size_name] = {**d_meta, "path": d_path, "variants": variants}
+
+            photos.append({
+                "baby_id": baby_id,
+                "storage_path": path,
+                "caption": rng.choice([None, "First smile", "Bath time", "Park"]),
+                "photo_date": photo_date.isoformat(),
+                "exif_data": {**metadata, "derivatives": derivatives}
+            })
+        _insert_chunks(supabase, "photos", photos)
+
+        # One open link and one password-protected link
+        open_token = f"bench-{baby_id}"
+        protected_token = f"bench-pw-{baby_id}"
+        _insert_chunks(supabase, "share_links", [
+            {"baby_id": baby_id, "share_token": open_token, "is_active": True},
+            {
+                "baby_id": baby_id,
+                "share_token": protected_token,
+                "password_hash": password_hash,
+                "is_active": True
+            }
+        ])
+        share_tokens.append(open_token)
+        password_tokens.append(protected_token)
+
+    return {
+        "baby_ids": [baby["baby_id"] for baby in babies],
+        "share_tokens": share_tokens,
+        "password_tokens": password_tokens
+    }
+
@@ -0,0 +1,147 @@
+"""
+Benchmark Runner
+Generates a synthetic dataset in a local backend, times every scenario and
+writes machine-readable JSON results.
+
+Usage:
+    python -m benchmarks.run                                   # small scale, print only
+    python -m benchmarks.run --scale medium --output results.json
+    python -m benchmarks.run --baseline baseline.json          # exit 1 on regression
+    python -m benchmarks.run --only timeline_assembly --repeat-scale 3
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+from benchmarks.compare import DEFAULT_THRESHOLD, compare_results, load_results, print_comparison
+from benchmarks.generate_data import SCALES, generate_family_history
+from benchmarks.scenarios import SCENARIOS
+from src.local_backend import LocalClient
+
+
+def time_callable(func: Callable[[], None], repeats: int, warmup: int = 1) -> Dict[str, float]:
+    """
+    Time a callable with perf_counter.
+
+    Returns:
+        Dict with runs, min_ms, median_ms, mean_ms, p95_ms and stdev_ms
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    return {
+        "runs": repeats,
+        "min_ms": samples[0],
+        "median_ms": statistics.median(samples),
+        "mean_ms": statistics.fmean(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        "stdev_ms": statistics.stdev(samples) if len(samples) > 1 else 0.0
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def run_benchmarks(scale_name: str, only: List[str], repeat_scale: float, seed: int, data_dir: str) -> Dict:
+    """
+    Build the dataset and run the selected scenarios.
+
+    Returns:
+        Results dict ready to be written as JSON
+    """
+    scale = SCALES[scale_name]
+    supabase = LocalClient(data_dir)
+
+    print(f"🧪 Generating {scale_name} dataset: {scale.babies} babies, "
+          f"{scale.years} years, {scale.photos_per_baby} photos each...")
+    started = time.perf_counter()
+    context = generate_family_history(supabase, scale, seed=seed)
+    context["supabase"] = supabase
+    print(f"   Done in {time.perf_counter() - started:.1f}s\n")
+
+    results = {}
+    for name, (factory, repeats) in SCENARIOS.items():
+        if only and name not in only:
+            continue
+
+        run = factory(context)
+        stats = time_callable(run, max(1, int(repeats * repeat_scale)))
+        results[name] = stats
+        print(f"⏱️  {name:36} median {stats['median_ms']:9.2f}ms  p95 {stats['p95_ms']:9.2f}ms")
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scale": scale_name,
+            "seed": seed
+        },
+        "scenarios": results
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the Baby Timeline benchmark suite offline.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--only", nargs="*", default=[], choices=list(SCENARIOS),
+                        help="Run only these scenarios")
+    parser.add_argument("--repeat-scale", type=float, default=1.0,
+                        help="Multiply every scenario's repeat count")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results JSON to this path")
+    parser.add_argument("--baseline", help="Compare against this results JSON (exit 1 on regression)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="baby-timeline-bench-") as data_dir:
+        results = run_benchmarks(args.scale, args.only, args.repeat_scale, args.seed, data_dir)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.baseline:
+        baseline = load_results(args.baseline)
+        if baseline["meta"].get("scale") != results["meta"]["scale"]:
+            print(f"\n⚠️  Baseline scale '{baseline['meta'].get('scale')}' differs from this run")
+
+        print()
+        rows = compare_results(baseline, results, args.threshold)
+        print_comparison(rows)
+        if any(r["status"] == "regression" for r in rows):
+            print(f"\n❌ Regressions above {args.threshold:.0%} - see table above")
+            return 1
+        print("\n✅ No regressions")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
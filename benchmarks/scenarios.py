@@ -0,0 +1,153 @@
+"""
+Benchmark Scenarios
+Each scenario prepares its inputs once and returns the callable to time.
+"""
+
+from datetime import datetime
+from io import BytesIO
+from typing import Callable, Dict, List
+
+from benchmarks.generate_data import BENCH_PASSWORD, make_camera_jpeg
+from src.cache import query_cache
+from src.database import get_baby_info, get_growth_statistics, get_measurements, get_timeline_page
+from src.growth_standards import add_percentiles, build_growth_dataframe, percentile_curves
+from src.sharing import validate_share_token
+from src.signed_urls import signed_url_cache
+from src.storage import extract_exif_date, optimize_image
+
+# Pages fetched by the timeline scenario (first page + "Load more" clicks)
+TIMELINE_PAGES = 5
+
+
+class UploadedBytes(BytesIO):
+    """Minimal stand-in for Streamlit's UploadedFile."""
+
+    def __init__(self, data: bytes, name: str = "IMG_0001.jpg"):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+def _clear_caches() -> None:
+    """Cold-start every run: no cached queries or signed URLs."""
+    query_cache.clear()
+    signed_url_cache.clear()
+
+
+def scenario_optimize_image(context: Dict) -> Callable[[], None]:
+    """Decode, orient, resize and re-encode one 12 MP camera photo."""
+    data = make_camera_jpeg(seed=1)
+
+    def run():
+        optimize_image(UploadedBytes(data))
+
+    return run
+
+
+def scenario_extract_exif_date(context: Dict) -> Callable[[], None]:
+    """Read DateTimeOriginal from a 12 MP camera photo."""
+    data = make_camera_jpeg(seed=2)
+
+    def run():
+        assert extract_exif_date(UploadedBytes(data)) is not None
+
+    return run
+
+
+def scenario_timeline_assembly(context: Dict) -> Callable[[], None]:
+    """
+    Data work behind show_timeline(): first page plus "Load more" pages,
+    merged photos + measurements with signed URLs (cold caches).
+    """
+    supabase, baby_id = context["supabase"], context["baby_ids"][0]
+
+    def run():
+        _clear_caches()
+        cursor = None
+        for _ in range(TIMELINE_PAGES):
+            items, cursor = get_timeline_page(supabase, baby_id, cursor=cursor)
+            if cursor is None:
+                break
+
+    return run
+
+
+def scenario_timeline_assembly_warm(context: Dict) -> Callable[[], None]:
+    """Same pages as timeline_assembly, served from the warm caches (a rerun)."""
+    supabase, baby_id = context["supabase"], context["baby_ids"][0]
+
+    def run():
+        cursor = None
+        for _ in range(TIMELINE_PAGES):
+            items, cursor = get_timeline_page(supabase, baby_id, cursor=cursor)
+            if cursor is None:
+                break
+
+    return run
+
+
+def scenario_growth_chart_dataframe(context: Dict) -> Callable[[], None]:
+    """Growth Chart page prep: fetch, DataFrame, WHO percentiles and bands."""
+    supabase, baby_id = context["supabase"], context["baby_ids"][0]
+
+    def run():
+        _clear_caches()
+        baby = get_baby_info(supabase, baby_id)
+        birthdate = datetime.strptime(baby["birthdate"], "%Y-%m-%d").date()
+        df = build_growth_dataframe(get_measurements(supabase, baby_id), birthdate)
+        df = add_percentiles(df, "girls")
+        for indicator in ("weight_for_age", "length_for_age"):
+            percentile_curves(indicator, "girls", df["age_days"].min(), df["age_days"].max())
+
+    return run
+
+
+def scenario_growth_statistics(context: Dict) -> Callable[[], None]:
+    """get_growth_statistics() for every baby (cold caches)."""
+    supabase, baby_ids = context["supabase"], context["baby_ids"]
+
+    def run():
+        _clear_caches()
+        for baby_id in baby_ids:
+            get_growth_statistics(supabase, baby_id)
+
+    return run
+
+
+def scenario_share_token_validation(context: Dict) -> Callable[[], None]:
+    """Validate an open share link (viewer page load)."""
+    supabase, token = context["supabase"], context["share_tokens"][0]
+
+    def run():
+        valid, _ = validate_share_token(supabase, token)
+        assert valid
+
+    return run
+
+
+def scenario_share_token_validation_password(context: Dict) -> Callable[[], None]:
+    """Validate a password-protected share link (includes bcrypt check)."""
+    supabase, token = context["supabase"], context["password_tokens"][0]
+
+    def run():
+        valid, _ = validate_share_token(supabase, token, BENCH_PASSWORD)
+        assert valid
+
+    return run
+
+
+# Name -> (factory, repeats at repeat_scale=1)
+SCENARIOS: Dict[str, tuple] = {
+    "optimize_image": (scenario_optimize_image, 5),
+    "extract_exif_date": (scenario_extract_exif_date, 20),
+    "timeline_assembly": (scenario_timeline_assembly, 10),
+    "timeline_assembly_warm": (scenario_timeline_assembly_warm, 20),
+    "growth_chart_dataframe": (scenario_growth_chart_dataframe, 20),
+    "growth_statistics": (scenario_growth_statistics, 20),
+    "share_token_validation": (scenario_share_token_validation, 50),
+    "share_token_validation_password": (scenario_share_token_validation_password, 5)
+}
+
+
+def scenario_names() -> List[str]:
+    return list(SCENARIOS)
@@ -6,7 +6,32 @@ Allows admins to upload photos with captions and dates.
 import streamlit as st
 from datetime import datetime
 from src.auth import require_auth, get_supabase_client, get_user_id
-from src.storage import upload_photo, extract_exif_date, get_storage_usage
+from src.storage import (
+    process_image,
+    hash_file,
+    find_duplicate_photo,
+    duplicate_photo_message,
+    get_storage_usage,
+    get_display_url,
+    get_recent_photos,
+    upload_photos_batch
+)
+from src.database import get_babies
+from src.signed_urls import resolve_photo_urls
+from src.near_duplicates import find_similar_photos
+from src.upload_queue import upload_queue, JOB_FAILED, JOB_DUPLICATE, ACTIVE_JOB_STATES
+from src.constants import (
+    RECENT_PHOTO_DISPLAY_WIDTH,
+    DEFAULT_RECENT_PHOTOS_LIMIT,
+    UPLOAD_STATUS_REFRESH_SECONDS,
+    MAX_FILE_SIZE_MB,
+    MAX_IMAGE_PIXELS
+)
+
+UPLOAD_HELP = (
+    f"Supported formats: JPG, PNG, HEIC (iPhone photos). "
+    f"Up to {MAX_FILE_SIZE_MB} MB and {MAX_IMAGE_PIXELS // 1_000_000} megapixels per photo"
+)
 
 # ============================================================================
 # Page Configuration
@@ -20,6 +45,96 @@ st.set_page_config(
 # Require authentication (admin only)
 require_auth()
 
+# ============================================================================
+# Duplicate Notice
+# ============================================================================
+
+def show_duplicate_photo(photo: dict) -> None:
+    """Point the user at the photo already in the timeline."""
+    col_thumb, col_info = st.columns([1, 4])
+
+    with col_thumb:
+        st.image(get_display_url(photo, RECENT_PHOTO_DISPLAY_WIDTH), use_container_width=True)
+
+    with col_info:
+        st.warning(duplicate_photo_message(photo))
+        if photo.get("caption"):
+            st.caption(photo["caption"])
+        if photo.get("file_url"):
+            st.link_button("🔗 Open existing photo", photo["file_url"])
+
+
+# ============================================================================
+# Upload Queue Status (fragment)
+# ============================================================================
+
+@st.fragment(run_every=UPLOAD_STATUS_REFRESH_SECONDS)
+def show_upload_queue_status() -> None:
+    """
+    Live status of this session's queued photos.
+
+    Re-runs on its own every UPLOAD_STATUS_REFRESH_SECONDS; reads only the
+    in-memory queue, so polling costs no requests.
+    """
+    jobs = upload_queue.get_jobs(st.session_state.get("upload_job_ids", []))
+    if not jobs:
+        return
+
+    st.divider()
+    st.subheader("📤 Upload Queue")
+
+    active = [job for job in jobs if job.state in ACTIVE_JOB_STATES]
+    finished = len(jobs) - len(active)
+    st.progress(finished / len(jobs), text=f"{finished}/{len(jobs)} done")
+
+    st.dataframe(
+        {
+            "File": [job.filename for job in jobs],
+            "Date": [job.photo_date.strftime("%b %d, %Y") for job in jobs],
+            "Status": [job.message for job in jobs]
+        },
+        use_container_width=True,
+        hide_index=True
+    )
+
+    for job in jobs:
+        if job.state == JOB_DUPLICATE:
+            st.caption(f"**{job.filename}** was not uploaded again:")
+            # Re-sign: the job may be older than the URLs it captured
+            show_duplicate_photo(resolve_photo_urls(get_supabase_client(), [job.duplicate_of])[0])
+
+    if any(job.state == JOB_FAILED for job in jobs):
+        # Troubleshooting help
+        with st.expander("🔧 Troubleshooting"):
+            st.markdown("""
+            **Common issues:**
+
+            1. **Permission denied**
+               - Check storage bucket policies in Supabase Dashboard
+               - Ensure "Admins upload photos" policy exists
+
+            2. **Storage quota exceeded**
+               - Free tier: 1GB storage (~1,000 photos)
+               - Upgrade to Supabase Pro for more storage
+
+            3. **File already exists**
+               - Rename the file before uploading
+               - Or delete the existing photo first
+
+            4. **Invalid file format**
+               - Try converting to JPG
+               - HEIC files require pillow-heif library
+
+            Network errors are retried automatically before a photo is marked as failed.
+
+            **Still having issues?** Check the [SUPABASE_SETUP.md](SUPABASE_SETUP.md) guide.
+            """)
+
+    if not active and st.button("🧹 Clear finished", key="clear_upload_jobs"):
+        st.session_state["upload_job_ids"] = []
+        st.rerun()
+
+
 # ============================================================================
 # Main Page
 # ============================================================================
@@ -33,14 +148,14 @@ try:
     # ========================================================================
     # Step 1: Get baby info
     # ========================================================================
-    babies = supabase.table("babies").select("*").execute()
+    babies = get_babies(supabase)
 
-    if not babies.data:
+    if not babies:
         st.error("❌ No baby profile found. Please create one from the main page.")
         st.page_link("Timeline.py", label="← Back to Main Page", icon="🏠")
         st.stop()
 
-    baby = babies.data[0]
+    baby = babies[0]
     baby_id = baby["baby_id"]
     baby_name = baby["name"]
 
@@ -53,7 +168,12 @@ try:
     with col1:
         st.metric("Photos", storage_info["photo_count"])
     with col2:
-        st.metric("Storage Used", f"{storage_info['total_size_mb']:.0f} MB")
+        st.metric(
+            "Storage Used",
+            f"{'~' if storage_info['estimated'] else ''}{storage_info['total_size_mb']:.0f} MB",
+            help="Includes an estimate for older photos until storage usage is reconciled"
+            if storage_info["estimated"] else None
+        )
     with col3:
         st.metric("Storage Limit", f"{storage_info['storage_limit_mb']} MB")
 
@@ -75,20 +195,49 @@ try:
     uploaded_file = st.file_uploader(
         "Choose a photo",
         type=["jpg", "jpeg", "png", "heic"],
-        help="Supported formats: JPG, PNG, HEIC (iPhone photos)",
+        help=UPLOAD_HELP,
         accept_multiple_files=False
     )
 
+    # Hash the original bytes once per file and look for an existing copy
+    # before spending any time on optimization or upload
+    duplicate = None
     if uploaded_file:
+        file_hash = st.session_state.get("upload_file_hash")
+        if not file_hash or file_hash[0] != uploaded_file.file_id:
+            file_hash = (uploaded_file.file_id, hash_file(uploaded_file))
+            st.session_state["upload_file_hash"] = file_hash
+
+        duplicate = find_duplicate_photo(supabase, baby_id, original_sha256=file_hash[1])
+
+    if duplicate:
+        show_duplicate_photo(duplicate)
+
+    elif uploaded_file:
+        # Decode once per file (in the shared image process pool): EXIF date,
+        # optimized image and derivatives, reused on upload
+        ingested = st.session_state.get("ingested_photo")
+        if not ingested or ingested[0] != uploaded_file.file_id:
+            try:
+                processed = process_image(uploaded_file.getvalue())
+                ingested = (uploaded_file.file_id, processed, processed[1])
+            except ValueError as e:
+                ingested = (uploaded_file.file_id, None, {"exif_date": None, "error": str(e)})
+            st.session_state["ingested_photo"] = ingested
+
+        _, processed, ingest_metadata = ingested
+
         # Show preview
         col_preview, col_form = st.columns([1, 1])
 
         with col_preview:
             st.markdown("#### Preview")
-            try:
-                st.image(uploaded_file, caption="Photo preview", use_container_width=True)
-            except Exception as e:
-                st.error(f"❌ Could not display preview: {str(e)}")
+            # The optimized copy, not the upload: st.image would decode the
+            # original at full size on the server
+            if processed:
+                st.image(processed[0], caption="Photo preview", use_container_width=True)
+            else:
+                st.error(f"❌ Could not display preview: {ingest_metadata['error']}")
 
             # Show file info
             file_size_mb = uploaded_file.size / (1024 * 1024)
@@ -98,10 +247,9 @@ try:
         with col_form:
             st.markdown("#### Photo Details")
 
-            # Try to extract EXIF date
-            uploaded_file.seek(0)
-            exif_date = extract_exif_date(uploaded_file)
-            uploaded_file.seek(0)  # Reset file pointer
+            exif_date = None
+            if ingest_metadata.get("exif_date"):
+                exif_date = datetime.strptime(ingest_metadata["exif_date"], "%Y-%m-%d")
 
             if exif_date:
                 st.success(f"📅 Auto-detected date: {exif_date.strftime('%B %d, %Y')}")
@@ -110,6 +258,13 @@ try:
                 st.info("📅 No EXIF date found - using today's date")
                 default_date = datetime.now()
 
+            # Burst shots: let the user know, but don't block the upload
+            if ingest_metadata.get("perceptual_hash"):
+                similar = find_similar_photos(supabase, baby_id, ingest_metadata["perceptual_hash"])
+                if similar:
+                    st.info(f"🔍 Looks very similar to {len(similar)} photo(s) already in the timeline")
+                    st.page_link("pages/5_🧹_Duplicates.py", label="Review similar photos", icon="🧹")
+
             # Date picker
             photo_date = st.date_input(
                 "Photo date",
@@ -134,63 +289,26 @@ try:
 
             st.divider()
 
-            # Upload button
+            # Upload button: hand the bytes to the background queue and return
             if st.button("📤 Upload Photo", type="primary", use_container_width=True):
                 if file_size_mb > 10:
                     st.error("❌ File too large. Maximum size is 10 MB.")
                 else:
-                    with st.spinner("Optimizing and uploading..."):
-                        uploaded_file.seek(0)  # Reset file pointer
-
-                        success, message, photo_id = upload_photo(
-                            supabase=supabase,
-                            baby_id=baby_id,
-                            uploaded_file=uploaded_file,
-                            photo_date=photo_date,
-                            caption=caption,
-                            user_id=get_user_id()
-                        )
-
-                    if success:
-                        st.success(message)
-                        st.balloons()
-
-                        # Show link to timeline
-                        st.info("🎉 Photo added to timeline!")
-
-                        col_a, col_b = st.columns(2)
-                        with col_a:
-                            if st.button("📸 Upload Another", use_container_width=True):
-                                st.rerun()
-                        with col_b:
-                            st.page_link("Timeline.py", label="👀 View Timeline", icon="🏠")
-
-                    else:
-                        st.error(message)
-
-                        # Troubleshooting help
-                        with st.expander("🔧 Troubleshooting"):
-                            st.markdown("""
-                            **Common issues:**
-
-                            1. **Permission denied**
-                               - Check storage bucket policies in Supabase Dashboard
-                               - Ensure "Admins upload photos" policy exists
-
-                            2. **Storage quota exceeded**
-                               - Free tier: 1GB storage (~1,000 photos)
-                               - Upgrade to Supabase Pro for more storage
-
-                            3. **File already exists**
-                               - Rename the file before uploading
-                               - Or delete the existing photo first
-
-                            4. **Invalid file format**
-                               - Try converting to JPG
-                               - HEIC files require pillow-heif library
-
-                            **Still having issues?** Check the [SUPABASE_SETUP.md](SUPABASE_SETUP.md) guide.
-                            """)
+                    job_id = upload_queue.submit(
+                        supabase=supabase,
+                        baby_id=baby_id,
+                        data=uploaded_file.getvalue(),
+                        filename=uploaded_file.name,
+                        photo_date=photo_date,
+                        caption=caption,
+                        user_id=get_user_id(),
+                        optimized=processed,
+                        original_sha256=file_hash[1]
+                    )
+                    st.session_state.setdefault("upload_job_ids", []).append(job_id)
+
+                    st.success("📤 Photo queued! It's being optimized and uploaded in the background.")
+                    st.page_link("Timeline.py", label="👀 View Timeline", icon="🏠")
 
     else:
         # No file uploaded yet - show helpful instructions
@@ -205,30 +323,110 @@ try:
 
         **What happens to my photos?**
         - Photos are resized to 1920px width (Full HD quality)
+        - Small thumbnails are created for fast timeline loading
         - Compressed to ~1MB (saves storage without visible quality loss)
         - Stored securely in Supabase Storage (private bucket)
         - Original EXIF date is preserved if available
         """)
 
     # ========================================================================
-    # Step 4: Recent uploads (optional preview)
+    # Step 4: Upload queue status (live while photos are in flight)
+    # ========================================================================
+
+    if st.session_state.get("upload_job_ids"):
+        show_upload_queue_status()
+
+    # ========================================================================
+    # Step 5: Bulk upload (many photos at once)
+    # ========================================================================
+
+    st.divider()
+
+    with st.expander("📦 Bulk Upload (many photos at once)", expanded=False):
+        st.caption("Import a whole holiday from your phone. Each photo keeps its own EXIF date.")
+
+        bulk_files = st.file_uploader(
+            "Choose photos",
+            type=["jpg", "jpeg", "png", "heic"],
+            help=UPLOAD_HELP,
+            accept_multiple_files=True,
+            key="bulk_uploader"
+        )
+
+        bulk_date = st.date_input(
+            "Date for photos without EXIF date",
+            value=datetime.now(),
+            max_value=datetime.now(),
+            key="bulk_fallback_date"
+        )
+
+        bulk_caption = st.text_input(
+            "Caption for all photos (optional)",
+            max_chars=500,
+            key="bulk_caption"
+        )
+
+        if bulk_files and st.button(
+            f"📤 Upload {len(bulk_files)} Photos",
+            type="primary",
+            use_container_width=True,
+            key="bulk_upload_button"
+        ):
+            progress_bar = st.progress(0.0, text="Starting...")
+            status_table = st.empty()
+            statuses = ["⏳ Queued"] * len(bulk_files)
+            final_states = ("✅", "❌")
+
+            def show_progress(index: int, status: str):
+                statuses[index] = status
+                finished = sum(1 for st_text in statuses if st_text.startswith(final_states))
+                progress_bar.progress(
+                    finished / len(bulk_files),
+                    text=f"{finished}/{len(bulk_files)} done"
+                )
+                status_table.dataframe(
+                    {"File": [f.name for f in bulk_files], "Status": statuses},
+                    use_container_width=True,
+                    hide_index=True
+                )
+
+            results = upload_photos_batch(
+                supabase=supabase,
+                baby_id=baby_id,
+                uploaded_files=bulk_files,
+                default_date=datetime.combine(bulk_date, datetime.min.time()),
+                caption=bulk_caption,
+                user_id=get_user_id(),
+                progress_callback=show_progress
+            )
+
+            succeeded = [r for r in results if r["success"]]
+            failed = [r for r in results if not r["success"]]
+
+            progress_bar.progress(1.0, text="Done")
+            if succeeded:
+                st.success(f"✅ {len(succeeded)} of {len(results)} photos uploaded!")
+            if failed:
+                st.error(f"❌ {len(failed)} photos failed:")
+                for r in failed:
+                    st.caption(f"- **{r['name']}**: {r['message']}")
+
+    # ========================================================================
+    # Step 6: Recent uploads (optional preview)
     # ========================================================================
 
     st.divider()
 
     with st.expander("📋 Recent Uploads", expanded=False):
         with st.spinner("Loading recent uploads..."):
-            recent_photos = supabase.table("photos") \
-                .select("*") \
-                .eq("baby_id", baby_id) \
-                .order("upload_date", desc=True) \
-                .limit(5) \
-                .execute()
+            recent_photos = get_recent_photos(
+                supabase, baby_id, limit=DEFAULT_RECENT_PHOTOS_LIMIT, columns="timeline_card"
+            )
 
-        if recent_photos.data:
-            st.caption(f"Last {len(recent_photos.data)} photos uploaded")
+        if recent_photos:
+            st.caption(f"Last {len(recent_photos)} photos uploaded")
 
-            for photo in recent_photos.data:
+            for photo in recent_photos:
                 col_thumb, col_info = st.columns([1, 4])
 
                 with col_thumb:
@@ -237,7 +435,11 @@ try:
                     if photo.get("caption"):
                         alt_text += f": {photo['caption']}"
 
-                    st.image(photo["file_url"], caption=alt_text, use_container_width=True)
+                    st.image(
+                        get_display_url(photo, RECENT_PHOTO_DISPLAY_WIDTH),
+                        caption=alt_text,
+                        use_container_width=True
+                    )
 
                 with col_info:
                     st.markdown(f"**📅 {photo['photo_date']}**")
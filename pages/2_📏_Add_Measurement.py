@@ -13,6 +13,7 @@ from src.database import (
     get_measurements_count,
     get_latest_measurement,
     get_baby_info,
+    get_babies,
     format_age,
     get_growth_statistics
 )
@@ -29,6 +30,105 @@ st.set_page_config(
 # Require authentication (admin only)
 require_auth()
 
+# ============================================================================
+# Measurement History (fragment)
+# ============================================================================
+
+@st.fragment
+def render_measurement_history(supabase, baby_id: str) -> None:
+    """
+    Render the last 20 measurements with delete buttons.
+
+    Runs as a fragment so widget interactions here re-render only this list;
+    reads go through the query cache, so such reruns issue no requests.
+    A successful delete still reruns the whole page to update the dashboard.
+    """
+    st.divider()
+
+    st.subheader("📊 Measurement History")
+
+    measurements = get_measurements(supabase, baby_id, limit=20, columns="table_row")
+
+    if measurements:
+        st.caption(f"Showing last {len(measurements)} measurements (newest first)")
+
+        # Create table headers
+        col_date, col_weight, col_height, col_notes, col_actions = st.columns([2, 2, 2, 3, 1])
+
+        with col_date:
+            st.markdown("**Date**")
+        with col_weight:
+            st.markdown("**Weight**")
+        with col_height:
+            st.markdown("**Height**")
+        with col_notes:
+            st.markdown("**Notes**")
+        with col_actions:
+            st.markdown("**Actions**")
+
+        st.divider()
+
+        # Display each measurement
+        for measurement in measurements:
+            col_date, col_weight, col_height, col_notes, col_actions = st.columns([2, 2, 2, 3, 1])
+
+            with col_date:
+                m_date = datetime.strptime(measurement["measurement_date"], "%Y-%m-%d")
+                st.write(m_date.strftime("%b %d, %Y"))
+
+            with col_weight:
+                if measurement.get("weight_kg"):
+                    st.write(f"⚖️ {measurement['weight_kg']} kg")
+                else:
+                    st.caption("—")
+
+            with col_height:
+                if measurement.get("height_cm"):
+                    st.write(f"📏 {measurement['height_cm']} cm")
+                else:
+                    st.caption("—")
+
+            with col_notes:
+                if measurement.get("notes"):
+                    # Truncate long notes
+                    notes_text = measurement["notes"]
+                    if len(notes_text) > 50:
+                        notes_text = notes_text[:50] + "..."
+                    st.caption(notes_text)
+                else:
+                    st.caption("—")
+
+            with col_actions:
+                # Delete button
+                if st.button("🗑️", key=f"delete_{measurement['measurement_id']}", help="Delete measurement"):
+                    success, message = delete_measurement(supabase, measurement["measurement_id"])
+                    if success:
+                        st.success(message)
+                        # Full rerun: the statistics dashboard above changes too
+                        st.rerun()
+                    else:
+                        st.error(message)
+
+            st.divider()
+
+        # Show pagination hint if there are more measurements
+        total_count = get_measurements_count(supabase, baby_id)
+        if total_count > len(measurements):
+            st.caption(f"📋 Showing {len(measurements)} of {total_count} measurements")
+
+    else:
+        st.info("""
+        📏 **No measurements recorded yet!**
+
+        Get started by:
+        1. Fill in the form above with weight and/or height
+        2. Add optional notes (e.g., "6-month checkup")
+        3. Click "Save Measurement"
+
+        Your measurements will appear here and in the timeline.
+        """)
+
+
 # ============================================================================
 # Main Page
 # ============================================================================
@@ -42,14 +142,14 @@ try:
     # ========================================================================
     # Step 1: Get baby info
     # ========================================================================
-    babies = supabase.table("babies").select("*").execute()
+    babies = get_babies(supabase)
 
-    if not babies.data:
+    if not babies:
         st.error("❌ No baby profile found. Please create one from the main page.")
         st.page_link("Timeline.py", label="← Back to Main Page", icon="🏠")
         st.stop()
 
-    baby = babies.data[0]
+    baby = babies[0]
     baby_id = baby["baby_id"]
     baby_name = baby["name"]
     baby_birthdate = datetime.strptime(baby["birthdate"], "%Y-%m-%d").date()
@@ -195,89 +295,7 @@ try:
     # Step 4: Measurement history with edit/delete
     # ========================================================================
 
-    st.divider()
-
-    st.subheader("📊 Measurement History")
-
-    measurements = get_measurements(supabase, baby_id, limit=20)
-
-    if measurements:
-        st.caption(f"Showing last {len(measurements)} measurements (newest first)")
-
-        # Create table headers
-        col_date, col_weight, col_height, col_notes, col_actions = st.columns([2, 2, 2, 3, 1])
-
-        with col_date:
-            st.markdown("**Date**")
-        with col_weight:
-            st.markdown("**Weight**")
-        with col_height:
-            st.markdown("**Height**")
-        with col_notes:
-            st.markdown("**Notes**")
-        with col_actions:
-            st.markdown("**Actions**")
-
-        st.divider()
-
-        # Display each measurement
-        for measurement in measurements:
-            col_date, col_weight, col_height, col_notes, col_actions = st.columns([2, 2, 2, 3, 1])
-
-            with col_date:
-                m_date = datetime.strptime(measurement["measurement_date"], "%Y-%m-%d")
-                st.write(m_date.strftime("%b %d, %Y"))
-
-            with col_weight:
-                if measurement.get("weight_kg"):
-                    st.write(f"⚖️ {measurement['weight_kg']} kg")
-                else:
-                    st.caption("—")
-
-            with col_height:
-                if measurement.get("height_cm"):
-                    st.write(f"📏 {measurement['height_cm']} cm")
-                else:
-                    st.caption("—")
-
-            with col_notes:
-                if measurement.get("notes"):
-                    # Truncate long notes
-                    notes_text = measurement["notes"]
-                    if len(notes_text) > 50:
-                        notes_text = notes_text[:50] + "..."
-                    st.caption(notes_text)
-                else:
-                    st.caption("—")
-
-            with col_actions:
-                # Delete button
-                if st.button("🗑️", key=f"delete_{measurement['measurement_id']}", help="Delete measurement"):
-                    success, message = delete_measurement(supabase, measurement["measurement_id"])
-                    if success:
-                        st.success(message)
-                        st.rerun()
-                    else:
-                        st.error(message)
-
-            st.divider()
-
-        # Show pagination hint if there are more measurements
-        total_count = get_measurements_count(supabase, baby_id)
-        if total_count > len(measurements):
-            st.caption(f"📋 Showing {len(measurements)} of {total_count} measurements")
-
-    else:
-        st.info("""
-        📏 **No measurements recorded yet!**
-
-        Get started by:
-        1. Fill in the form above with weight and/or height
-        2. Add optional notes (e.g., "6-month checkup")
-        3. Click "Save Measurement"
-
-        Your measurements will appear here and in the timeline.
-        """)
+    render_measurement_history(supabase, baby_id)
 
     # ========================================================================
     # Step 5: Tips and guidelines
@@ -8,7 +8,13 @@ import plotly.graph_objects as go
 import pandas as pd
 from datetime import datetime, timedelta
 from src.auth import is_authenticated, get_supabase_client, init_supabase
-from src.database import get_measurements, format_age
+from src.database import get_measurements, get_baby_info, get_babies, format_age
+from src.sharing import current_viewer_baby_id
+from src.growth_standards import (
+    build_growth_dataframe,
+    add_percentiles,
+    percentile_curves
+)
 from src.constants import (
     CHART_COLOR_WEIGHT,
     CHART_COLOR_HEIGHT,
@@ -27,95 +33,49 @@ st.set_page_config(
 )
 
 # ============================================================================
-# Access Control - Allow both admins and viewers
-# ============================================================================
-is_admin = is_authenticated()
-is_viewer = st.session_state.get("viewer_mode") and st.session_state.get("viewer_baby_id")
-
-if not is_admin and not is_viewer:
-    st.error("🔒 Access denied. Please log in or use a valid share link.")
-    st.page_link("Timeline.py", label="← Back to Main Page", icon="🏠")
-    st.stop()
-
-# ============================================================================
-# Main Page
+# Chart Helpers
 # ============================================================================
 
-if is_viewer:
-    st.title("📊 Growth Chart (View Only)")
-else:
-    st.title("📊 Growth Chart")
-
-st.write("Visualize your baby's growth over time")
-
-try:
-    supabase = get_supabase_client() if is_admin else init_supabase()
-
-    # ========================================================================
-    # Step 1: Get baby info
-    # ========================================================================
-    if is_viewer:
-        # Viewer: use baby_id from session
-        baby_id = st.session_state["viewer_baby_id"]
-        babies = supabase.table("babies").select("*").eq("baby_id", baby_id).execute()
-    else:
-        # Admin: get all babies (for MVP, just first one)
-        babies = supabase.table("babies").select("*").execute()
-
-    if not babies.data:
-        st.error("❌ No baby profile found. Please create one from the main page.")
-        st.page_link("Timeline.py", label="← Back to Main Page", icon="🏠")
-        st.stop()
-
-    baby = babies.data[0]
-    baby_id = baby["baby_id"]
-    baby_name = baby["name"]
-    baby_birthdate = datetime.strptime(baby["birthdate"], "%Y-%m-%d").date()
-
-    # ========================================================================
-    # Step 2: Fetch measurements
-    # ========================================================================
-    with st.spinner("Loading measurements..."):
-        measurements_response = get_measurements(supabase, baby_id)
-        measurements = measurements_response if isinstance(measurements_response, list) else measurements_response.data if hasattr(measurements_response, 'data') else []
-
-    if not measurements:
-        st.info("""
-        📊 **No measurements yet!**
-
-        Get started by:
-        1. Click "📏 Add Measurement" in the sidebar
-        2. Record your baby's weight and/or height
-        3. Come back here to see the growth chart
-
-        You need at least 2 measurements to see trends over time.
-        """)
-
-        col_a, col_b = st.columns(2)
-        with col_a:
-            st.page_link("pages/2_📏_Add_Measurement.py", label="📏 Add Measurement", icon="➕")
-        with col_b:
-            st.page_link("Timeline.py", label="👀 View Timeline", icon="🏠")
-
-        st.stop()
-
-    # ========================================================================
-    # Step 3: Convert to DataFrame and prepare data
-    # ========================================================================
-    df = pd.DataFrame(measurements)
-    df["measurement_date"] = pd.to_datetime(df["measurement_date"])
-    df = df.sort_values("measurement_date")
-
-    # Calculate age at each measurement
-    df["age_days"] = (df["measurement_date"] - pd.to_datetime(baby_birthdate)).dt.days
-
-    st.subheader(f"{baby_name}'s Growth")
-    st.caption(f"👶 {format_age(baby_birthdate)} | {len(measurements)} measurements recorded")
-
+def add_percentile_bands(fig, indicator: str, sex: str, data: pd.DataFrame, birthdate, yaxis: str = "y"):
+    """Draw WHO percentile curves (P3-P97) behind the measurement line."""
+    curves = percentile_curves(indicator, sex, data["age_days"].min(), data["age_days"].max())
+    if curves is None:
+        return
+
+    curve_dates = pd.to_datetime(birthdate) + pd.to_timedelta(curves["age_days"], unit="D")
+    for band in [c for c in curves.columns if c != "age_days"]:
+        fig.add_trace(go.Scatter(
+            x=curve_dates,
+            y=curves[band],
+            mode="lines",
+            name=f"WHO {band}",
+            legendgroup="who",
+            line=dict(color="#999999", width=2 if band == "P50" else 1, dash="dot"),
+            yaxis=yaxis,
+            hoverinfo="skip"
+        ))
+
+
+def percentile_caption(data: pd.DataFrame, column: str) -> None:
+    """Show the latest measurement's WHO percentile (if computed)."""
+    percentile_column = f"{column}_percentile"
+    if percentile_column in data and pd.notna(data.iloc[-1][percentile_column]):
+        st.caption(f"📈 Latest: **{data.iloc[-1][percentile_column]:.0f}th** WHO percentile")
+
+
+@st.fragment
+def render_growth_charts(df: pd.DataFrame, baby_name: str, baby_birthdate) -> None:
+    """
+    Chart controls, charts and data table.
+
+    Runs as a fragment: changing the chart type, date range or WHO option
+    re-runs only this function over the already-built DataFrame, without
+    re-fetching anything.
+    """
     # ========================================================================
     # Step 4: Chart controls
     # ========================================================================
-    col_chart_type, col_date_range = st.columns([2, 2])
+    col_chart_type, col_date_range, col_who = st.columns([2, 2, 1])
 
     with col_chart_type:
         chart_type = st.radio(
@@ -132,6 +92,13 @@ try:
             help="Filter measurements by time period"
         )
 
+    with col_who:
+        who_reference = st.selectbox(
+            "WHO Percentiles",
+            ["Off", "Girls", "Boys"],
+            help="Compare with the WHO Child Growth Standards (0-2 years)"
+        )
+
     # Filter data based on date range
     today = datetime.now()
     if date_range == "Last 3 months":
@@ -148,7 +115,11 @@ try:
 
     if len(df_filtered) == 0:
         st.warning(f"⚠️ No measurements found in {date_range}. Try selecting 'All time'.")
-        st.stop()
+        return
+
+    who_sex = who_reference.lower() if who_reference != "Off" else None
+    if who_sex:
+        df_filtered = add_percentiles(df_filtered, who_sex)
 
     st.divider()
 
@@ -164,6 +135,9 @@ try:
             st.warning("⚠️ No weight measurements recorded yet.")
         else:
             fig = go.Figure()
+            if who_sex:
+                add_percentile_bands(fig, "weight_for_age", who_sex, weight_data, baby_birthdate)
+
             fig.add_trace(go.Scatter(
                 x=weight_data["measurement_date"],
                 y=weight_data["weight_kg"],
@@ -201,6 +175,8 @@ try:
                 avg_weight = weight_data["weight_kg"].mean()
                 st.metric("Average", f"{avg_weight:.1f} kg")
 
+            percentile_caption(weight_data, "weight_kg")
+
     elif chart_type == "Height":
         # ==================== Height Chart ====================
         height_data = df_filtered[df_filtered["height_cm"].notna()]
@@ -209,6 +185,9 @@ try:
             st.warning("⚠️ No height measurements recorded yet.")
         else:
             fig = go.Figure()
+            if who_sex:
+                add_percentile_bands(fig, "length_for_age", who_sex, height_data, baby_birthdate)
+
             fig.add_trace(go.Scatter(
                 x=height_data["measurement_date"],
                 y=height_data["height_cm"],
@@ -246,6 +225,8 @@ try:
                 avg_height = height_data["height_cm"].mean()
                 st.metric("Average", f"{avg_height:.1f} cm")
 
+            percentile_caption(height_data, "height_cm")
+
     else:  # Combined
         # ==================== Combined Chart (Dual Y-Axis) ====================
         weight_data = df_filtered[df_filtered["weight_kg"].notna()]
@@ -369,6 +350,93 @@ try:
 
         st.caption(f"Showing {len(display_df)} measurements")
 
+# ============================================================================
+# Access Control - Allow both admins and viewers
+# ============================================================================
+is_admin = is_authenticated()
+# Signed credential + cached revocation check (no bcrypt on page switches)
+is_viewer = not is_admin and current_viewer_baby_id(init_supabase()) is not None
+
+if not is_admin and not is_viewer:
+    st.error("🔒 Access denied. Please log in or use a valid share link.")
+    st.page_link("Timeline.py", label="← Back to Main Page", icon="🏠")
+    st.stop()
+
+# ============================================================================
+# Main Page
+# ============================================================================
+
+if is_viewer:
+    st.title("📊 Growth Chart (View Only)")
+else:
+    st.title("📊 Growth Chart")
+
+st.write("Visualize your baby's growth over time")
+
+try:
+    supabase = get_supabase_client() if is_admin else init_supabase()
+
+    # ========================================================================
+    # Step 1: Get baby info
+    # ========================================================================
+    if is_viewer:
+        # Viewer: use baby_id from session
+        baby = get_baby_info(supabase, st.session_state["viewer_baby_id"])
+        babies = [baby] if baby else []
+    else:
+        # Admin: get all babies (for MVP, just first one)
+        babies = get_babies(supabase)
+
+    if not babies:
+        st.error("❌ No baby profile found. Please create one from the main page.")
+        st.page_link("Timeline.py", label="← Back to Main Page", icon="🏠")
+        st.stop()
+
+    baby = babies[0]
+    baby_id = baby["baby_id"]
+    baby_name = baby["name"]
+    baby_birthdate = datetime.strptime(baby["birthdate"], "%Y-%m-%d").date()
+
+    # ========================================================================
+    # Step 2: Fetch measurements
+    # ========================================================================
+    with st.spinner("Loading measurements..."):
+        measurements_response = get_measurements(supabase, baby_id, columns="table_row")
+        measurements = measurements_response if isinstance(measurements_response, list) else measurements_response.data if hasattr(measurements_response, 'data') else []
+
+    if not measurements:
+        st.info("""
+        📊 **No measurements yet!**
+
+        Get started by:
+        1. Click "📏 Add Measurement" in the sidebar
+        2. Record your baby's weight and/or height
+        3. Come back here to see the growth chart
+
+        You need at least 2 measurements to see trends over time.
+        """)
+
+        col_a, col_b = st.columns(2)
+        with col_a:
+            st.page_link("pages/2_📏_Add_Measurement.py", label="📏 Add Measurement", icon="➕")
+        with col_b:
+            st.page_link("Timeline.py", label="👀 View Timeline", icon="🏠")
+
+        st.stop()
+
+    # ========================================================================
+    # Step 3: Convert to DataFrame and prepare data
+    # ========================================================================
+    df = build_growth_dataframe(measurements, baby_birthdate)
+
+    st.subheader(f"{baby_name}'s Growth")
+    st.caption(f"👶 {format_age(baby_birthdate)} | {len(measurements)} measurements recorded")
+
+    # ========================================================================
+    # Steps 4-6: Controls, charts and data table (fragment)
+    # ========================================================================
+    render_growth_charts(df, baby_name, baby_birthdate)
+
     # ========================================================================
     # Step 7: Tips and insights
     # ========================================================================
@@ -415,10 +483,11 @@ try:
 
         ---
 
-        ### Future Enhancement: WHO Percentiles
+        ### WHO Percentiles
 
-        We're planning to add WHO growth percentile curves so you can compare your baby's growth to global averages.
-        This will show if your baby is in the 10th, 50th, 90th percentile, etc.
+        Pick **Girls** or **Boys** under "WHO Percentiles" to draw the WHO Child Growth Standards
+        curves (3rd, 15th, 50th, 85th and 97th percentile) for the first 2 years.
+        A baby on the 50th percentile line is exactly average; most healthy babies stay between P3 and P97.
         """)
 
 except ValueError as e:
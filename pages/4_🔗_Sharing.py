@@ -12,6 +12,7 @@ from src.sharing import (
     get_active_share_link,
     revoke_share_link
 )
+from src.database import get_babies
 from src.validators import validate_password
 
 # ============================================================================
@@ -39,14 +40,14 @@ try:
     # ========================================================================
     # Step 1: Get baby info
     # ========================================================================
-    babies = supabase.table("babies").select("*").execute()
+    babies = get_babies(supabase)
 
-    if not babies.data:
+    if not babies:
         st.error("❌ No baby profile found. Please create one from the main page.")
         st.page_link("Timeline.py", label="← Back to Main Page", icon="🏠")
         st.stop()
 
-    baby = babies.data[0]
+    baby = babies[0]
     baby_id = baby["baby_id"]
     baby_name = baby["name"]
 
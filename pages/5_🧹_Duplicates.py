@@ -0,0 +1,141 @@
+"""
+Duplicates Page - Baby Timeline
+Groups near-identical photos (burst shots, re-edits) for bulk cleanup.
+"""
+
+import streamlit as st
+from src.auth import require_auth, get_supabase_client
+from src.storage import delete_photo, get_display_url
+from src.near_duplicates import (
+    get_near_duplicate_groups,
+    count_unhashed_photos,
+    backfill_perceptual_hashes
+)
+from src.database import get_babies
+from src.constants import RECENT_PHOTO_DISPLAY_WIDTH, NEAR_DUPLICATE_MAX_DISTANCE
+
+# ============================================================================
+# Page Configuration
+# ============================================================================
+st.set_page_config(
+    page_title="Duplicates - Baby Timeline",
+    page_icon="🧹",
+    layout="wide"
+)
+
+# Require authentication (admin only)
+require_auth()
+
+# ============================================================================
+# Main Page
+# ============================================================================
+
+st.title("🧹 Similar Photos")
+st.write("Find burst shots and near-identical photos and keep only the best ones")
+
+try:
+    supabase = get_supabase_client()
+
+    # ========================================================================
+    # Step 1: Get baby info
+    # ========================================================================
+    babies = get_babies(supabase)
+
+    if not babies:
+        st.error("❌ No baby profile found. Please create one from the main page.")
+        st.page_link("Timeline.py", label="← Back to Main Page", icon="🏠")
+        st.stop()
+
+    baby = babies[0]
+    baby_id = baby["baby_id"]
+
+    # ========================================================================
+    # Step 2: Index photos uploaded before similarity detection existed
+    # ========================================================================
+    unhashed = count_unhashed_photos(supabase, baby_id)
+
+    if unhashed:
+        st.info(f"💡 {unhashed} older photo(s) are not indexed yet and won't show up below.")
+        if st.button("🔍 Index older photos", key="backfill_hashes"):
+            with st.spinner("Indexing photos..."):
+                hashed, failed = backfill_perceptual_hashes(supabase, baby_id)
+            if failed:
+                st.warning(f"⚠️ Indexed {hashed} photo(s), {failed} could not be read")
+            else:
+                st.success(f"✅ Indexed {hashed} photo(s)")
+            st.rerun()
+
+    # ========================================================================
+    # Step 3: Similarity threshold
+    # ========================================================================
+    max_distance = st.slider(
+        "Similarity tolerance",
+        min_value=1,
+        max_value=16,
+        value=NEAR_DUPLICATE_MAX_DISTANCE,
+        help="How many of the 64 fingerprint bits may differ. Lower = only near-identical shots."
+    )
+
+    groups = get_near_duplicate_groups(supabase, baby_id, max_distance)
+
+    st.divider()
+
+    # ========================================================================
+    # Step 4: Groups with checkboxes for bulk delete
+    # ========================================================================
+    if not groups:
+        st.success("✅ No similar photos found")
+        st.stop()
+
+    st.caption(f"{len(groups)} group(s) of similar photos · tick the ones to delete")
+
+    selected = []
+    for group_index, group in enumerate(groups):
+        st.markdown(f"**Group {group_index + 1}** · {len(group)} photos")
+        columns = st.columns(min(len(group), 4))
+
+        for photo_index, photo in enumerate(group):
+            with columns[photo_index % len(columns)]:
+                st.image(
+                    get_display_url(photo, RECENT_PHOTO_DISPLAY_WIDTH),
+                    caption=photo.get("caption") or photo["photo_date"],
+                    use_container_width=True
+                )
+                if st.checkbox("Delete", key=f"duplicate_{photo['photo_id']}"):
+                    selected.append(photo)
+
+        st.divider()
+
+    if st.button(
+        f"🗑️ Delete {len(selected)} selected photo(s)",
+        type="primary",
+        disabled=not selected,
+        key="delete_duplicates"
+    ):
+        deleted = 0
+        with st.spinner("Deleting photos..."):
+            for photo in selected:
+                success, message = delete_photo(supabase, photo["photo_id"], baby_id)
+                if success:
+                    deleted += 1
+                else:
+                    st.error(message)
+
+        st.success(f"✅ Deleted {deleted} photo(s)")
+        st.rerun()
+
+except ValueError as e:
+    # Environment not configured
+    st.error(str(e))
+    st.info("👉 **Setup required:** Follow the guide in `SUPABASE_SETUP.md`")
+
+except Exception as e:
+    st.error(f"❌ Error loading duplicates page: {str(e)}")
+    st.exception(e)  # Show full error in development
+
+# ============================================================================
+# Footer
+# ============================================================================
+
+st.divider()
+st.caption("💡 **Tip:** Exact re-uploads are already blocked on upload; this page finds photos that only look alike.")
@@ -0,0 +1,257 @@
+"""
+Storage Usage Reconciliation - Baby Timeline
+Corrects drift between the baby-photos bucket and the storage accounting
+introduced in migration 10 (photos.byte_size and baby_storage_usage).
+
+The app keeps the totals up to date on every upload and delete, so this
+script only matters when files change outside the app, e.g.:
+- Photos uploaded before migration 10 (byte_size still NULL)
+- Files deleted or replaced by hand in the Supabase dashboard
+- Uploads that failed half-way and left orphaned files behind
+
+How it works:
+- Lists the bucket folder by folder, one page of objects at a time, and
+  records the size of every file
+- Pages through the photos table by photo_id (keyset pagination) and sets
+  byte_size to the measured size of each photo's files where it differs
+- Rewrites each baby's baby_storage_usage row if its totals still differ
+  from the photo rows
+- Reports files that no photo row refers to (never deletes them)
+
+Usage:
+    python reconcile_storage_usage.py              # fix drift
+    python reconcile_storage_usage.py --dry-run    # only report it
+"""
+
+import argparse
+import os
+import time
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+from dotenv import load_dotenv
+from supabase import create_client
+
+# Load environment variables
+load_dotenv()
+
+BUCKET = "baby-photos"
+DEFAULT_LIST_PAGE_SIZE = 1000  # Objects per Storage list() call
+DEFAULT_PAGE_SIZE = 500
+
+# Only the columns needed to locate a photo's files
+PHOTO_COLUMNS = "photo_id, baby_id, storage_path, exif_data, byte_size"
+
+
+# ============================================================================
+# Bucket Listing
+# ============================================================================
+
+def list_bucket_files(supabase, prefix: str = "", page_size: int = DEFAULT_LIST_PAGE_SIZE) -> Iterator[Tuple[str, int]]:
+    """
+    Walk the bucket and yield every file with its size.
+
+    Args:
+        supabase: Supabase client (service role)
+        prefix: Folder to start from ("" = bucket root)
+        page_size: Objects requested per list() call
+
+    Yields:
+        Tuples of (path, size in bytes)
+
+    Note:
+        The Storage API lists one folder level at a time; entries without
+        an id are sub-folders and are walked after the current folder.
+    """
+    bucket = supabase.storage.from_(BUCKET)
+    folders = [prefix]
+
+    while folders:
+        folder = folders.pop()
+        offset = 0
+
+        while True:
+            entries = bucket.list(folder or None, {
+                "limit": page_size,
+                "offset": offset,
+                "sortBy": {"column": "name", "order": "asc"}
+            })
+
+            for entry in entries:
+                path = f"{folder}/{entry['name']}" if folder else entry["name"]
+                if entry.get("id") is None:
+                    folders.append(path)
+                else:
+                    yield path, int((entry.get("metadata") or {}).get("size") or 0)
+
+            if len(entries) < page_size:
+                break
+            offset += page_size
+
+
+# ============================================================================
+# Reconciliation
+# ============================================================================
+
+def photo_paths(photo: Dict) -> List[str]:
+    """Storage paths of a photo: full size plus every derivative and format variant."""
+    paths = [photo["storage_path"]]
+    for d in ((photo.get("exif_data") or {}).get("derivatives") or {}).values():
+        if d.get("path"):
+            paths.append(d["path"])
+        paths.extend(v["path"] for v in (d.get("variants") or {}).values())
+    return paths
+
+
+def fetch_page(supabase, after_photo_id: Optional[str], page_size: int) -> List[Dict]:
+    """Fetch the next page of photos ordered by photo_id (keyset pagination)."""
+    query = supabase.table("photos").select(PHOTO_COLUMNS)
+
+    if after_photo_id:
+        query = query.gt("photo_id", after_photo_id)
+
+    result = query.order("photo_id").limit(page_size).execute()
+    return result.data or []
+
+
+def reconcile_storage_usage(supabase, page_size: int = DEFAULT_PAGE_SIZE, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Measure every photo in the bucket and correct byte_size and the totals.
+
+    Args:
+        supabase: Supabase client (service role: writes baby_storage_usage)
+        page_size: Photos per page
+        dry_run: Report drift without writing anything
+
+    Returns:
+        Dict of counters (photos_scanned, photos_resized, missing_files,
+        babies_corrected, orphan_files, orphan_bytes)
+    """
+    stats = defaultdict(int)
+
+    # Step 1: Size of every file in the bucket
+    print("📂 Listing bucket...")
+    sizes = dict(list_bucket_files(supabase))
+    print(f"   {len(sizes)} files, {sum(sizes.values()) / (1024 * 1024):.1f} MB\n")
+
+    # Step 2: Measure each photo and fix its byte_size
+    print("📸 Measuring photos...")
+    referenced = set()
+    totals = defaultdict(lambda: {"photo_count": 0, "total_bytes": 0, "unsized_photo_count": 0})
+    last_photo_id = None
+
+    while True:
+        photos = fetch_page(supabase, last_photo_id, page_size)
+        if not photos:
+            break
+        last_photo_id = photos[-1]["photo_id"]
+
+        for photo in photos:
+            stats["photos_scanned"] += 1
+            byte_size = photo["byte_size"]
+
+            # Legacy rows without storage_path (see refresh_photo_urls.py) can't be measured
+            if photo["storage_path"]:
+                paths = photo_paths(photo)
+                referenced.update(paths)
+
+                missing = [path for path in paths if path not in sizes]
+                if missing:
+                    stats["missing_files"] += len(missing)
+                    print(f"  ⚠️  Photo {photo['photo_id'][:8]} is missing {', '.join(missing)}")
+
+                measured = sum(sizes.get(path, 0) for path in paths)
+                if measured != byte_size:
+                    stats["photos_resized"] += 1
+                    if not dry_run:
+                        supabase.table("photos") \
+                            .update({"byte_size": measured}) \
+                            .eq("photo_id", photo["photo_id"]) \
+                            .execute()
+                    byte_size = measured
+
+            baby_totals = totals[photo["baby_id"]]
+            baby_totals["photo_count"] += 1
+            baby_totals["total_bytes"] += byte_size or 0
+            baby_totals["unsized_photo_count"] += byte_size is None
+
+        print(f"   {stats['photos_scanned']} scanned, {stats['photos_resized']} resized")
+
+    # Step 3: Rewrite running totals that drifted
+    print("\n🧮 Checking totals...")
+    result = supabase.table("baby_storage_usage") \
+        .select("baby_id, photo_count, total_bytes, unsized_photo_count") \
+        .execute()
+    current = {row.pop("baby_id"): row for row in result.data or []}
+
+    babies = supabase.table("babies").select("baby_id").execute()
+    corrections = []
+    for row in babies.data or []:
+        expected = totals.get(row["baby_id"], {"photo_count": 0, "total_bytes": 0, "unsized_photo_count": 0})
+        if current.get(row["baby_id"]) != expected:
+            print(f"  🔧 Baby {row['baby_id'][:8]}: {current.get(row['baby_id'])} → {expected}")
+            corrections.append({"baby_id": row["baby_id"], **expected})
+
+    stats["babies_corrected"] = len(corrections)
+    if corrections and not dry_run:
+        supabase.table("baby_storage_usage").upsert(corrections, on_conflict="baby_id").execute()
+
+    # Step 4: Files no photo refers to
+    orphans = {path: size for path, size in sizes.items() if path not in referenced}
+    stats["orphan_files"] = len(orphans)
+    stats["orphan_bytes"] = sum(orphans.values())
+    for path in sorted(orphans)[:20]:
+        print(f"  🗑️  Orphaned file: {path}")
+    if len(orphans) > 20:
+        print(f"  ... and {len(orphans) - 20} more")
+
+    return dict(stats)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Correct storage usage totals from the bucket contents.")
+    parser.add_argument(
+        "--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+        help=f"Photos per page (default {DEFAULT_PAGE_SIZE})"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="Report drift without changing anything"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    print("\n" + "=" * 50)
+    print("🧮 Storage Usage Reconciliation")
+    print("=" * 50 + "\n")
+
+    # Check environment variables
+    if not os.getenv("SUPABASE_URL") or not os.getenv("SUPABASE_SERVICE_ROLE_KEY"):
+        print("❌ Error: Missing environment variables")
+        print("Please ensure .env file contains:")
+        print("  - SUPABASE_URL")
+        print("  - SUPABASE_SERVICE_ROLE_KEY")
+        exit(1)
+
+    supabase = create_client(
+        os.getenv("SUPABASE_URL"),
+        os.getenv("SUPABASE_SERVICE_ROLE_KEY")  # Use service role for admin access
+    )
+
+    started = time.monotonic()
+    stats = reconcile_storage_usage(supabase, page_size=args.page_size, dry_run=args.dry_run)
+
+    # Summary
+    print("\n" + "=" * 50)
+    print("📊 Reconciliation Summary" + (" (dry run, nothing written)" if args.dry_run else ""))
+    print(f"   📁 Photos scanned: {stats.get('photos_scanned', 0)}")
+    print(f"   📏 Sizes corrected: {stats.get('photos_resized', 0)}")
+    print(f"   🧮 Baby totals corrected: {stats.get('babies_corrected', 0)}")
+    if stats.get("missing_files"):
+        print(f"   ⚠️  Files missing from bucket: {stats['missing_files']}")
+    if stats.get("orphan_files"):
+        print(f"   🗑️  Orphaned files: {stats['orphan_files']} ({stats['orphan_bytes'] / (1024 * 1024):.1f} MB)")
+    print(f"   ⏱️  Took {time.monotonic() - started:.1f}s")
+    print("=" * 50)
@@ -1,27 +1,233 @@
 """
 URL Refresh Utility - Baby Timeline
-Regenerates signed URLs for all existing photos in the database.
+Regenerates signed URLs for existing photos in the database.
+
+Photos uploaded since migration 05 store storage_path and get short-lived
+URLs signed on demand, so they never need refreshing. This script only
+touches legacy rows that still have no storage_path.
 
 Use this script when:
 - Switching from public bucket to private bucket
-- Signed URLs are expiring (e.g., after 1 year)
-- Photos showing "Bucket not found" errors
+- Signed URLs of legacy photos are expiring
+- Legacy photos showing "Bucket not found" errors
+
+How it works:
+- Pages through the photos table by photo_id (keyset pagination)
+- Signs every file of a page (full size + thumbnails) in one bulk call
+- Writes each page back with a single upsert, several pages in parallel
+- Saves a checkpoint after every page, so an interrupted run resumes
+  where it stopped
 
 Usage:
-    python refresh_photo_urls.py
+    python refresh_photo_urls.py                           # refresh everything
+    python refresh_photo_urls.py --expiring-within-days 30 # only URLs expiring soon
+    python refresh_photo_urls.py --restart                 # ignore the checkpoint
 """
 
+import argparse
+import base64
+import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
 from dotenv import load_dotenv
 from supabase import create_client
 
 # Load environment variables
 load_dotenv()
 
-def refresh_all_photo_urls():
+BUCKET = "baby-photos"
+SIGNED_URL_EXPIRY_SECONDS = 315360000  # 10 years in seconds
+DEFAULT_PAGE_SIZE = 200
+DEFAULT_WORKERS = 4
+DEFAULT_CHECKPOINT_FILE = ".refresh_photo_urls.checkpoint.json"
+
+# Only the columns the refresh reads or must send back in an upsert
+PHOTO_COLUMNS = "photo_id, baby_id, photo_date, file_url, thumbnail_url, exif_data"
+
+
+# ============================================================================
+# URL Helpers
+# ============================================================================
+
+def extract_file_path(url: str) -> Optional[str]:
+    """
+    Recover the storage path from a Supabase Storage URL.
+
+    URL formats:
+        https://xxx.supabase.co/storage/v1/object/public/baby-photos/path/to/file.jpg
+        https://xxx.supabase.co/storage/v1/object/sign/baby-photos/path/to/file.jpg?token=...
     """
-    Fetch all photos from database and regenerate signed URLs.
-    Updates the database with new URLs.
+    if not url or f"/{BUCKET}/" not in url:
+        return None
+    return url.split(f"/{BUCKET}/")[1].split("?")[0]
+
+
+def get_url_expiry(url: str) -> Optional[datetime]:
+    """
+    Read the expiry time from a signed URL's JWT token.
+
+    Returns:
+        Expiry as an aware UTC datetime, or None for unsigned/unparseable URLs
+    """
+    try:
+        token = parse_qs(urlparse(url).query).get("token", [None])[0]
+        if not token:
+            return None
+
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)  # Restore base64 padding
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+
+        return datetime.fromtimestamp(claims["exp"], tz=timezone.utc)
+    except Exception:
+        return None
+
+
+def needs_refresh(photo: Dict, expiring_before: Optional[datetime]) -> bool:
+    """Decide whether a photo's URLs should be re-signed."""
+    if expiring_before is None:
+        return True
+
+    expiry = get_url_expiry(photo["file_url"])
+    # Unsigned or unreadable URLs are always refreshed
+    return expiry is None or expiry <= expiring_before
+
+
+# ============================================================================
+# Checkpointing
+# ============================================================================
+
+def load_checkpoint(path: str) -> Optional[str]:
+    """Return the last fully processed photo_id, or None to start over."""
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("last_photo_id")
+
+
+def save_checkpoint(path: str, last_photo_id: str, stats: Dict[str, int]) -> None:
+    """Atomically record progress (write temp file, then rename)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "last_photo_id": last_photo_id,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            **stats
+        }, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# ============================================================================
+# Refresh Engine
+# ============================================================================
+
+def fetch_page(supabase, after_photo_id: Optional[str], page_size: int) -> List[Dict]:
+    """Fetch the next page of photos ordered by photo_id (keyset pagination)."""
+    # Rows with a storage_path are signed on demand by the app
+    query = supabase.table("photos").select(PHOTO_COLUMNS).is_("storage_path", "null")
+
+    if after_photo_id:
+        query = query.gt("photo_id", after_photo_id)
+
+    result = query.order("photo_id").limit(page_size).execute()
+    return result.data or []
+
+
+def refresh_page(supabase, photos: List[Dict]) -> Dict[str, int]:
+    """
+    Re-sign all files of a page in one bulk call and upsert the new URLs.
+
+    Returns:
+        Dict with "updated" and "errors" counts for this page
+    """
+    stats = {"updated": 0, "errors": 0}
+
+    # Collect every object path (full size + derivatives) on the page
+    plans = []
+    for photo in photos:
+        file_path = extract_file_path(photo["file_url"])
+        if not file_path:
+            print(f"  ⚠️  Skipping {photo['photo_id'][:8]} - couldn't parse URL: {photo['file_url']}")
+            stats["errors"] += 1
+            continue
+
+        derivatives = (photo.get("exif_data") or {}).get("derivatives") or {}
+        plans.append((photo, file_path, derivatives))
+
+    if not plans:
+        return stats
+
+    all_paths = [file_path for _, file_path, _ in plans]
+    all_paths += [d["path"] for _, _, derivatives in plans for d in derivatives.values() if d.get("path")]
+
+    signed = supabase.storage.from_(BUCKET).create_signed_urls(
+        all_paths,
+        expires_in=SIGNED_URL_EXPIRY_SECONDS
+    )
+    urls = {
+        item["path"]: item.get("signedURL") or item.get("signedUrl")
+        for item in signed if not item.get("error")
+    }
+
+    rows = []
+    for photo, file_path, derivatives in plans:
+        new_url = urls.get(file_path)
+        if not new_url:
+            print(f"  ❌ Failed to sign {photo['photo_id'][:8]} ({file_path})")
+            stats["errors"] += 1
+            continue
+
+        exif_data = photo.get("exif_data")
+        thumbnail_url = photo.get("thumbnail_url")
+
+        if derivatives:
+            exif_data = dict(exif_data)
+            exif_data["derivatives"] = {
+                name: {**d, "url": urls.get(d.get("path"), d.get("url"))}
+                for name, d in derivatives.items()
+            }
+            thumbnail_url = min(exif_data["derivatives"].values(), key=lambda d: d["width"])["url"]
+
+        # Upsert needs the NOT NULL columns; storage_path moves the row to on-demand signing
+        rows.append({
+            "photo_id": photo["photo_id"],
+            "baby_id": photo["baby_id"],
+            "photo_date": photo["photo_date"],
+            "storage_path": file_path,
+            "file_url": new_url,
+            "thumbnail_url": thumbnail_url,
+            "exif_data": exif_data
+        })
+
+    if rows:
+        supabase.table("photos").upsert(rows, on_conflict="photo_id").execute()
+        stats["updated"] += len(rows)
+
+    return stats
+
+
+def refresh_all_photo_urls(
+    expiring_within_days: Optional[int] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    workers: int = DEFAULT_WORKERS,
+    checkpoint_file: str = DEFAULT_CHECKPOINT_FILE,
+    restart: bool = False
+):
+    """
+    Regenerate signed URLs for photos, page by page.
+
+    Args:
+        expiring_within_days: Only refresh URLs that expire within N days (None = all)
+        page_size: Photos per page (one bulk sign + one upsert per page)
+        workers: Maximum number of pages processed concurrently
+        checkpoint_file: Where progress is saved for resuming
+        restart: Ignore an existing checkpoint and start from the beginning
     """
     print("🔄 Starting URL refresh process...\n")
 
@@ -31,76 +237,101 @@ def refresh_all_photo_urls():
         os.getenv("SUPABASE_SERVICE_ROLE_KEY")  # Use service role for admin access
     )
 
-    # Step 1: Fetch all photos
-    print("📥 Fetching all photos from database...")
-    photos_response = supabase.table("photos").select("*").execute()
-    photos = photos_response.data
-
-    if not photos:
-        print("✅ No photos found in database. Nothing to refresh.")
-        return
-
-    print(f"Found {len(photos)} photos to process.\n")
-
-    # Step 2: Process each photo
-    success_count = 0
-    error_count = 0
-
-    for i, photo in enumerate(photos, 1):
-        photo_id = photo["photo_id"]
-        old_url = photo["file_url"]
-
-        print(f"[{i}/{len(photos)}] Processing photo {photo_id[:8]}...")
-
-        try:
-            # Extract file path from old URL
-            # URL format: https://xxx.supabase.co/storage/v1/object/public/baby-photos/path/to/file.jpg
-            # OR: https://xxx.supabase.co/storage/v1/object/sign/baby-photos/path/to/file.jpg?token=...
-
-            # Find the bucket name and extract path after it
-            if "/baby-photos/" in old_url:
-                file_path = old_url.split("/baby-photos/")[1].split("?")[0]  # Remove query params if any
-            else:
-                print(f"  ⚠️  Skipping - couldn't parse URL: {old_url}")
-                error_count += 1
-                continue
-
-            # Generate new signed URL (10 years expiration)
-            signed_url_response = supabase.storage.from_("baby-photos").create_signed_url(
-                file_path,
-                expires_in=315360000  # 10 years in seconds
-            )
-            new_url = signed_url_response.get("signedURL") or signed_url_response.get("signedUrl")
-
-            if not new_url:
-                print(f"  ❌ Failed to generate signed URL")
-                error_count += 1
-                continue
-
-            # Update database with new URL
-            supabase.table("photos").update({
-                "file_url": new_url
-            }).eq("photo_id", photo_id).execute()
-
-            print(f"  ✅ Updated successfully")
-            success_count += 1
-
-        except Exception as e:
-            print(f"  ❌ Error: {str(e)}")
-            error_count += 1
-
-    # Step 3: Summary
+    expiring_before = None
+    if expiring_within_days is not None:
+        expiring_before = datetime.now(timezone.utc) + timedelta(days=expiring_within_days)
+        print(f"⏳ Only refreshing URLs that expire before {expiring_before:%Y-%m-%d}\n")
+
+    last_photo_id = None if restart else load_checkpoint(checkpoint_file)
+    if last_photo_id:
+        print(f"↩️  Resuming after photo {last_photo_id[:8]} (use --restart to start over)\n")
+
+    stats = {"scanned": 0, "skipped": 0, "updated": 0, "errors": 0}
+    stats_lock = threading.Lock()
+
+    # Pages finish out of order; only checkpoint the completed prefix
+    completed = {}
+    next_to_checkpoint = 0
+    page_end_ids = []
+
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        in_flight = {}
+        page_number = 0
+
+        while True:
+            photos = fetch_page(supabase, last_photo_id, page_size)
+            if not photos:
+                break
+
+            last_photo_id = photos[-1]["photo_id"]
+            page_end_ids.append(last_photo_id)
+
+            due = [p for p in photos if needs_refresh(p, expiring_before)]
+            with stats_lock:
+                stats["scanned"] += len(photos)
+                stats["skipped"] += len(photos) - len(due)
+
+            in_flight[pool.submit(refresh_page, supabase, due)] = page_number
+            page_number += 1
+
+            # Bound concurrency: wait for a slot before fetching more pages
+            while len(in_flight) >= workers:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    completed[in_flight.pop(future)] = future
+
+            while next_to_checkpoint in completed:
+                future = completed.pop(next_to_checkpoint)
+                try:
+                    page_stats = future.result()
+                except Exception as e:
+                    print(f"  ❌ Page {next_to_checkpoint + 1} failed: {str(e)}")
+                    print("     Stopping - rerun the script to resume from the last checkpoint.")
+                    return
+                with stats_lock:
+                    stats["updated"] += page_stats["updated"]
+                    stats["errors"] += page_stats["errors"]
+                save_checkpoint(checkpoint_file, page_end_ids[next_to_checkpoint], stats)
+                next_to_checkpoint += 1
+
+                print(f"📄 Page {next_to_checkpoint}: {stats['scanned']} scanned, "
+                      f"{stats['updated']} updated, {stats['errors']} errors")
+
+        for future in in_flight:
+            completed[in_flight[future]] = future
+
+        for page in sorted(completed):
+            try:
+                page_stats = completed[page].result()
+            except Exception as e:
+                print(f"  ❌ Page {page + 1} failed: {str(e)}")
+                print("     Stopping - rerun the script to resume from the last checkpoint.")
+                return
+            stats["updated"] += page_stats["updated"]
+            stats["errors"] += page_stats["errors"]
+            save_checkpoint(checkpoint_file, page_end_ids[page], stats)
+
+    # Finished cleanly - the next run should start from the beginning
+    if os.path.exists(checkpoint_file):
+        os.remove(checkpoint_file)
+
+    # Summary
     print("\n" + "=" * 50)
     print("📊 Refresh Summary:")
-    print(f"   ✅ Successfully updated: {success_count} photos")
-    if error_count > 0:
-        print(f"   ❌ Errors: {error_count} photos")
-    print(f"   📁 Total processed: {len(photos)} photos")
+    print(f"   ✅ Successfully updated: {stats['updated']} photos")
+    if stats["skipped"] > 0:
+        print(f"   ⏭️  Not expiring soon (skipped): {stats['skipped']} photos")
+    if stats["errors"] > 0:
+        print(f"   ❌ Errors: {stats['errors']} photos")
+    print(f"   📁 Total scanned: {stats['scanned']} photos")
+    print(f"   ⏱️  Took {time.monotonic() - started:.1f}s")
     print("=" * 50)
 
-    if success_count > 0:
+    if stats["updated"] > 0:
         print("\n✨ URL refresh complete! Your photos should now display correctly.")
-    if error_count > 0:
+    if stats["errors"] > 0:
         print("\n⚠️  Some photos had errors. Check the logs above for details.")
 
 
@@ -117,20 +348,51 @@ def verify_bucket_access():
 
     try:
         # Try to list files in bucket (even if empty)
-        result = supabase.storage.from_("baby-photos").list()
-        print(f"✅ Bucket 'baby-photos' is accessible")
+        result = supabase.storage.from_(BUCKET).list()
+        print(f"✅ Bucket '{BUCKET}' is accessible")
         print(f"   Found {len(result)} items in root directory\n")
         return True
     except Exception as e:
         print(f"❌ Bucket access error: {str(e)}\n")
         print("Please ensure:")
-        print("  1. Bucket 'baby-photos' exists in Supabase Storage")
+        print(f"  1. Bucket '{BUCKET}' exists in Supabase Storage")
         print("  2. You're using SUPABASE_SERVICE_ROLE_KEY (not ANON_KEY)")
         print("  3. Storage policies allow authenticated reads\n")
         return False
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Regenerate signed URLs for photos.")
+    parser.add_argument(
+        "--expiring-within-days", type=int, default=None,
+        help="Only refresh URLs that expire within this many days"
+    )
+    parser.add_argument(
+        "--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+        help=f"Photos per page (default {DEFAULT_PAGE_SIZE})"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS,
+        help=f"Pages processed in parallel (default {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        "--checkpoint-file", default=DEFAULT_CHECKPOINT_FILE,
+        help="Progress file used to resume an interrupted run"
+    )
+    parser.add_argument(
+        "--restart", action="store_true",
+        help="Ignore the checkpoint and start from the first photo"
+    )
+    parser.add_argument(
+        "--yes", action="store_true",
+        help="Don't ask for confirmation"
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+
     print("\n" + "=" * 50)
     print("🔄 Photo URL Refresh Utility")
     print("=" * 50 + "\n")
@@ -149,13 +411,22 @@ if __name__ == "__main__":
         exit(1)
 
     # Confirm with user
-    print("⚠️  This will regenerate signed URLs for ALL photos in the database.")
+    if args.expiring_within_days is None:
+        print("⚠️  This will regenerate signed URLs for ALL photos in the database.")
+    else:
+        print(f"⚠️  This will regenerate signed URLs expiring within {args.expiring_within_days} days.")
     print("   Old URLs will be replaced with new ones (expires in 10 years).\n")
 
-    response = input("Continue? (yes/no): ").strip().lower()
+    response = "yes" if args.yes else input("Continue? (yes/no): ").strip().lower()
 
     if response in ["yes", "y"]:
         print()
-        refresh_all_photo_urls()
+        refresh_all_photo_urls(
+            expiring_within_days=args.expiring_within_days,
+            page_size=args.page_size,
+            workers=args.workers,
+            checkpoint_file=args.checkpoint_file,
+            restart=args.restart
+        )
     else:
         print("\n❌ Refresh cancelled by user.")
@@ -4,22 +4,64 @@ Handles user login, logout, and session management using Supabase Auth.
 """
 
 import streamlit as st
+import httpx
 from supabase import Client, create_client
+from supabase.lib.client_options import SyncClientOptions
 import os
 from dotenv import load_dotenv
 from typing import Tuple, Optional
+from src.constants import (
+    HTTP_POOL_MAX_CONNECTIONS,
+    HTTP_POOL_MAX_KEEPALIVE,
+    HTTP_TIMEOUT_SECONDS
+)
 
 # Load environment variables from .env file (local development only)
 # On Streamlit Cloud, use the Secrets management in dashboard instead
 load_dotenv(override=False)
 
+# BABY_TIMELINE_BACKEND=local swaps Supabase for SQLite + a local directory
+# (see src/local_backend.py) for offline benchmarks and load tests
+BACKEND_ENV = "BABY_TIMELINE_BACKEND"
+LOCAL_BACKEND_DIR_ENV = "LOCAL_BACKEND_DIR"
+DEFAULT_LOCAL_BACKEND_DIR = ".local_backend"
 
-def init_supabase() -> Client:
+
+def _use_local_backend() -> bool:
+    return os.getenv(BACKEND_ENV, "supabase").lower() == "local"
+
+
+def _local_backend_dir() -> str:
+    return os.getenv(LOCAL_BACKEND_DIR_ENV, DEFAULT_LOCAL_BACKEND_DIR)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_http_transport() -> httpx.Client:
     """
-    Initialize Supabase client (cached per session)
+    Process-wide HTTP connection pool shared by every Supabase client.
 
     Returns:
-        Client: Authenticated Supabase client
+        httpx.Client with keep-alive connections
+
+    Note:
+        supabase-py sends auth headers per request, so one transport can
+        safely serve the anon client and every logged-in admin client.
+        Reusing it avoids a new TLS handshake on every Streamlit rerun.
+    """
+    return httpx.Client(
+        http2=True,
+        follow_redirects=True,
+        timeout=HTTP_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE
+        )
+    )
+
+
+def _get_credentials() -> Tuple[str, str]:
+    """
+    Read Supabase URL and anon key from the environment.
 
     Raises:
         ValueError: If environment variables are not set
@@ -38,13 +80,72 @@ def init_supabase() -> Client:
             "See SUPABASE_SETUP.md for details."
         )
 
-    # Create client with explicit named parameters (compatible with supabase-py 2.7+)
+    return url, key
+
+
+def _create_client(url: str, key: str) -> Client:
+    """Create a Supabase client that uses the shared HTTP transport."""
     return create_client(
         supabase_url=url,
-        supabase_key=key
+        supabase_key=key,
+        options=SyncClientOptions(httpx_client=_get_http_transport())
     )
 
 
+@st.cache_resource(show_spinner=False)
+def _get_anon_client(url: str, key: str) -> Client:
+    """Process-wide anon client (one per URL/key pair)."""
+    return _create_client(url, key)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_local_client(directory: str) -> Client:
+    """Process-wide anon client for the local backend."""
+    from src.local_backend import LocalClient
+    return LocalClient(directory)
+
+
+def init_supabase() -> Client:
+    """
+    Get the shared anonymous Supabase client (cached per process)
+
+    Returns:
+        Client: Supabase client using the anon key (or a LocalClient when
+        BABY_TIMELINE_BACKEND=local)
+
+    Raises:
+        ValueError: If environment variables are not set
+
+    Note:
+        The returned client is shared by all sessions, so never sign in
+        with it. Use create_user_client() for per-user auth.
+    """
+    if _use_local_backend():
+        return _get_local_client(_local_backend_dir())
+
+    url, key = _get_credentials()
+    return _get_anon_client(url, key)
+
+
+def create_user_client() -> Client:
+    """
+    Create a per-session Supabase client for an admin login
+
+    Returns:
+        Client: New client whose auth headers belong to one user
+
+    Note:
+        The client object is cheap; its HTTP connections come from the
+        shared transport, so logging in does not open a new connection pool.
+    """
+    if _use_local_backend():
+        from src.local_backend import LocalClient
+        return LocalClient(_local_backend_dir())
+
+    url, key = _get_credentials()
+    return _create_client(url, key)
+
+
 def login(email: str, password: str) -> Tuple[bool, str]:
     """
     Authenticate user with Supabase Auth
@@ -66,7 +167,8 @@ def login(email: str, password: str) -> Tuple[bool, str]:
         - supabase: Authenticated Supabase client
     """
     try:
-        supabase = init_supabase()
+        # Per-user client: signing in must not touch the shared anon client
+        supabase = create_user_client()
 
         # Attempt sign in
         response = supabase.auth.sign_in_with_password({
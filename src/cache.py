@@ -0,0 +1,192 @@
+"""
+Query Cache for Baby Timeline
+Read-through, TTL- and size-bounded cache for database reads.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+from src.constants import QUERY_CACHE_TTL_SECONDS, QUERY_CACHE_MAX_ENTRIES
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Cache key: (baby_id, namespace, client scope, query shape)
+CacheKey = Tuple[Optional[str], str, str, Hashable]
+
+
+def client_scope(supabase) -> str:
+    """
+    Identify whose permissions a client queries with.
+
+    Args:
+        supabase: Supabase client
+
+    Returns:
+        The client's Authorization header (anon key or user JWT)
+
+    Note:
+        RLS can return different rows for an admin and an anonymous viewer,
+        so cached results are never shared between the two.
+    """
+    options = getattr(supabase, "options", None)
+    headers = getattr(options, "headers", None) or {}
+    return headers.get("Authorization", "")
+
+
+class QueryCache:
+    """
+    Thread-safe read-through cache with per-baby invalidation.
+
+    Entries expire after ttl_seconds and the least recently used entry is
+    evicted once max_entries is reached. Writes call invalidate() with the
+    namespaces they affect, so only the stale queries are dropped.
+
+    Every invalidate(), update() and clear() bumps a generation counter of
+    the (baby, namespace) it touches; a load that started before the bump
+    returns its result but doesn't cache it, so a slow query can't put
+    pre-write data back for a full TTL.
+
+    Usage:
+        rows = query_cache.get_or_load(
+            baby_id, "measurements", (limit, ascending), scope,
+            lambda: fetch_rows()
+        )
+        query_cache.invalidate(baby_id, ["measurements", "timeline"])
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._keys_by_baby: Dict[Optional[str], Set[CacheKey]] = {}
+        # (baby_id, namespace) -> writes seen; baby_id -> whole-baby invalidations
+        self._generations: Dict[Tuple[Optional[str], str], int] = {}
+        self._baby_generations: Dict[Optional[str], int] = {}
+        self._clear_generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(
+        self,
+        baby_id: Optional[str],
+        namespace: str,
+        shape: Hashable,
+        scope: str,
+        loader: Callable[[], Any]
+    ) -> Any:
+        """
+        Return the cached value, or call loader() and cache its result.
+
+        Args:
+            baby_id: UUID of the baby the query reads (None for cross-baby queries)
+            namespace: Query family used for invalidation (e.g., "measurements")
+            shape: Hashable description of the query parameters
+            scope: Client scope from client_scope()
+            loader: Function that runs the query; exceptions are not cached
+
+        Returns:
+            Cached or freshly loaded value (treat as read-only)
+        """
+        key = (baby_id, namespace, scope, shape)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    return value
+                self._remove(key)
+            generation = self._generation(baby_id, namespace)
+
+        # Load outside the lock so slow queries don't block other sessions
+        value = loader()
+
+        with self._lock:
+            if self._generation(baby_id, namespace) != generation:
+                return value  # Invalidated or patched while loading: don't cache stale data
+
+            self._entries[key] = (now + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            self._keys_by_baby.setdefault(baby_id, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+        return value
+
+    def invalidate(self, baby_id: Optional[str], namespaces: Optional[Iterable[str]] = None) -> None:
+        """
+        Drop cached queries for a baby.
+
+        Args:
+            baby_id: UUID of the baby whose data changed
+            namespaces: Query families to drop (None = all of them)
+        """
+        namespaces = set(namespaces) if namespaces is not None else None
+
+        with self._lock:
+            if namespaces is None:
+                self._baby_generations[baby_id] = self._baby_generations.get(baby_id, 0) + 1
+            else:
+                for namespace in namespaces:
+                    self._bump(baby_id, namespace)
+
+            for key in list(self._keys_by_baby.get(baby_id, ())):
+                if namespaces is None or key[1] in namespaces:
+                    self._remove(key)
+
+    def update(self, baby_id: Optional[str], namespace: str, updater: Callable[[Any], Any]) -> None:
+        """
+        Patch cached values in place of invalidating them.
+
+        Args:
+            baby_id: UUID of the baby whose data changed
+            namespace: Query family to patch
+            updater: Function returning a new value from the cached one
+                (must not mutate its argument; expiry is kept as is)
+        """
+        with self._lock:
+            self._bump(baby_id, namespace)
+            for key in list(self._keys_by_baby.get(baby_id, ())):
+                if key[1] == namespace:
+                    expires_at, value = self._entries[key]
+                    self._entries[key] = (expires_at, updater(value))
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_baby.clear()
+            self._clear_generation += 1
+
+    def _generation(self, baby_id: Optional[str], namespace: str) -> Tuple[int, int, int]:
+        """Current generation of a (baby, namespace) (caller must hold the lock)."""
+        return (
+            self._clear_generation,
+            self._baby_generations.get(baby_id, 0),
+            self._generations.get((baby_id, namespace), 0)
+        )
+
+    def _bump(self, baby_id: Optional[str], namespace: str) -> None:
+        """Record a write to a (baby, namespace) (caller must hold the lock)."""
+        self._generations[(baby_id, namespace)] = self._generations.get((baby_id, namespace), 0) + 1
+
+    def _remove(self, key: CacheKey) -> None:
+        """Remove one entry (caller must hold the lock)."""
+        self._entries.pop(key, None)
+        keys = self._keys_by_baby.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_baby[key[0]]
+
+
+# Process-wide cache shared by all sessions
+query_cache = QueryCache(
+    max_entries=QUERY_CACHE_MAX_ENTRIES,
+    ttl_seconds=QUERY_CACHE_TTL_SECONDS
+)
@@ -11,13 +11,66 @@ Centralized location for all magic numbers and configuration values.
 DEFAULT_MAX_IMAGE_WIDTH = 1920  # Maximum width for uploaded photos (pixels)
 DEFAULT_IMAGE_QUALITY = 85  # JPEG quality (0-100, higher = better quality)
 
+# Decode limits (decompression-bomb protection, checked from the file header)
+MAX_IMAGE_PIXELS = 100_000_000  # Larger images are rejected before decoding
+DECODE_PIXEL_BUDGET = 32_000_000  # Pixels decoded at once (~128 MB at 4 bytes each)
+
+# Adaptive JPEG quality: lowest quality whose SSIM (luma and chroma at
+# encoded resolution) reaches the target, found by binary search. Opt-in:
+# costs ~1s of CPU per photo (2-4 trial encodes plus SSIM) versus ~0.1s fixed
+ADAPTIVE_IMAGE_QUALITY = False  # True = search per photo instead of DEFAULT_IMAGE_QUALITY
+ADAPTIVE_SSIM_TARGET = 0.99  # No visible artifacts at full size
+ADAPTIVE_QUALITY_MIN = 75  # Floor even for very smooth photos
+ADAPTIVE_QUALITY_MAX = 92  # Tried only if the baseline fails; not reaching the target keeps the baseline
+ADAPTIVE_MAX_TRIALS = 4  # Trial encodes per photo (baseline + 3 bisections)
+
+# Display derivatives generated at upload time (name -> max width in pixels)
+THUMBNAIL_SIZES = {"small": 320, "medium": 800}
+THUMBNAIL_QUALITY = 80  # Lower quality is invisible at thumbnail sizes
+
+# Modern formats encoded next to each JPEG derivative (Pillow save options).
+# Skipped when Pillow lacks the codec; kept only when smaller than the JPEG.
+DERIVATIVE_VARIANT_FORMATS = {
+    "avif": {"quality": 55, "speed": 8},  # ~50% smaller than JPEG
+    "webp": {"quality": 75, "method": 4}  # ~35% smaller than JPEG
+}
+
+# Inline placeholder (LQIP) shown blurred while the real image downloads
+PLACEHOLDER_WIDTH = 16  # Pixels; ~400 bytes of JPEG, mostly header
+PLACEHOLDER_QUALITY = 40
+
+# Bulk upload parallelism
+IMAGE_PROCESS_WORKERS = 2  # Processes for CPU-bound image optimization (shared by all sessions)
+IMAGE_PROCESS_TIMEOUT_SECONDS = 60  # Processing time allowed per photo
+UPLOAD_THREAD_WORKERS = 4  # Threads for concurrent storage uploads
+
+# Background upload queue (single-photo uploads)
+UPLOAD_QUEUE_WORKERS = 2  # Threads ingesting queued photos per server process
+UPLOAD_MAX_ATTEMPTS = 4  # Tries per photo before a transient error is final
+UPLOAD_RETRY_BASE_SECONDS = 2  # Backoff: 2s, 4s, 8s (+ jitter)
+UPLOAD_JOB_RETENTION_SECONDS = 3600  # Finished jobs stay visible for 1 hour
+UPLOAD_STATUS_REFRESH_SECONDS = 2  # Live status polling interval
+
+# Near-duplicate detection (64-bit dHash, compared by Hamming distance)
+NEAR_DUPLICATE_MAX_DISTANCE = 6  # Bits that may differ between burst shots
+NEAR_DUPLICATE_BACKFILL_BATCH = 50  # Older photos hashed per backfill click
+NEAR_DUPLICATE_INDEX_PAGE_SIZE = 500  # Hashes per request (under PostgREST's default max-rows of 1000)
+NEAR_DUPLICATE_FETCH_CHUNK = 200  # Photo ids per .in_() request (URL length)
+
 # Storage limits
 MAX_FILE_SIZE_MB = 10  # Maximum upload size per photo
 AVG_OPTIMIZED_PHOTO_SIZE_MB = 1.0  # Average size after optimization
 STORAGE_LIMIT_FREE_TIER_MB = 1000  # Supabase free tier limit
 
-# Signed URL expiration
-SIGNED_URL_EXPIRY_SECONDS = 315360000  # 10 years (for private bucket URLs)
+# Shared HTTP connection pool for Supabase clients (per server process)
+HTTP_POOL_MAX_CONNECTIONS = 20
+HTTP_POOL_MAX_KEEPALIVE = 10
+HTTP_TIMEOUT_SECONDS = 30
+
+# Signed URLs (minted on demand from photos.storage_path)
+SIGNED_URL_TTL_SECONDS = 3600  # 1 hour - leaked links stop working quickly
+SIGNED_URL_REFRESH_MARGIN_SECONDS = 300  # Re-sign cached URLs 5 minutes before expiry
+SIGNED_URL_CACHE_MAX_ENTRIES = 4096  # Cached URLs per server process
 
 # ============================================================================
 # Measurement Validation
@@ -50,6 +103,15 @@ CHART_COLOR_HEIGHT = "#32CD32"  # Lime green for height charts
 # Timeline display
 DEFAULT_TIMELINE_LIMIT = 50  # Number of items to fetch per timeline view
 DEFAULT_RECENT_PHOTOS_LIMIT = 5  # Number of recent photos to display
+TIMELINE_PHOTO_DISPLAY_WIDTH = 320  # Timeline photo column (~1/4 of wide layout)
+RECENT_PHOTO_DISPLAY_WIDTH = 320  # Recent uploads thumbnail column (~1/5 of page)
+
+# ============================================================================
+# Query Cache Configuration
+# ============================================================================
+
+QUERY_CACHE_TTL_SECONDS = 300  # Cached reads expire after 5 minutes
+QUERY_CACHE_MAX_ENTRIES = 512  # Least recently used entries evicted beyond this
 
 # ============================================================================
 # Session State Keys (prevents typos across the app)
@@ -60,6 +122,8 @@ SESSION_USER = "user"
 SESSION_VIEWER_MODE = "viewer_mode"
 SESSION_VIEWER_BABY_ID = "viewer_baby_id"
 SESSION_VIEWER_AUTHENTICATED = "viewer_authenticated"
+SESSION_VIEWER_CREDENTIAL = "viewer_credential"
+SESSION_VIEWER_SHARE_TOKEN = "viewer_share_token"
 
 # ============================================================================
 # Date and Time Configuration
@@ -75,3 +139,8 @@ DATE_RANGE_1_YEAR = 365
 # ============================================================================
 
 MIN_PASSWORD_LENGTH = 4  # Minimum password length for share links
+
+# Viewer sessions: bcrypt runs once, later visits present a signed credential
+VIEWER_SESSION_TTL_SECONDS = 4 * 60 * 60  # Signed viewer credential lifetime
+VIEWER_SESSION_QUERY_PARAM = "viewer_session"  # Legacy URL parameter, stripped on load (never trusted)
+SHARE_LINK_CHECK_TTL_SECONDS = 60  # Revocation checks are cached this long
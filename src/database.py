@@ -3,22 +3,72 @@ Database Module for Baby Timeline
 Handles CRUD operations for measurements and other database entities.
 """
 
+import heapq
 import streamlit as st
+from itertools import islice
 from supabase import Client
+from postgrest.exceptions import APIError
 from datetime import datetime, date
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Iterator
 from src.constants import (
     MIN_WEIGHT_KG,
     MAX_WEIGHT_KG,
     MIN_HEIGHT_CM,
     MAX_HEIGHT_CM,
-    MAX_NOTES_LENGTH
+    MAX_NOTES_LENGTH,
+    DEFAULT_TIMELINE_LIMIT
 )
 from src.validators import validate_weight, validate_height
+from src.cache import query_cache, client_scope
+from src.signed_urls import resolve_photo_urls
 from src.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Cached query families that change when a measurement is written
+MEASUREMENT_CACHE_NAMESPACES = ("measurements", "timeline")
+
+# PostgREST / Postgres codes for "function does not exist"
+MISSING_FUNCTION_CODES = ("PGRST202", "42883")
+
+# Named column sets: each view fetches only the columns it renders.
+# Photo cards read derivative info straight out of exif_data (JSON path),
+# not the whole EXIF blob.
+PROJECTIONS = {
+    "measurements": {
+        "chart_points": "measurement_id, measurement_date, weight_kg, height_cm",
+        "table_row": "measurement_id, measurement_date, weight_kg, height_cm, notes",
+        "timeline_card": "measurement_id, measurement_date, weight_kg, height_cm, notes",
+        "full": "*"
+    },
+    "photos": {
+        "timeline_card": (
+            "photo_id, photo_date, caption, upload_date, storage_path, "
+            "file_url, thumbnail_url, placeholder, derivatives:exif_data->derivatives"
+        ),
+        "full": "*"
+    }
+}
+
+
+def resolve_projection(table: str, columns: str) -> str:
+    """
+    Turn a projection name or explicit column list into a select() string.
+
+    Args:
+        table: Table being queried ("measurements", "photos")
+        columns: Name from PROJECTIONS (e.g., "chart_points") or an explicit
+            comma-separated column list (e.g., "measurement_id, notes")
+
+    Returns:
+        Column list for supabase.table(table).select(...)
+
+    Example:
+        resolve_projection("measurements", "chart_points")
+        # → "measurement_id, measurement_date, weight_kg, height_cm"
+    """
+    return PROJECTIONS.get(table, {}).get(columns, columns)
+
 
 # ============================================================================
 # Measurements CRUD Operations
@@ -92,6 +142,8 @@ def add_measurement(
             raise Exception("Database insert failed - no data returned")
 
         measurement_id = result.data[0]["measurement_id"]
+        query_cache.invalidate(baby_id, MEASUREMENT_CACHE_NAMESPACES)
+        adjust_timeline_month_index(baby_id, "measurement", measurement_data["measurement_date"], +1)
 
         # Build success message
         parts = []
@@ -121,7 +173,8 @@ def get_measurements(
     baby_id: str,
     limit: Optional[int] = None,
     order_by: str = "measurement_date",
-    ascending: bool = False
+    ascending: bool = False,
+    columns: str = "table_row"
 ) -> List[Dict]:
     """
     Get all measurements for a baby.
@@ -132,18 +185,21 @@ def get_measurements(
         limit: Maximum number of records to return (None = all)
         order_by: Field to sort by (default: measurement_date)
         ascending: Sort order (False = newest first)
+        columns: Projection name from PROJECTIONS or explicit column list
 
     Returns:
-        List of measurement dictionaries
+        List of measurement dictionaries (only the requested columns)
 
     Example:
         measurements = get_measurements(supabase, baby_id, limit=10)
         for m in measurements:
             logger.debug(f"{m['measurement_date']}: {m['weight_kg']} kg")
     """
-    try:
+    select = resolve_projection("measurements", columns)
+
+    def fetch() -> List[Dict]:
         query = supabase.table("measurements") \
-            .select("*") \
+            .select(select) \
             .eq("baby_id", baby_id) \
             .order(order_by, desc=not ascending)
 
@@ -154,6 +210,12 @@ def get_measurements(
 
         return result.data if result.data else []
 
+    try:
+        return query_cache.get_or_load(
+            baby_id, "measurements", ("list", limit, order_by, ascending, select),
+            client_scope(supabase), fetch
+        )
+
     except Exception as e:
         logger.error(f"Error fetching measurements: {e}", exc_info=True)
         return []
@@ -241,6 +303,8 @@ def update_measurement(
         if not result.data:
             return False, "❌ Measurement not found or permission denied"
 
+        query_cache.invalidate(result.data[0]["baby_id"], MEASUREMENT_CACHE_NAMESPACES)
+
         return True, "✅ Measurement updated successfully"
 
     except Exception as e:
@@ -273,6 +337,10 @@ def delete_measurement(
         if not result.data:
             return False, "❌ Measurement not found or permission denied"
 
+        deleted = result.data[0]
+        query_cache.invalidate(deleted["baby_id"], MEASUREMENT_CACHE_NAMESPACES)
+        adjust_timeline_month_index(deleted["baby_id"], "measurement", deleted["measurement_date"], -1)
+
         return True, "✅ Measurement deleted successfully"
 
     except Exception as e:
@@ -290,7 +358,7 @@ def get_measurements_count(supabase: Client, baby_id: str) -> int:
     Returns:
         Count of measurements
     """
-    try:
+    def fetch() -> int:
         result = supabase.table("measurements") \
             .select("measurement_id", count="exact") \
             .eq("baby_id", baby_id) \
@@ -298,6 +366,11 @@ def get_measurements_count(supabase: Client, baby_id: str) -> int:
 
         return result.count or 0
 
+    try:
+        return query_cache.get_or_load(
+            baby_id, "measurements", ("count",), client_scope(supabase), fetch
+        )
+
     except Exception as e:
         logger.error(f"Error counting measurements: {e}", exc_info=True)
         return 0
@@ -328,7 +401,8 @@ def get_measurements_by_date_range(
     supabase: Client,
     baby_id: str,
     start_date: date,
-    end_date: date
+    end_date: date,
+    columns: str = "chart_points"
 ) -> List[Dict]:
     """
     Get measurements within a date range.
@@ -338,6 +412,7 @@ def get_measurements_by_date_range(
         baby_id: UUID of the baby
         start_date: Start date (inclusive)
         end_date: End date (inclusive)
+        columns: Projection name from PROJECTIONS or explicit column list
 
     Returns:
         List of measurements in date range
@@ -345,22 +420,384 @@ def get_measurements_by_date_range(
     Use case:
         Filter growth chart to specific time period
     """
-    try:
+    start, end = start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+    select = resolve_projection("measurements", columns)
+
+    def fetch() -> List[Dict]:
         result = supabase.table("measurements") \
-            .select("*") \
+            .select(select) \
             .eq("baby_id", baby_id) \
-            .gte("measurement_date", start_date.strftime("%Y-%m-%d")) \
-            .lte("measurement_date", end_date.strftime("%Y-%m-%d")) \
+            .gte("measurement_date", start) \
+            .lte("measurement_date", end) \
             .order("measurement_date", desc=False) \
             .execute()
 
         return result.data if result.data else []
 
+    try:
+        return query_cache.get_or_load(
+            baby_id, "measurements", ("range", start, end, select), client_scope(supabase), fetch
+        )
+
     except Exception as e:
         logger.error(f"Error fetching measurements by date range: {e}", exc_info=True)
         return []
 
 
+# ============================================================================
+# Timeline Operations (keyset pagination)
+# ============================================================================
+
+# Timeline item type -> (table, date column, id column)
+TIMELINE_SOURCES = {
+    "photo": ("photos", "photo_date", "photo_id"),
+    "measurement": ("measurements", "measurement_date", "measurement_id")
+}
+
+# Cursor = (date "YYYY-MM-DD", row id) of the last item on the previous page
+TimelineCursor = Tuple[str, str]
+
+
+def _iter_timeline_source(
+    supabase: Client,
+    item_type: str,
+    baby_id: str,
+    cursor: Optional[TimelineCursor],
+    newest_first: bool,
+    batch_size: int,
+    columns: str
+) -> Iterator[Dict]:
+    """
+    Stream one table's rows in (date, id) order, starting after the cursor.
+
+    Rows are fetched lazily in batches, so a consumer that stops early
+    never triggers more than one query.
+    """
+    table, date_col, id_col = TIMELINE_SOURCES[item_type]
+    op = "lt" if newest_first else "gt"
+    select = resolve_projection(table, columns)
+
+    while True:
+        query = supabase.table(table) \
+            .select(select) \
+            .eq("baby_id", baby_id)
+
+        if cursor:
+            cursor_date, cursor_id = cursor
+            # (date, id) < cursor  ⇔  date < d  OR  (date = d AND id < i)
+            query = query.or_(
+                f"{date_col}.{op}.{cursor_date},"
+                f"and({date_col}.eq.{cursor_date},{id_col}.{op}.{cursor_id})"
+            )
+
+        result = query \
+            .order(date_col, desc=newest_first) \
+            .order(id_col, desc=newest_first) \
+            .limit(batch_size) \
+            .execute()
+
+        rows = result.data if result.data else []
+
+        for row in rows:
+            yield {
+                "type": item_type,
+                "date": row[date_col],
+                "id": row[id_col],
+                "data": row
+            }
+
+        if len(rows) < batch_size:
+            return
+
+        cursor = (rows[-1][date_col], rows[-1][id_col])
+
+
+def get_timeline_page(
+    supabase: Client,
+    baby_id: str,
+    cursor: Optional[TimelineCursor] = None,
+    page_size: int = DEFAULT_TIMELINE_LIMIT,
+    newest_first: bool = True,
+    item_types: Tuple[str, ...] = ("photo", "measurement"),
+    columns: str = "timeline_card"
+) -> Tuple[List[Dict], Optional[TimelineCursor]]:
+    """
+    Get one page of the combined photo + measurement timeline.
+
+    Args:
+        supabase: Supabase client
+        baby_id: UUID of the baby
+        cursor: Cursor returned by the previous page (None = first page)
+        page_size: Number of items per page
+        newest_first: Sort order (True = newest first)
+        item_types: Which sources to include ("photo", "measurement")
+        columns: Projection name applied to every source (must include
+            the date and id columns used by the cursor)
+
+    Returns:
+        Tuple of (items, next_cursor)
+        - items: List of {"type", "date", "id", "data"} dicts
+          (photo data carries freshly signed URLs)
+        - next_cursor: Pass to the next call, or None if no more items
+
+    Performance:
+        Each source is read with a keyset query (date, id) > cursor backed by
+        the (baby_id, date, id) index, and the sorted streams are combined
+        with a heap-based k-way merge. Every page costs at most one query
+        per source regardless of how much history exists, plus one batched
+        signing request for photo URLs not already cached.
+
+    Example:
+        items, cursor = get_timeline_page(supabase, baby_id)
+        more, cursor = get_timeline_page(supabase, baby_id, cursor=cursor)
+    """
+    def fetch() -> Tuple[List[Dict], Optional[TimelineCursor]]:
+        # Fetch one extra row per source to know whether another page exists
+        sources = [
+            _iter_timeline_source(
+                supabase, item_type, baby_id, cursor, newest_first, page_size + 1, columns
+            )
+            for item_type in item_types
+        ]
+
+        merged = heapq.merge(
+            *sources,
+            key=lambda item: (item["date"], item["id"]),
+            reverse=newest_first
+        )
+        items = list(islice(merged, page_size + 1))
+
+        if len(items) > page_size:
+            items = items[:page_size]
+            last = items[-1]
+            return items, (last["date"], last["id"])
+
+        return items, None
+
+    try:
+        items, next_cursor = query_cache.get_or_load(
+            baby_id, "timeline",
+            (tuple(cursor) if cursor else None, page_size, newest_first, tuple(item_types), columns),
+            client_scope(supabase), fetch
+        )
+
+        # URLs are short-lived, so sign them after the cache, never inside it
+        return _sign_timeline_items(supabase, items), next_cursor
+
+    except Exception as e:
+        logger.error(f"Error fetching timeline page: {e}", exc_info=True)
+        return [], None
+
+
+def _sign_timeline_items(supabase: Client, items: List[Dict]) -> List[Dict]:
+    """Return copies of timeline items with signed URLs on every photo."""
+    photos = resolve_photo_urls(
+        supabase, [item["data"] for item in items if item["type"] == "photo"]
+    )
+    signed = iter(photos)
+    return [
+        {**item, "data": next(signed)} if item["type"] == "photo" else item
+        for item in items
+    ]
+
+
+# ============================================================================
+# Timeline Month Index (jump-to-date navigation)
+# ============================================================================
+
+# Cache namespace of the month index; patched by writes, never invalidated
+MONTH_INDEX_NAMESPACE = "month_index"
+
+# Timeline item type -> count field in a month index entry
+MONTH_INDEX_COUNT_FIELDS = {
+    "photo": "photo_count",
+    "measurement": "measurement_count"
+}
+
+
+def _month_index_from_rows(supabase: Client, baby_id: str) -> List[Dict]:
+    """
+    Group item dates by month client-side.
+
+    Note:
+        Fallback for projects that haven't run migration 07 yet. Only the
+        date column of each row is transferred.
+    """
+    counts: Dict[Tuple[int, int], Dict] = {}
+
+    for item_type, (table, date_col, _) in TIMELINE_SOURCES.items():
+        result = supabase.table(table).select(date_col).eq("baby_id", baby_id).execute()
+
+        for row in result.data or []:
+            year, month = int(row[date_col][:4]), int(row[date_col][5:7])
+            entry = counts.setdefault(
+                (year, month), {"year": year, "month": month, "photo_count": 0, "measurement_count": 0}
+            )
+            entry[MONTH_INDEX_COUNT_FIELDS[item_type]] += 1
+
+    return [counts[key] for key in sorted(counts)]
+
+
+def get_timeline_month_index(supabase: Client, baby_id: str) -> List[Dict]:
+    """
+    Get the per-month item counts of a baby's timeline.
+
+    Args:
+        supabase: Supabase client
+        baby_id: UUID of the baby
+
+    Returns:
+        List of {"year", "month", "photo_count", "measurement_count"} dicts,
+        oldest month first, for every month that has at least one item
+
+    Performance:
+        Grouped in the database by the get_timeline_month_index function
+        (migration 07). The result stays cached and writes patch it through
+        adjust_timeline_month_index(), so it is rebuilt only after the
+        cache TTL expires.
+
+    Example:
+        for entry in get_timeline_month_index(supabase, baby_id):
+            print(entry["year"], entry["month"], entry["photo_count"])
+    """
+    def fetch() -> List[Dict]:
+        try:
+            result = supabase.rpc("get_timeline_month_index", {"p_baby_id": baby_id}).execute()
+        except APIError as e:
+            if e.code not in MISSING_FUNCTION_CODES:
+                raise
+            logger.warning("get_timeline_month_index function missing - run migration 07")
+            return _month_index_from_rows(supabase, baby_id)
+
+        return [
+            {
+                "year": int(row["year"]),
+                "month": int(row["month"]),
+                "photo_count": int(row["photo_count"]),
+                "measurement_count": int(row["measurement_count"])
+            }
+            for row in result.data or []
+        ]
+
+    try:
+        return query_cache.get_or_load(
+            baby_id, MONTH_INDEX_NAMESPACE, ("index",), client_scope(supabase), fetch
+        )
+
+    except Exception as e:
+        logger.error(f"Error fetching timeline month index: {e}", exc_info=True)
+        return []
+
+
+def adjust_timeline_month_index(baby_id: str, item_type: str, item_date: str, delta: int) -> None:
+    """
+    Patch cached month indexes after an item was added or deleted.
+
+    Args:
+        baby_id: UUID of the baby
+        item_type: "photo" or "measurement"
+        item_date: Date of the item ("YYYY-MM-DD")
+        delta: +1 for an insert, -1 for a delete
+
+    Note:
+        Months whose counts drop to zero are removed, so the index keeps
+        listing only months with items.
+    """
+    year, month = int(item_date[:4]), int(item_date[5:7])
+    field = MONTH_INDEX_COUNT_FIELDS[item_type]
+
+    def patch(entries: List[Dict]) -> List[Dict]:
+        patched = []
+        found = False
+
+        for entry in entries:
+            if (entry["year"], entry["month"]) == (year, month):
+                found = True
+                entry = {**entry, field: max(0, entry[field] + delta)}
+                if not entry["photo_count"] and not entry["measurement_count"]:
+                    continue
+            patched.append(entry)
+
+        if not found and delta > 0:
+            patched.append({
+                "year": year, "month": month, "photo_count": 0, "measurement_count": 0, field: delta
+            })
+            patched.sort(key=lambda entry: (entry["year"], entry["month"]))
+
+        return patched
+
+    query_cache.update(baby_id, MONTH_INDEX_NAMESPACE, patch)
+
+
+def get_timeline_month(
+    supabase: Client,
+    baby_id: str,
+    year: int,
+    month: int,
+    newest_first: bool = True,
+    item_types: Tuple[str, ...] = ("photo", "measurement"),
+    columns: str = "timeline_card"
+) -> List[Dict]:
+    """
+    Get every timeline item of one calendar month.
+
+    Args:
+        supabase: Supabase client
+        baby_id: UUID of the baby
+        year: Year of the month
+        month: Month (1-12)
+        newest_first: Sort order (True = newest first)
+        item_types: Which sources to include ("photo", "measurement")
+        columns: Projection name applied to every source
+
+    Returns:
+        List of {"type", "date", "id", "data"} dicts, like get_timeline_page()
+
+    Performance:
+        One date-bounded query per source (same index as the keyset pages),
+        so jumping to a month never reads the months in between.
+    """
+    start = date(year, month, 1).strftime("%Y-%m-%d")
+    end = (date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)).strftime("%Y-%m-%d")
+
+    def fetch() -> List[Dict]:
+        sources = []
+        for item_type in item_types:
+            table, date_col, id_col = TIMELINE_SOURCES[item_type]
+
+            result = supabase.table(table) \
+                .select(resolve_projection(table, columns)) \
+                .eq("baby_id", baby_id) \
+                .gte(date_col, start) \
+                .lt(date_col, end) \
+                .order(date_col, desc=newest_first) \
+                .order(id_col, desc=newest_first) \
+                .execute()
+
+            sources.append([
+                {"type": item_type, "date": row[date_col], "id": row[id_col], "data": row}
+                for row in result.data or []
+            ])
+
+        return list(heapq.merge(
+            *sources,
+            key=lambda item: (item["date"], item["id"]),
+            reverse=newest_first
+        ))
+
+    try:
+        items = query_cache.get_or_load(
+            baby_id, "timeline",
+            ("month", year, month, newest_first, tuple(item_types), columns),
+            client_scope(supabase), fetch
+        )
+        return _sign_timeline_items(supabase, items)
+
+    except Exception as e:
+        logger.error(f"Error fetching timeline month: {e}", exc_info=True)
+        return []
+
+
 # ============================================================================
 # Baby Profile Operations
 # ============================================================================
@@ -384,7 +821,7 @@ def get_baby_info(supabase: Client, baby_id: str) -> Optional[Dict]:
         - created_by: UUID
         - created_at: timestamp
     """
-    try:
+    def fetch() -> Optional[Dict]:
         result = supabase.table("babies") \
             .select("*") \
             .eq("baby_id", baby_id) \
@@ -392,11 +829,76 @@ def get_baby_info(supabase: Client, baby_id: str) -> Optional[Dict]:
 
         return result.data[0] if result.data else None
 
+    try:
+        return query_cache.get_or_load(
+            baby_id, "baby", ("info",), client_scope(supabase), fetch
+        )
+
     except Exception as e:
         logger.error(f"Error fetching baby info: {e}", exc_info=True)
         return None
 
 
+def get_babies(supabase: Client) -> List[Dict]:
+    """
+    Get all baby profiles visible to the client.
+
+    Args:
+        supabase: Supabase client (RLS limits admins to their own babies)
+
+    Returns:
+        List of baby dictionaries (MVP pages use the first one)
+    """
+    def fetch() -> List[Dict]:
+        result = supabase.table("babies").select("*").execute()
+        return result.data if result.data else []
+
+    try:
+        return query_cache.get_or_load(
+            None, "baby", ("all",), client_scope(supabase), fetch
+        )
+
+    except Exception as e:
+        logger.error(f"Error fetching babies: {e}", exc_info=True)
+        return []
+
+
+def create_baby_profile(
+    supabase: Client,
+    name: str,
+    birthdate: date,
+    user_id: Optional[str] = None
+) -> Tuple[bool, str, Optional[str]]:
+    """
+    Create a new baby profile.
+
+    Args:
+        supabase: Authenticated Supabase client
+        name: Baby's name or nickname
+        birthdate: Baby's birthdate
+        user_id: User ID of the creating admin
+
+    Returns:
+        Tuple of (success: bool, message: str, baby_id: str or None)
+    """
+    try:
+        result = supabase.table("babies").insert({
+            "name": name,
+            "birthdate": str(birthdate),
+            "created_by": user_id
+        }).execute()
+
+        if not result.data:
+            raise Exception("Database insert failed - no data returned")
+
+        query_cache.invalidate(None, ["baby"])
+
+        return True, f"✅ Profile created for {name}!", result.data[0]["baby_id"]
+
+    except Exception as e:
+        return False, f"❌ Error creating profile: {str(e)}", None
+
+
 def calculate_age(birthdate: date) -> Dict[str, int]:
     """
     Calculate age from birthdate.
@@ -463,6 +965,62 @@ def format_age(birthdate: date) -> str:
 # Statistics and Analytics
 # ============================================================================
 
+# Returned when a baby has no measurements (or stats can't be loaded)
+EMPTY_GROWTH_STATISTICS = {
+    "total_measurements": 0,
+    "first_measurement_date": None,
+    "latest_measurement_date": None,
+    "weight_change_kg": None,
+    "height_change_cm": None,
+    "avg_weight_kg": None,
+    "avg_height_cm": None
+}
+
+
+def _round_or_none(value, digits: int) -> Optional[float]:
+    """Round a numeric aggregate; 0 and NULL both become None (as before)."""
+    return round(float(value), digits) if value else None
+
+
+def _growth_statistics_from_rows(supabase: Client, baby_id: str) -> Dict:
+    """
+    Compute statistics client-side from every measurement row.
+
+    Note:
+        Fallback for projects that haven't run migration 06 yet.
+    """
+    measurements = get_measurements(supabase, baby_id, ascending=True, columns="chart_points")
+
+    if not measurements:
+        return dict(EMPTY_GROWTH_STATISTICS)
+
+    first = measurements[0]
+    latest = measurements[-1]
+
+    # Calculate changes
+    weight_change = None
+    if first.get("weight_kg") and latest.get("weight_kg"):
+        weight_change = latest["weight_kg"] - first["weight_kg"]
+
+    height_change = None
+    if first.get("height_cm") and latest.get("height_cm"):
+        height_change = latest["height_cm"] - first["height_cm"]
+
+    # Calculate averages
+    weights = [m["weight_kg"] for m in measurements if m.get("weight_kg")]
+    heights = [m["height_cm"] for m in measurements if m.get("height_cm")]
+
+    return {
+        "total_measurements": len(measurements),
+        "first_measurement_date": first["measurement_date"],
+        "latest_measurement_date": latest["measurement_date"],
+        "weight_change_kg": _round_or_none(weight_change, 2),
+        "height_change_cm": _round_or_none(height_change, 1),
+        "avg_weight_kg": _round_or_none(sum(weights) / len(weights) if weights else None, 2),
+        "avg_height_cm": _round_or_none(sum(heights) / len(heights) if heights else None, 1)
+    }
+
+
 def get_growth_statistics(supabase: Client, baby_id: str) -> Dict:
     """
     Calculate growth statistics for a baby.
@@ -483,58 +1041,40 @@ def get_growth_statistics(supabase: Client, baby_id: str) -> Dict:
 
     Use case:
         Display summary stats on dashboard
-    """
-    try:
-        measurements = get_measurements(supabase, baby_id, ascending=True)
-
-        if not measurements:
-            return {
-                "total_measurements": 0,
-                "first_measurement_date": None,
-                "latest_measurement_date": None,
-                "weight_change_kg": None,
-                "height_change_cm": None,
-                "avg_weight_kg": None,
-                "avg_height_cm": None
-            }
-
-        first = measurements[0]
-        latest = measurements[-1]
-
-        # Calculate changes
-        weight_change = None
-        if first.get("weight_kg") and latest.get("weight_kg"):
-            weight_change = latest["weight_kg"] - first["weight_kg"]
-
-        height_change = None
-        if first.get("height_cm") and latest.get("height_cm"):
-            height_change = latest["height_cm"] - first["height_cm"]
-
-        # Calculate averages
-        weights = [m["weight_kg"] for m in measurements if m.get("weight_kg")]
-        heights = [m["height_cm"] for m in measurements if m.get("height_cm")]
 
-        avg_weight = sum(weights) / len(weights) if weights else None
-        avg_height = sum(heights) / len(heights) if heights else None
+    Performance:
+        Aggregated in the database by the get_growth_statistics function
+        (migration 06): one small row on the wire however long the history.
+        Falls back to computing from all rows if the function is missing.
+    """
+    def fetch() -> Dict:
+        try:
+            result = supabase.rpc("get_growth_statistics", {"p_baby_id": baby_id}).execute()
+        except APIError as e:
+            if e.code not in MISSING_FUNCTION_CODES:
+                raise
+            logger.warning("get_growth_statistics function missing - run migration 06")
+            return _growth_statistics_from_rows(supabase, baby_id)
+
+        row = result.data[0] if result.data else None
+        if not row or not row["total_measurements"]:
+            return dict(EMPTY_GROWTH_STATISTICS)
 
         return {
-            "total_measurements": len(measurements),
-            "first_measurement_date": first["measurement_date"],
-            "latest_measurement_date": latest["measurement_date"],
-            "weight_change_kg": round(weight_change, 2) if weight_change else None,
-            "height_change_cm": round(height_change, 1) if height_change else None,
-            "avg_weight_kg": round(avg_weight, 2) if avg_weight else None,
-            "avg_height_cm": round(avg_height, 1) if avg_height else None
+            "total_measurements": int(row["total_measurements"]),
+            "first_measurement_date": row["first_measurement_date"],
+            "latest_measurement_date": row["latest_measurement_date"],
+            "weight_change_kg": _round_or_none(row["weight_change_kg"], 2),
+            "height_change_cm": _round_or_none(row["height_change_cm"], 1),
+            "avg_weight_kg": _round_or_none(row["avg_weight_kg"], 2),
+            "avg_height_cm": _round_or_none(row["avg_height_cm"], 1)
         }
 
+    try:
+        return query_cache.get_or_load(
+            baby_id, "measurements", ("stats",), client_scope(supabase), fetch
+        )
+
     except Exception as e:
         logger.error(f"Error calculating growth statistics: {e}", exc_info=True)
-        return {
-            "total_measurements": 0,
-            "first_measurement_date": None,
-            "latest_measurement_date": None,
-            "weight_change_kg": None,
-            "height_change_cm": None,
-            "avg_weight_kg": None,
-            "avg_height_cm": None
-        }
+        return dict(EMPTY_GROWTH_STATISTICS)
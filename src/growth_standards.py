@@ -0,0 +1,268 @@
+"""
+Growth Standards Module for Baby Timeline
+WHO Child Growth Standards (LMS method): z-scores, percentiles and percentile curves.
+"""
+
+import csv
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# LMS tables shipped with the app (see header of the CSV for the source)
+WHO_LMS_FILE = Path(__file__).parent.parent / "assets" / "who" / "lms_0_24_months.csv"
+
+# WHO tables are tabulated by month; ages are interpolated in days
+DAYS_PER_MONTH = 30.4375
+
+# Measurement column -> WHO indicator
+INDICATORS = {
+    "weight_kg": "weight_for_age",
+    "height_cm": "length_for_age"
+}
+
+# Percentile -> z-score for the chart bands (P3 to P97)
+PERCENTILE_BANDS = {
+    3: -1.880794,
+    15: -1.036433,
+    50: 0.0,
+    85: 1.036433,
+    97: 1.880794
+}
+
+SEXES = ("boys", "girls")
+
+
+@lru_cache(maxsize=1)
+def load_lms_tables() -> Dict[Tuple[str, str], np.ndarray]:
+    """
+    Load the WHO LMS tables once per process.
+
+    Returns:
+        Dict mapping (indicator, sex) to a float array with columns
+        [age_days, L, M, S], sorted by age
+
+    Example:
+        tables = load_lms_tables()
+        tables[("weight_for_age", "girls")][0]  # → [0.0, 0.3809, 3.2322, 0.14171]
+    """
+    rows: Dict[Tuple[str, str], List[List[float]]] = {}
+
+    with open(WHO_LMS_FILE, "r", encoding="utf-8") as f:
+        lines = (line for line in f if not line.startswith("#"))
+        for row in csv.DictReader(lines):
+            key = (row["indicator"], row["sex"])
+            rows.setdefault(key, []).append([
+                float(row["month"]) * DAYS_PER_MONTH,
+                float(row["L"]),
+                float(row["M"]),
+                float(row["S"])
+            ])
+
+    tables = {}
+    for key, values in rows.items():
+        table = np.array(values, dtype=float)
+        tables[key] = table[np.argsort(table[:, 0])]
+
+    return tables
+
+
+def interpolate_lms(
+    indicator: str,
+    sex: str,
+    age_days: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Linearly interpolate L, M and S for each age.
+
+    Args:
+        indicator: "weight_for_age" or "length_for_age"
+        sex: "boys" or "girls"
+        age_days: Array of ages in days
+
+    Returns:
+        Tuple of (L, M, S) arrays; NaN where the age is outside the table
+    """
+    table = load_lms_tables()[(indicator, sex)]
+    ages = np.asarray(age_days, dtype=float)
+    table_ages = table[:, 0]
+
+    outside = (ages < table_ages[0]) | (ages > table_ages[-1])
+
+    lms = []
+    for column in (1, 2, 3):
+        values = np.interp(ages, table_ages, table[:, column])
+        values[outside] = np.nan
+        lms.append(values)
+
+    return lms[0], lms[1], lms[2]
+
+
+def compute_zscores(
+    values: np.ndarray,
+    age_days: np.ndarray,
+    indicator: str,
+    sex: str
+) -> np.ndarray:
+    """
+    Compute LMS z-scores for many measurements at once.
+
+    Args:
+        values: Measured values (kg or cm); NaN for missing
+        age_days: Age in days at each measurement
+        indicator: "weight_for_age" or "length_for_age"
+        sex: "boys" or "girls"
+
+    Returns:
+        Array of z-scores (NaN for missing values or ages outside the table)
+
+    Formula:
+        z = ((X / M) ** L - 1) / (L * S)    if L != 0
+        z = ln(X / M) / S                   if L == 0
+    """
+    x = np.asarray(values, dtype=float)
+    L, M, S = interpolate_lms(indicator, sex, age_days)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = x / M
+        near_zero = np.abs(L) < 1e-7
+        safe_L = np.where(near_zero, 1.0, L)
+        z = np.where(
+            near_zero,
+            np.log(ratio) / S,
+            (np.power(ratio, safe_L) - 1) / (safe_L * S)
+        )
+
+    return z
+
+
+def _erf(x: np.ndarray) -> np.ndarray:
+    """Vectorized error function (Abramowitz & Stegun 7.1.26, |error| < 1.5e-7)."""
+    sign = np.sign(x)
+    x = np.abs(x)
+
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741
+           + t * (-1.453152027 + t * 1.061405429))))
+
+    return sign * (1.0 - poly * np.exp(-x * x))
+
+
+def zscores_to_percentiles(z: np.ndarray) -> np.ndarray:
+    """
+    Convert z-scores to percentiles (0-100) using the standard normal CDF.
+
+    Args:
+        z: Array of z-scores
+
+    Returns:
+        Array of percentiles (NaN where z is NaN)
+    """
+    z = np.asarray(z, dtype=float)
+    return 50.0 * (1.0 + _erf(z / np.sqrt(2.0)))
+
+
+def build_growth_dataframe(measurements: List[Dict], birthdate: date) -> pd.DataFrame:
+    """
+    Convert measurement rows into a chart-ready DataFrame.
+
+    Args:
+        measurements: Measurement dictionaries from the database
+        birthdate: Baby's birthdate
+
+    Returns:
+        DataFrame sorted by date with parsed measurement_date, numeric
+        weight_kg/height_cm and an age_days column
+    """
+    df = pd.DataFrame(measurements)
+    df["measurement_date"] = pd.to_datetime(df["measurement_date"])
+    df = df.sort_values("measurement_date")
+
+    for column in INDICATORS:
+        if column not in df:
+            df[column] = np.nan
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+
+    # Calculate age at each measurement
+    df["age_days"] = (df["measurement_date"] - pd.to_datetime(birthdate)).dt.days
+
+    return df
+
+
+def add_percentiles(df: pd.DataFrame, sex: str) -> pd.DataFrame:
+    """
+    Add z-score and percentile columns for weight and height.
+
+    Args:
+        df: DataFrame from build_growth_dataframe() (needs age_days)
+        sex: "boys" or "girls"
+
+    Returns:
+        Copy of df with weight_kg_z, weight_kg_percentile,
+        height_cm_z and height_cm_percentile columns
+
+    Performance:
+        One vectorized pass per indicator - no per-row Python loops,
+        so re-rendering on every widget change stays cheap.
+    """
+    df = df.copy()
+    age_days = df["age_days"].to_numpy(dtype=float)
+
+    for column, indicator in INDICATORS.items():
+        z = compute_zscores(df[column].to_numpy(dtype=float), age_days, indicator, sex)
+        df[f"{column}_z"] = z
+        df[f"{column}_percentile"] = zscores_to_percentiles(z)
+
+    return df
+
+
+def percentile_curves(
+    indicator: str,
+    sex: str,
+    start_day: float,
+    end_day: float,
+    points: int = 100
+) -> Optional[pd.DataFrame]:
+    """
+    Build percentile band curves (P3-P97) over an age range.
+
+    Args:
+        indicator: "weight_for_age" or "length_for_age"
+        sex: "boys" or "girls"
+        start_day: First age in days
+        end_day: Last age in days
+        points: Number of sample points along the curve
+
+    Returns:
+        DataFrame with age_days and one column per band ("P3", ..., "P97"),
+        or None if the range lies outside the WHO table
+
+    Formula:
+        X = M * (1 + L * S * z) ** (1 / L)    if L != 0
+        X = M * exp(S * z)                    if L == 0
+    """
+    table = load_lms_tables()[(indicator, sex)]
+    start_day = max(start_day, table[0, 0])
+    end_day = min(end_day, table[-1, 0])
+
+    if start_day > end_day:
+        return None
+
+    ages = np.linspace(start_day, end_day, points)
+    L, M, S = interpolate_lms(indicator, sex, ages)
+
+    curves = {"age_days": ages}
+    near_zero = np.abs(L) < 1e-7
+    safe_L = np.where(near_zero, 1.0, L)
+
+    for percentile, z in PERCENTILE_BANDS.items():
+        curves[f"P{percentile}"] = np.where(
+            near_zero,
+            M * np.exp(S * z),
+            M * np.power(1 + safe_L * S * z, 1 / safe_L)
+        )
+
+    return pd.DataFrame(curves)
@@ -0,0 +1,346 @@
+"""
+Bounded Image Decoding for Baby Timeline
+Decodes uploads at (close to) their target size so that peak memory stays
+within a fixed pixel budget, whatever the file claims to contain.
+"""
+
+import math
+import struct
+import zlib
+from io import BytesIO
+from typing import Callable, Iterator, List, Optional, Tuple
+from PIL import Image, ImageMode, TiffImagePlugin, TiffTags
+from src.constants import MAX_IMAGE_PIXELS, DECODE_PIXEL_BUDGET
+
+# Raw modes whose bits per pixel ImageMode can't tell
+_RAWMODE_BITS = {"1": 1, "1;I": 1, "BGR": 24, "BGRA": 32, "BGRX": 32}
+
+# Source mode -> mode strips are box-reduced in (1-bit scans are averaged as L)
+_STRIP_MODES = {"1": "L", "L": "L", "LA": "LA", "RGB": "RGB", "RGBA": "RGBA", "CMYK": "CMYK"}
+
+# 8-bit PNG color type -> (mode, bytes per pixel)
+_PNG_COLOR_TYPES = {0: ("L", 1), 2: ("RGB", 3), 3: ("P", 1), 4: ("LA", 2), 6: ("RGBA", 4)}
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_READ_SIZE = 64 * 1024  # Compressed bytes fed to zlib at a time
+
+# TIFF tags rewritten for (or meaningless in) a one-strip TIFF: size, strip
+# layout, and offsets into the original file (EXIF / GPS / sub-IFDs)
+_TIFF_STRIP_TAGS = {257, 273, 278, 279, 330, 34665, 34853}
+_TIFF_TILE_WIDTH = 322
+
+
+def check_dimensions(width: int, height: int, max_pixels: int = MAX_IMAGE_PIXELS) -> None:
+    """
+    Reject images whose header declares too many pixels.
+
+    Raises:
+        ValueError: If width x height exceeds max_pixels
+    """
+    if width * height > max_pixels:
+        raise ValueError(
+            f"Image is too large: {width}x{height} pixels "
+            f"({width * height / 1_000_000:.0f} MP, limit {max_pixels / 1_000_000:.0f} MP)"
+        )
+
+
+def clamp_scale(width: int, height: int, scale: float, pixel_budget: int = DECODE_PIXEL_BUDGET) -> float:
+    """
+    Limit a resize scale so the output fits a quarter of the pixel budget.
+
+    Note:
+        JPEG draft mode decodes at most 2x the target per side, so this
+        also keeps the draft decode itself within the budget (e.g. a very
+        tall panorama only 1920 pixels wide).
+    """
+    return min(scale, math.sqrt(pixel_budget / 4 / (width * height)))
+
+
+# ============================================================================
+# Strip-wise Reduction
+# ============================================================================
+
+def _reduce_in_strips(
+    size: Tuple[int, int],
+    mode: str,
+    factor: int,
+    pixel_budget: int,
+    read_rows: Callable[[int, int], Image.Image]
+) -> Image.Image:
+    """
+    Box-reduce an image by factor, one strip of rows at a time.
+
+    Args:
+        size: Full (width, height) of the source
+        mode: Mode read_rows() returns and the result has
+        factor: Integer reduction factor
+        pixel_budget: Strips hold at most an eighth of it
+        read_rows: Called with (top, bottom) in increasing order; returns
+            those rows of the source as an image in mode
+
+    Note:
+        Strips are a multiple of factor rows high, so the result is the
+        same as reducing the whole image at once.
+    """
+    width, height = size
+    reduced = Image.new(mode, (-(-width // factor), -(-height // factor)))
+    rows = max(factor, pixel_budget // 8 // width // factor * factor)
+
+    for top in range(0, height, rows):
+        bottom = min(height, top + rows)
+        reduced.paste(read_rows(top, bottom).reduce(factor), (0, top // factor))
+
+    return reduced
+
+
+def _raw_tiles(img: Image.Image) -> Optional[List[Tuple[tuple, int, str, int, int]]]:
+    """(extents, offset, rawmode, stride, ystep) of every tile, or None unless all are uncompressed."""
+    if img.mode not in _STRIP_MODES or not img.tile:
+        return None
+
+    tiles = []
+    for codec, extents, offset, args in img.tile:
+        if codec != "raw":
+            return None
+        if isinstance(args, str):
+            args = (args,)
+        rawmode, stride, ystep = (tuple(args) + (0, 1))[:3]
+
+        if not stride:
+            bits = _RAWMODE_BITS.get(rawmode)
+            if bits is None:
+                try:
+                    descriptor = ImageMode.getmode(rawmode)
+                except KeyError:
+                    return None
+                bits = len(descriptor.bands) * int(descriptor.typestr[-1]) * 8
+            stride = ((extents[2] - extents[0]) * bits + 7) // 8
+
+        tiles.append((extents, offset, rawmode, stride, ystep))
+    return tiles
+
+
+def _raw_row_reader(img: Image.Image) -> Optional[Tuple[str, Callable[[int, int], Image.Image]]]:
+    """Rows of an uncompressed TIFF / BMP / PPM / TGA, read straight from the file."""
+    tiles = _raw_tiles(img)
+    if tiles is None:
+        return None
+
+    def read_rows(top: int, bottom: int) -> Image.Image:
+        strip = Image.new(img.mode, (img.width, bottom - top))
+        for (x0, y0, x1, y1), offset, rawmode, stride, ystep in tiles:
+            first, last = max(top, y0), min(bottom, y1)
+            if first >= last:
+                continue
+
+            # Bottom-up tiles (BMP, TGA) store their last row first
+            row = y1 - last if ystep < 0 else first - y0
+            img.fp.seek(offset + row * stride)
+            data = img.fp.read((last - first) * stride)
+
+            rows_image = Image.frombytes(img.mode, (x1 - x0, last - first), data, "raw", rawmode, stride, ystep)
+            strip.paste(rows_image, (x0, first - top))
+        return strip.convert(_STRIP_MODES[img.mode])
+
+    return _STRIP_MODES[img.mode], read_rows
+
+
+def _png_idat_data(fp) -> Iterator[bytes]:
+    """Compressed image data of a PNG, IDAT chunk by IDAT chunk, in small reads."""
+    fp.seek(len(_PNG_SIGNATURE))
+    while True:
+        header = fp.read(8)
+        if len(header) < 8:
+            return
+        length, chunk_type = struct.unpack(">I4s", header)
+        if chunk_type == b"IDAT":
+            remaining = length
+            while remaining:
+                data = fp.read(min(remaining, _PNG_READ_SIZE))
+                if not data:
+                    return
+                remaining -= len(data)
+                yield data
+            fp.seek(4, 1)  # CRC
+        elif chunk_type == b"IEND":
+            return
+        else:
+            fp.seek(length + 4, 1)
+
+
+def _png_row_reader(img: Image.Image) -> Optional[Tuple[str, Callable[[int, int], Image.Image]]]:
+    """
+    Rows of a non-interlaced 8-bit PNG, decompressed as a stream.
+
+    Note:
+        zlib inflates only as many filtered rows as the next strip needs.
+        Pillow's own PNG decoder then unfilters the strip: it gets the
+        previous strip's last (already unfiltered) row as an extra first
+        row with filter type None, so Up / Average / Paeth rows that refer
+        to it decode exactly.
+    """
+    fp = img.fp
+    fp.seek(0)
+    header = fp.read(33)  # Signature + IHDR
+    if len(header) < 33 or not header.startswith(_PNG_SIGNATURE) or header[12:16] != b"IHDR":
+        return None
+    width, height, bit_depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", header[16:29])
+    if bit_depth != 8 or interlace or color_type not in _PNG_COLOR_TYPES:
+        return None
+
+    png_mode, pixel_bytes = _PNG_COLOR_TYPES[color_type]
+    row_bytes = 1 + width * pixel_bytes  # Filter type byte + pixels
+    palette = img.palette if png_mode == "P" else None
+    transparency = img.info.get("transparency")
+    mode = "RGBA" if png_mode in ("RGBA", "LA") or (png_mode == "P" and transparency is not None) else \
+        "L" if png_mode == "L" else "RGB"
+
+    inflater = zlib.decompressobj()
+    compressed = _png_idat_data(fp)
+    state = {"previous": b"\x00" * (width * pixel_bytes)}
+
+    def inflate(size: int) -> bytes:
+        parts, missing = [], size
+        while missing:
+            if inflater.unconsumed_tail:
+                data = inflater.unconsumed_tail
+            else:
+                data = next(compressed, b"")
+                if not data:
+                    raise ValueError("PNG image data is truncated")
+            part = inflater.decompress(data, missing)
+            parts.append(part)
+            missing -= len(part)
+        return b"".join(parts)
+
+    def read_rows(top: int, bottom: int) -> Image.Image:
+        filtered = b"\x00" + state["previous"] + inflate((bottom - top) * row_bytes)
+        rows = Image.frombytes(png_mode, (width, bottom - top + 1), zlib.compress(filtered, 0), "zip", png_mode)
+        state["previous"] = rows.crop((0, bottom - top, width, bottom - top + 1)).tobytes()
+
+        rows = rows.crop((0, 1, width, bottom - top + 1))
+        if palette is not None:
+            rows.putpalette(palette)
+            if transparency is not None:
+                rows.info["transparency"] = transparency
+        return rows.convert(mode)
+
+    return mode, read_rows
+
+
+def _tiff_row_reader(img: Image.Image) -> Optional[Tuple[str, Callable[[int, int], Image.Image]]]:
+    """
+    Rows of a strip-organized TIFF with any compression (LZW, Deflate, ...).
+
+    Note:
+        Each TIFF strip is compressed on its own, so every strip is wrapped
+        in a one-strip TIFF with the original tags and decoded by Pillow
+        (libtiff) separately. Tiled or planar TIFFs are not handled.
+    """
+    tags = img.tag_v2
+    if _TIFF_TILE_WIDTH in tags or tags.get(284, 1) != 1 or img.mode not in _STRIP_MODES and img.mode != "P":
+        return None
+
+    offsets, counts = tags.get(273), tags.get(279)
+    if not offsets or not counts or len(offsets) != len(counts):
+        return None
+    rows_per_strip = min(int(tags.get(278, img.height)), img.height)
+    mode = "RGB" if img.mode == "P" else _STRIP_MODES[img.mode]
+    cache = {}  # Strip index -> decoded strip (the one straddling two reads)
+
+    def decode_strip(index: int) -> Image.Image:
+        if index not in cache:
+            rows = min(rows_per_strip, img.height - index * rows_per_strip)
+            img.fp.seek(offsets[index])
+            data = img.fp.read(counts[index])
+
+            ifd = TiffImagePlugin.ImageFileDirectory_v2(prefix=tags.prefix)
+            for tag, value in tags.items():
+                if tag not in _TIFF_STRIP_TAGS:
+                    ifd[tag] = value
+                    ifd.tagtype[tag] = tags.tagtype[tag]
+            for tag, value in ((257, rows), (278, rows), (279, len(data)), (273, 0)):
+                ifd[tag] = value
+                ifd.tagtype[tag] = TiffTags.LONG
+
+            # tobytes() points StripOffsets (0 = start of the data) past the directory
+            header = tags.prefix + (b"*\x00\x08\x00\x00\x00" if tags.prefix == b"II" else b"\x00*\x00\x00\x00\x08")
+            strip = Image.open(BytesIO(header + ifd.tobytes(8) + data))
+            strip.load()
+
+            cache.clear()
+            cache[index] = strip.convert(mode)
+        return cache[index]
+
+    def read_rows(top: int, bottom: int) -> Image.Image:
+        rows = Image.new(mode, (img.width, bottom - top))
+        for index in range(top // rows_per_strip, (bottom - 1) // rows_per_strip + 1):
+            strip_top = index * rows_per_strip
+            first, last = max(top, strip_top), min(bottom, strip_top + rows_per_strip)
+            strip = decode_strip(index).crop((0, first - strip_top, img.width, last - strip_top))
+            rows.paste(strip, (0, first - top))
+        return rows
+
+    return mode, read_rows
+
+
+# ============================================================================
+# Decoding
+# ============================================================================
+
+def decode_to_size(
+    img: Image.Image,
+    target_size: Tuple[int, int],
+    pixel_budget: int = DECODE_PIXEL_BUDGET
+) -> Image.Image:
+    """
+    Decode an opened (not yet loaded) image and resize it to target_size.
+
+    Args:
+        img: Result of Image.open(), before any pixel access
+        target_size: Final (width, height), at most a quarter of the budget
+            (see clamp_scale())
+        pixel_budget: Maximum number of pixels decoded at full resolution
+
+    Returns:
+        Image of exactly target_size
+
+    Raises:
+        ValueError: If the image can't be decoded within the budget
+
+    Performance:
+        - JPEG: draft mode scales by 1/2, 1/4 or 1/8 inside the DCT, so the
+          full-size image is never materialized
+        - Larger than the budget: read a strip of rows at a time and box-
+          reduce it (_reduce_in_strips()). Uncompressed TIFF / BMP / PPM /
+          TGA rows come straight from the file, 8-bit non-interlaced PNGs
+          are inflated as a stream, and strip-organized TIFFs (LZW,
+          Deflate, ...) are decoded strip by strip
+        - Everything else (interlaced or 16-bit PNG, tiled TIFF, WebP, ...)
+          has to be decoded in one piece, so only within the budget
+        Memory therefore peaks at about pixel_budget x 4 bytes per upload.
+    """
+    if img.format == "JPEG" and img.size != target_size:
+        img.draft("RGB", target_size)  # Updates img.size, still no decode
+
+    width, height = img.size
+    if width * height > pixel_budget:
+        reader = _raw_row_reader(img)
+        if reader is None and img.format == "PNG":
+            reader = _png_row_reader(img)
+        if reader is None and img.format == "TIFF":
+            reader = _tiff_row_reader(img)
+        if reader is None:
+            raise ValueError(
+                f"{img.format or 'Image'} of {width}x{height} pixels is too large to process "
+                f"(limit {pixel_budget / 1_000_000:.0f} MP for this kind of file); please save it as a JPEG or 8-bit PNG"
+            )
+
+        mode, read_rows = reader
+        factor = max(1, min(width // target_size[0], height // target_size[1]))
+        img = _reduce_in_strips(img.size, mode, factor, pixel_budget, read_rows)
+
+    if img.size != target_size:
+        # Use LANCZOS for high-quality downscaling
+        img = img.resize(target_size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+    return img
@@ -0,0 +1,161 @@
+"""
+Image Process Pool for Baby Timeline
+One process pool per server process for CPU-bound image work (decode,
+resize, encode), so Pillow never holds the GIL of the Streamlit server.
+"""
+
+import multiprocessing
+import signal
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+from src.constants import IMAGE_PROCESS_WORKERS, IMAGE_PROCESS_TIMEOUT_SECONDS
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Workers are started from a clean server process instead of forking the
+# multi-threaded Streamlit server (fork only copies the calling thread and
+# can inherit locks held by others)
+POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def _call_with_deadline(timeout_seconds: float, fn: Callable, *args):
+    """
+    Run fn(*args) inside a worker, failing once it runs past the deadline.
+
+    Note:
+        The deadline counts processing time only, not time spent queued
+        behind other jobs. SIGALRM is delivered between Python bytecodes,
+        so a single long Pillow call finishes first; src/image_decode.py
+        keeps those bounded. Where setitimer is missing (Windows) the
+        caller's wait in ImageProcessPool.run() is the only limit.
+    """
+    if not hasattr(signal, "setitimer"):
+        return fn(*args)
+
+    def expire(signum, frame):
+        raise ValueError(f"Image processing timed out after {timeout_seconds:.0f}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, timeout_seconds)
+    try:
+        return fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+class ImageProcessPool:
+    """
+    Lazily started, self-healing ProcessPoolExecutor shared by all sessions.
+
+    Every job runs under a deadline in its worker. If a worker dies (a
+    segfault in a codec, the OOM killer), the executor is marked broken and
+    all of its jobs fail; the broken executor is then replaced and each of
+    those jobs is retried once on fresh workers, so only a file that
+    crashes twice in a row fails.
+
+    Usage:
+        future = image_pool.submit(fn, data)      # for many jobs (as_completed)
+        result = image_pool.run(fn, data)         # blocking, with timeout
+    """
+
+    def __init__(self, workers: int, timeout_seconds: float):
+        self.workers = workers
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(POOL_START_METHOD)
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        """Replace a broken executor on next use (only the first caller does)."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        logger.warning("Image worker process crashed, starting fresh workers")
+        executor.shutdown(wait=False)
+
+    def submit(self, fn: Callable, *args, retries: int = 1) -> Future:
+        """
+        Run fn(*args) in a worker process.
+
+        Args:
+            fn: Module-level function (must be picklable)
+            *args: Picklable arguments (e.g. raw image bytes)
+            retries: Extra attempts if the pool breaks while the job is pending
+
+        Returns:
+            Future with fn's result; exceptions raised by fn are re-raised
+            by future.result(), timeouts and repeated crashes as ValueError
+        """
+        result = Future()
+        self._attempt(result, fn, args, retries)
+        return result
+
+    def _attempt(self, result: Future, fn: Callable, args: tuple, retries: int) -> None:
+        executor = self._get_executor()
+        try:
+            future = executor.submit(_call_with_deadline, self.timeout_seconds, fn, *args)
+        except BrokenProcessPool as e:
+            future = Future()
+            future.set_exception(e)
+
+        def done(future: Future) -> None:
+            try:
+                value = future.result()
+            except BrokenProcessPool:
+                self._discard(executor)
+                if retries:
+                    self._attempt(result, fn, args, retries - 1)
+                    return
+                value, error = None, ValueError("Image processing crashed (the file may be corrupt or too large)")
+            except BaseException as e:
+                value, error = None, e
+            else:
+                error = None
+
+            if not result.set_running_or_notify_cancel():
+                return  # Caller gave up waiting
+            if error is not None:
+                result.set_exception(error)
+            else:
+                result.set_result(value)
+
+        future.add_done_callback(done)
+
+    def run(self, fn: Callable, *args):
+        """
+        Run fn(*args) in a worker process and wait for the result.
+
+        Raises:
+            ValueError: If the job times out (including time queued behind
+                other sessions' jobs) or keeps crashing its worker
+            Exception: Whatever fn raised
+        """
+        # Processing is capped at timeout_seconds in the worker; allow as
+        # long again for waiting on a busy pool
+        wait_seconds = self.timeout_seconds * 2
+        future = self.submit(fn, *args)
+        try:
+            return future.result(timeout=wait_seconds)
+        except TimeoutError:
+            future.cancel()
+            raise ValueError(f"Image processing timed out after {wait_seconds:.0f}s") from None
+
+
+# Process-wide pool shared by all sessions
+image_pool = ImageProcessPool(
+    workers=IMAGE_PROCESS_WORKERS,
+    timeout_seconds=IMAGE_PROCESS_TIMEOUT_SECONDS
+)
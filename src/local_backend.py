@@ -0,0 +1,930 @@
+"""
+Local Backend for Baby Timeline
+SQLite + filesystem stand-in for the Supabase client, used for offline
+load tests, benchmarks and large-dataset experiments.
+
+The app never depends on this module directly: every function in src/ takes
+"a Supabase client", and LocalClient implements the same subset of that API
+(table queries, storage bucket, auth, rpc). Set BABY_TIMELINE_BACKEND=local
+to have init_supabase() return one.
+
+Not emulated:
+    - Row Level Security (every client sees every row)
+    - Real authentication (any email/password signs in)
+    - Postgres-only SQL in migrations (policies, functions, USING indexes)
+"""
+
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from postgrest.exceptions import APIError
+from storage3.exceptions import StorageApiError
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent.parent / "supabase_migrations"
+
+# Timestamps are stored as ISO-8601 text, like PostgREST returns them
+SQLITE_NOW = "(strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))"
+
+# Postgres type -> (SQLite type, value kind used to decode results)
+TYPE_MAP = {
+    "UUID": ("TEXT", None),
+    "JSONB": ("TEXT", "json"),
+    "JSON": ("TEXT", "json"),
+    "TIMESTAMPTZ": ("TEXT", None),
+    "TIMESTAMP": ("TEXT", None),
+    "DATE": ("TEXT", None),
+    "BOOLEAN": ("BOOLEAN", "bool"),
+    "BIGINT": ("INTEGER", None),
+    "INTEGER": ("INTEGER", None),
+    "SMALLINT": ("INTEGER", None)
+}
+
+IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Postgres error codes for SQLite integrity errors (callers check these)
+INTEGRITY_CODES = {
+    "UNIQUE": ("23505", "duplicate key value violates unique constraint"),
+    "CHECK": ("23514", "new row violates check constraint"),
+    "NOT NULL": ("23502", "null value violates not-null constraint"),
+    "FOREIGN KEY": ("23503", "insert or update violates foreign key constraint")
+}
+
+# RPC name -> function(connection, params) returning rows or a scalar
+LOCAL_RPC_FUNCTIONS: Dict[str, Callable[[sqlite3.Connection, Dict], Any]] = {}
+
+
+def local_rpc(name: str) -> Callable:
+    """Register a Python implementation of a Postgres function for rpc()."""
+    def register(func: Callable) -> Callable:
+        LOCAL_RPC_FUNCTIONS[name] = func
+        return func
+    return register
+
+
+# ============================================================================
+# Schema (translated from supabase_migrations/*.sql)
+# ============================================================================
+
+def _split_statements(sql: str) -> List[str]:
+    """Split a SQL script on semicolons, keeping $$-quoted bodies intact."""
+    statements = []
+    current = []
+    in_body = False
+
+    for part in re.split(r"(\$\$)", sql):
+        if part == "$$":
+            in_body = not in_body
+            current.append(part)
+            continue
+
+        if in_body:
+            current.append(part)
+            continue
+
+        part = re.sub(r"--[^\n]*", "", part)
+        pieces = part.split(";")
+        for piece in pieces[:-1]:
+            current.append(piece)
+            statements.append("".join(current).strip())
+            current = []
+        current.append(pieces[-1])
+
+    statements.append("".join(current).strip())
+    return [s for s in statements if s]
+
+
+def _split_top_level(text: str, sep: str = ",") -> List[str]:
+    """Split on sep, ignoring separators inside parentheses or quotes."""
+    parts, depth, quoted, current = [], 0, False, []
+
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif char == sep and depth == 0 and not quoted:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(char)
+
+    parts.append("".join(current).strip())
+    return [p for p in parts if p]
+
+
+@dataclass
+class _Column:
+    name: str
+    definition: str
+    kind: Optional[str]
+    generate_uuid: bool
+
+
+def _translate_column(item: str) -> _Column:
+    """Translate one Postgres column definition to SQLite."""
+    name, rest = item.split(None, 1)
+    match = re.match(r"(\w+)(\s*\(\s*\d+(?:\s*,\s*\d+)?\s*\))?(\[\])?", rest)
+    pg_type = match.group(1).upper()
+    rest = rest[match.end():]
+
+    if match.group(3):
+        sqlite_type, kind = "TEXT", "json"  # Arrays are stored as JSON
+    elif pg_type in TYPE_MAP:
+        sqlite_type, kind = TYPE_MAP[pg_type]
+    else:
+        sqlite_type, kind = pg_type + (match.group(2) or ""), None
+
+    # auth.users lives in Supabase Auth, not in our schema
+    rest = re.sub(r"REFERENCES\s+auth\.\w+\s*\(\w+\)(\s+ON\s+DELETE\s+(SET\s+NULL|CASCADE))?", "", rest, flags=re.I)
+
+    generate_uuid = bool(re.search(r"DEFAULT\s+(uuid_generate_v4|gen_random_uuid)\(\)", rest, re.I))
+    rest = re.sub(r"DEFAULT\s+(uuid_generate_v4|gen_random_uuid)\(\)", "", rest, flags=re.I)
+    rest = re.sub(r"DEFAULT\s+now\(\)", f"DEFAULT {SQLITE_NOW}", rest, flags=re.I)
+
+    definition = " ".join(f"{name} {sqlite_type} {rest}".split())
+    return _Column(name=name, definition=definition, kind=kind, generate_uuid=generate_uuid)
+
+
+class _Schema:
+    """Final table/index layout after applying every migration in order."""
+
+    def __init__(self):
+        self.tables: Dict[str, Dict[str, _Column]] = {}
+        self.constraints: Dict[str, List[str]] = {}
+        self.primary_keys: Dict[str, str] = {}
+        self.indexes: List[str] = []
+
+    def apply(self, statement: str) -> None:
+        flat = " ".join(statement.split())
+
+        create_table = re.match(r"CREATE TABLE (?:IF NOT EXISTS )?(\w+) \((.*)\)$", flat, re.I)
+        if create_table:
+            table, body = create_table.groups()
+            self.tables[table] = {}
+            self.constraints[table] = []
+            for item in _split_top_level(body):
+                if re.match(r"(CONSTRAINT|CHECK|PRIMARY|UNIQUE|FOREIGN)\b", item, re.I):
+                    self.constraints[table].append(item)
+                else:
+                    self._add_column(table, item)
+            return
+
+        add_column = re.match(r"ALTER TABLE (\w+) ADD COLUMN (?:IF NOT EXISTS )?(.+)$", flat, re.I)
+        if add_column:
+            table, item = add_column.groups()
+            if item.split()[0] not in self.tables[table]:
+                self._add_column(table, item)
+            return
+
+        drop_not_null = re.match(r"ALTER TABLE (\w+) ALTER COLUMN (\w+) DROP NOT NULL$", flat, re.I)
+        if drop_not_null:
+            table, name = drop_not_null.groups()
+            column = self.tables[table][name]
+            column.definition = re.sub(r"\s*NOT NULL", "", column.definition, flags=re.I)
+            return
+
+        add_constraint = re.match(r"ALTER TABLE (\w+) ADD (CONSTRAINT \w+ (?:CHECK|UNIQUE) .+)$", flat, re.I)
+        if add_constraint:
+            table, constraint = add_constraint.groups()
+            self.constraints[table].append(constraint)
+            return
+
+        create_index = re.match(r"CREATE (UNIQUE )?INDEX (?:IF NOT EXISTS )?(\w+) ON (\w+)\s*(\(.*)$", flat, re.I)
+        if create_index:
+            unique, name, table, rest = create_index.groups()
+            self.indexes.append(f"CREATE {unique or ''}INDEX {name} ON {table} {rest}")
+            return
+
+        # Policies, RLS, grants, functions, data backfills: Postgres only
+
+    def _add_column(self, table: str, item: str) -> None:
+        column = _translate_column(item)
+        self.tables[table][column.name] = column
+        if "PRIMARY KEY" in column.definition.upper():
+            self.primary_keys[table] = column.name
+
+    def create_sql(self) -> List[str]:
+        statements = []
+        for table, columns in self.tables.items():
+            items = [c.definition for c in columns.values()] + self.constraints[table]
+            statements.append(f"CREATE TABLE {table} (\n  " + ",\n  ".join(items) + "\n)")
+        return statements + self.indexes
+
+
+def load_schema(migrations_dir: Path = MIGRATIONS_DIR) -> Tuple[_Schema, int]:
+    """
+    Build the SQLite schema from the numbered Supabase migrations.
+
+    Returns:
+        Tuple of (schema, number of migration files applied)
+    """
+    schema = _Schema()
+    files = sorted(migrations_dir.glob("*.sql"))
+
+    for path in files:
+        for statement in _split_statements(path.read_text(encoding="utf-8")):
+            schema.apply(statement)
+
+    return schema, len(files)
+
+
+# ============================================================================
+# Database
+# ============================================================================
+
+class _LocalDatabase:
+    """One SQLite connection (and bucket root) shared by every LocalClient on the same path."""
+
+    def __init__(self, path: str, storage_root: Path):
+        self.storage_root = storage_root
+        self.schema, version = load_schema()
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+
+        existing = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if existing == 0:
+            with self.lock:
+                self.conn.execute("BEGIN")
+                for statement in self.schema.create_sql() + LOCAL_TRIGGERS:
+                    self.conn.execute(statement)
+                self.conn.execute(f"PRAGMA user_version = {version}")
+                self.conn.execute("COMMIT")
+        elif existing != version:
+            raise RuntimeError(
+                f"Local database {path} was created from {existing} migrations, "
+                f"but there are now {version}. Delete it to recreate the schema."
+            )
+
+    def columns(self, table: str) -> Dict[str, _Column]:
+        if table not in self.schema.tables:
+            raise APIError({"message": f'relation "{table}" does not exist', "code": "42P01"})
+        return self.schema.tables[table]
+
+    def run(self, sql: str, params: List = (), many: bool = False) -> List[sqlite3.Row]:
+        """Execute one statement (or a transaction of several) under the lock."""
+        try:
+            with self.lock:
+                if many:
+                    rows = []
+                    self.conn.execute("BEGIN")
+                    try:
+                        for statement_sql, statement_params in sql:
+                            rows.extend(self.conn.execute(statement_sql, statement_params).fetchall())
+                        self.conn.execute("COMMIT")
+                    except Exception:
+                        self.conn.execute("ROLLBACK")
+                        raise
+                    return rows
+                return self.conn.execute(sql, params).fetchall()
+        except sqlite3.IntegrityError as e:
+            for marker, (code, message) in INTEGRITY_CODES.items():
+                if marker in str(e).upper():
+                    raise APIError({"message": f"{message} ({e})", "code": code})
+            raise APIError({"message": str(e), "code": "23000"})
+        except sqlite3.Error as e:
+            raise APIError({"message": str(e), "code": "42000"})
+
+
+_databases: Dict[str, _LocalDatabase] = {}
+_databases_lock = threading.Lock()
+
+
+def _open_database(directory: Optional[str]) -> _LocalDatabase:
+    """Open (once per process) the database for a directory; None = in memory."""
+    key = str(Path(directory).resolve()) if directory else ":memory:"
+
+    with _databases_lock:
+        if key not in _databases:
+            if directory is None:
+                path = ":memory:"
+                storage_root = Path(tempfile.mkdtemp(prefix="baby-timeline-storage-"))
+            else:
+                Path(key).mkdir(parents=True, exist_ok=True)
+                path = str(Path(key) / "database.sqlite3")
+                storage_root = Path(key) / "storage"
+            _databases[key] = _LocalDatabase(path, storage_root)
+        return _databases[key]
+
+
+def _quote(name: str) -> str:
+    if not IDENTIFIER.match(name):
+        raise APIError({"message": f"invalid identifier: {name}", "code": "42602"})
+    return f'"{name}"'
+
+
+def _encode(value: Any) -> Any:
+    """Python value -> SQLite parameter."""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+# ============================================================================
+# Query Builder (postgrest-py subset)
+# ============================================================================
+
+@dataclass
+class LocalResponse:
+    """Same shape as postgrest's APIResponse."""
+    data: Any
+    count: Optional[int] = None
+
+
+FILTER_OPERATORS = {
+    "eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=",
+    "like": "LIKE", "ilike": "LIKE"
+}
+
+
+class LocalQueryBuilder:
+    """
+    Chainable query on one table, executed against SQLite.
+
+    Supports select/insert/update/upsert/delete with eq, neq, gt, gte, lt,
+    lte, like, ilike, is_, in_, not_, or_, order, limit and range. Select lists
+    may rename columns and read JSON paths ("alias:column->key").
+    """
+
+    def __init__(self, db: _LocalDatabase, table: str):
+        self.db = db
+        self.table = table
+        self.columns = db.columns(table)
+        self._action = "select"
+        self._select = "*"
+        self._count = None
+        self._payload = None
+        self._on_conflict = None
+        self._ignore_duplicates = False
+        self._where: List[Tuple[str, List]] = []
+        self._negate_next = False
+        self._order: List[str] = []
+        self._limit: Optional[int] = None
+        self._offset: Optional[int] = None
+
+    # ---------- Actions ----------
+
+    def select(self, *columns: str, count: Optional[str] = None, head: Optional[bool] = None):
+        self._select = ",".join(columns) if columns else "*"
+        self._count = count
+        return self
+
+    def insert(self, json: Union[Dict, List[Dict]], *, count: Optional[str] = None, **kwargs):
+        self._action = "insert"
+        self._payload = json
+        return self
+
+    def upsert(self, json: Union[Dict, List[Dict]], *, on_conflict: str = "",
+               ignore_duplicates: bool = False, **kwargs):
+        self._action = "upsert"
+        self._payload = json
+        self._on_conflict = on_conflict or self.db.schema.primary_keys[self.table]
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, json: Dict, *, count: Optional[str] = None, **kwargs):
+        self._action = "update"
+        self._payload = json
+        return self
+
+    def delete(self, *, count: Optional[str] = None, **kwargs):
+        self._action = "delete"
+        return self
+
+    # ---------- Filters ----------
+
+    def _filter(self, column: str, operator: str, value: Any):
+        sql, params = self._condition(column, operator, value)
+        if self._negate_next:
+            sql, self._negate_next = f"NOT ({sql})", False
+        self._where.append((sql, params))
+        return self
+
+    @property
+    def not_(self):
+        """Negate the next filter, e.g. .not_.is_("storage_path", "null")."""
+        self._negate_next = True
+        return self
+
+    def eq(self, column: str, value: Any):
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any):
+        return self._filter(column, "neq", value)
+
+    def gt(self, column: str, value: Any):
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any):
+        return self._filter(column, "gte", value)
+
+    def lt(self, column: str, value: Any):
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any):
+        return self._filter(column, "lte", value)
+
+    def like(self, column: str, pattern: str):
+        return self._filter(column, "like", pattern)
+
+    def ilike(self, column: str, pattern: str):
+        return self._filter(column, "ilike", pattern)
+
+    def is_(self, column: str, value: Any):
+        return self._filter(column, "is", value)
+
+    def in_(self, column: str, values: List):
+        return self._filter(column, "in", list(values))
+
+    def or_(self, filters: str, reference_table: Optional[str] = None):
+        """PostgREST logic tree, e.g. "a.lt.1,and(a.eq.1,b.lt.2)"."""
+        self._where.append(self._logic_tree("or", filters))
+        return self
+
+    def order(self, column: str, *, desc: bool = False, nullsfirst: Optional[bool] = None, **kwargs):
+        # Postgres default: NULLS LAST ascending, NULLS FIRST descending
+        nulls_first = desc if nullsfirst is None else nullsfirst
+        self._order.append(
+            f"{_quote(column)} {'DESC' if desc else 'ASC'} NULLS {'FIRST' if nulls_first else 'LAST'}"
+        )
+        return self
+
+    def limit(self, size: int, **kwargs):
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int, **kwargs):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def _condition(self, column: str, operator: str, value: Any) -> Tuple[str, List]:
+        if column not in self.columns:
+            raise APIError({"message": f'column {self.table}.{column} does not exist', "code": "42703"})
+        quoted = _quote(column)
+
+        if operator == "is":
+            keyword = {"null": "NULL", "true": "1", "false": "0"}.get(str(value).lower(), None)
+            if value is None:
+                keyword = "NULL"
+            if keyword is None:
+                raise APIError({"message": f"invalid is_ value: {value}", "code": "22P02"})
+            return (f"{quoted} IS {keyword}", [])
+
+        if operator == "in":
+            if not value:
+                return ("0", [])
+            return (f"{quoted} IN ({', '.join('?' for _ in value)})", [_encode(v) for v in value])
+
+        if operator not in FILTER_OPERATORS:
+            raise APIError({"message": f"unsupported operator: {operator}", "code": "42883"})
+
+        if operator in ("like", "ilike"):
+            # SQLite LIKE is case-insensitive for ASCII, so like behaves as ilike
+            value = str(value).replace("*", "%")
+        return (f"{quoted} {FILTER_OPERATORS[operator]} ?", [_encode(value)])
+
+    def _logic_tree(self, joiner: str, filters: str) -> Tuple[str, List]:
+        parts, params = [], []
+
+        for term in _split_top_level(filters):
+            nested = re.match(r"(and|or)\((.*)\)$", term)
+            if nested:
+                sql, term_params = self._logic_tree(nested.group(1), nested.group(2))
+            else:
+                column, operator, value = term.split(".", 2)
+                if operator == "in":
+                    value = [v.strip().strip('"') for v in _split_top_level(value.strip("()"))]
+                else:
+                    value = value.strip('"')
+                sql, term_params = self._condition(column, operator, value)
+            parts.append(f"({sql})")
+            params.extend(term_params)
+
+        return (f" {joiner.upper()} ".join(parts), params)
+
+    # ---------- Execution ----------
+
+    def _where_sql(self) -> Tuple[str, List]:
+        if not self._where:
+            return "", []
+        params = [p for _, condition_params in self._where for p in condition_params]
+        return " WHERE " + " AND ".join(f"({sql})" for sql, _ in self._where), params
+
+    def _returning(self) -> str:
+        """
+        Translate a PostgREST select list to SQL.
+
+        Supports "*", plain columns, renames ("alias:column") and JSON paths
+        ("column->key", "column->>key", "alias:column->a->b").
+        """
+        self._output_kinds = {}
+        if self._select.strip() == "*":
+            return "*"
+
+        expressions = []
+        for item in _split_top_level(self._select):
+            alias, _, path = item.rpartition(":")
+            parts = re.split(r"(->>?)", path.strip())
+            column = parts[0].strip()
+            if column not in self.columns:
+                raise APIError({"message": f'column {self.table}.{column} does not exist', "code": "42703"})
+
+            expression = _quote(column)
+            name = column
+            kind = self.columns[column].kind
+            for operator, key in zip(parts[1::2], parts[2::2]):
+                key = key.strip()
+                if not IDENTIFIER.match(key):
+                    raise APIError({"message": f"invalid JSON key: {key}", "code": "42602"})
+                # SQLite's -> returns JSON text, ->> a plain SQL value (same as Postgres)
+                expression = f"{expression} {operator} '$.{key}'"
+                name = key
+                kind = "json" if operator == "->" else None
+
+            name = alias.strip() or name
+            self._output_kinds[name] = kind
+            expressions.append(f"{expression} AS {_quote(name)}")
+
+        return ", ".join(expressions)
+
+    def _decode(self, row: sqlite3.Row) -> Dict:
+        kinds = getattr(self, "_output_kinds", {})
+        decoded = {}
+        for key in row.keys():
+            value = row[key]
+            if key in kinds:
+                kind = kinds[key]
+            else:
+                kind = self.columns[key].kind if key in self.columns else None
+            if value is not None and kind == "json":
+                value = json.loads(value)
+            elif value is not None and kind == "bool":
+                value = bool(value)
+            decoded[key] = value
+        return decoded
+
+    def _rows_payload(self) -> List[Dict]:
+        rows = self._payload if isinstance(self._payload, list) else [self._payload]
+        prepared = []
+        for row in rows:
+            row = dict(row)
+            for column in self.columns.values():
+                if column.generate_uuid and row.get(column.name) is None:
+                    row[column.name] = str(uuid.uuid4())
+            prepared.append(row)
+        return prepared
+
+    def _insert_statements(self) -> List[Tuple[str, List]]:
+        statements = []
+        for row in self._rows_payload():
+            names = list(row)
+            sql = (
+                f"INSERT INTO {_quote(self.table)} ({', '.join(_quote(n) for n in names)}) "
+                f"VALUES ({', '.join('?' for _ in names)})"
+            )
+            if self._action == "upsert":
+                conflict = ", ".join(_quote(c.strip()) for c in self._on_conflict.split(","))
+                updates = [n for n in names if n not in self._on_conflict.split(",")]
+                if self._ignore_duplicates or not updates:
+                    sql += f" ON CONFLICT ({conflict}) DO NOTHING"
+                else:
+                    sql += f" ON CONFLICT ({conflict}) DO UPDATE SET " + ", ".join(
+                        f"{_quote(n)} = excluded.{_quote(n)}" for n in updates
+                    )
+            sql += f" RETURNING {self._returning()}"
+            statements.append((sql, [_encode(row[n]) for n in names]))
+        return statements
+
+    def execute(self) -> LocalResponse:
+        where_sql, where_params = self._where_sql()
+        table = _quote(self.table)
+
+        if self._action in ("insert", "upsert"):
+            rows = self.db.run(self._insert_statements(), many=True)
+            data = [self._decode(r) for r in rows]
+            return LocalResponse(data=data, count=len(data) if self._count else None)
+
+        if self._action == "update":
+            names = list(self._payload)
+            sql = (
+                f"UPDATE {table} SET {', '.join(f'{_quote(n)} = ?' for n in names)}"
+                f"{where_sql} RETURNING {self._returning()}"
+            )
+            rows = self.db.run(sql, [_encode(self._payload[n]) for n in names] + where_params)
+            return LocalResponse(data=[self._decode(r) for r in rows])
+
+        if self._action == "delete":
+            rows = self.db.run(f"DELETE FROM {table}{where_sql} RETURNING *", where_params)
+            return LocalResponse(data=[self._decode(r) for r in rows])
+
+        sql = f"SELECT {self._returning()} FROM {table}{where_sql}"
+        if self._order:
+            sql += " ORDER BY " + ", ".join(self._order)
+        if self._limit is not None or self._offset is not None:
+            sql += f" LIMIT {int(self._limit if self._limit is not None else -1)}"
+            sql += f" OFFSET {int(self._offset or 0)}"
+
+        data = [self._decode(r) for r in self.db.run(sql, where_params)]
+
+        count = None
+        if self._count:
+            count = self.db.run(f"SELECT COUNT(*) FROM {table}{where_sql}", where_params)[0][0]
+
+        return LocalResponse(data=data, count=count)
+
+
+class LocalRpcCall:
+    """Deferred rpc() call (executed on .execute(), like postgrest)."""
+
+    def __init__(self, db: _LocalDatabase, name: str, params: Dict):
+        self.db = db
+        self.name = name
+        self.params = params or {}
+
+    def execute(self) -> LocalResponse:
+        if self.name not in LOCAL_RPC_FUNCTIONS:
+            raise APIError({"message": f"function {self.name} does not exist", "code": "42883"})
+        with self.db.lock:
+            return LocalResponse(data=LOCAL_RPC_FUNCTIONS[self.name](self.db.conn, self.params))
+
+
+# ============================================================================
+# Storage (bucket = directory)
+# ============================================================================
+
+class LocalBucket:
+    """Filesystem-backed bucket with the storage3 calls the app uses."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _resolve(self, path: str) -> Path:
+        target = (self.root / path).resolve()
+        if self.root.resolve() not in target.parents:
+            raise StorageApiError(f"Invalid key: {path}", "InvalidKey", 400)
+        return target
+
+    def upload(self, path: str, file: Union[bytes, str, os.PathLike], file_options: Optional[Dict] = None):
+        target = self._resolve(path)
+        upsert = str((file_options or {}).get("upsert", "false")).lower() == "true"
+        if target.exists() and not upsert:
+            raise StorageApiError("The resource already exists", "Duplicate", 409)
+
+        data = file if isinstance(file, bytes) else Path(file).read_bytes()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        return SimpleNamespace(path=path, full_path=f"{self.root.name}/{path}")
+
+    def download(self, path: str, options: Optional[Dict] = None) -> bytes:
+        target = self._resolve(path)
+        if not target.exists():
+            raise StorageApiError("Object not found", "NotFound", 404)
+        return target.read_bytes()
+
+    def remove(self, paths: List[str]) -> List[Dict]:
+        removed = []
+        for path in paths:
+            target = self._resolve(path)
+            if target.exists():
+                target.unlink()
+                removed.append({"name": path})
+        return removed
+
+    def list(self, path: Optional[str] = None, options: Optional[Dict] = None) -> List[Dict]:
+        directory = self._resolve(path) if path else self.root
+        if not directory.exists():
+            return []
+        # Same paging options (and default page size) as the Storage API
+        options = options or {}
+        offset = options.get("offset", 0)
+        entries = sorted(directory.iterdir())[offset:offset + options.get("limit", 100)]
+        return [
+            {"name": entry.name, "id": None if entry.is_dir() else entry.name,
+             "metadata": None if entry.is_dir() else {"size": entry.stat().st_size}}
+            for entry in entries
+        ]
+
+    def create_signed_url(self, path: str, expires_in: int, options: Optional[Dict] = None) -> Dict:
+        target = self._resolve(path)
+        if not target.exists():
+            raise StorageApiError("Object not found", "NotFound", 404)
+        # st.image() accepts local file paths, so the "URL" is the file itself
+        return {"signedURL": str(target), "signedUrl": str(target)}
+
+    def create_signed_urls(self, paths: List[str], expires_in: int, options: Optional[Dict] = None) -> List[Dict]:
+        results = []
+        for path in paths:
+            target = self._resolve(path)
+            if target.exists():
+                results.append({"path": path, "signedURL": str(target), "signedUrl": str(target), "error": None})
+            else:
+                results.append({"path": path, "signedURL": None, "signedUrl": None, "error": "Object not found"})
+        return results
+
+
+class LocalStorage:
+    def __init__(self, root: Path):
+        self.root = root
+
+    def from_(self, bucket: str) -> LocalBucket:
+        return LocalBucket(self.root / bucket)
+
+
+# ============================================================================
+# Auth (no password checks - offline testing only)
+# ============================================================================
+
+class LocalAuth:
+    """Signs any email in as a deterministic local user."""
+
+    def __init__(self, client: "LocalClient"):
+        self.client = client
+        self.user = None
+
+    def sign_in_with_password(self, credentials: Dict):
+        email = credentials["email"]
+        self.user = SimpleNamespace(id=str(uuid.uuid5(uuid.NAMESPACE_URL, email)), email=email)
+        session = SimpleNamespace(access_token=f"local-{uuid.uuid4()}")
+        self.client.options.headers["Authorization"] = f"Bearer {session.access_token}"
+        return SimpleNamespace(user=self.user, session=session)
+
+    def sign_out(self) -> None:
+        self.user = None
+        self.client.options.headers["Authorization"] = LocalClient.ANON_AUTHORIZATION
+
+    def get_user(self, jwt: Optional[str] = None):
+        return SimpleNamespace(user=self.user) if self.user else None
+
+    def update_user(self, attributes: Dict):
+        return SimpleNamespace(user=self.user)
+
+    def reset_password_for_email(self, email: str, options: Optional[Dict] = None) -> None:
+        logger.info(f"Local backend: password reset requested for {email}")
+
+
+# ============================================================================
+# Client
+# ============================================================================
+
+class LocalClient:
+    """
+    Drop-in replacement for supabase.Client backed by SQLite and a directory.
+
+    Args:
+        directory: Where to keep database.sqlite3 and storage/ (None = in
+            memory database with a temporary storage directory)
+
+    Usage:
+        supabase = LocalClient(".local_backend")
+        supabase.table("babies").insert({"name": "Ana", "birthdate": "2025-01-01"}).execute()
+        get_timeline_page(supabase, baby_id)
+
+    Note:
+        Clients created with the same directory share one SQLite connection,
+        so an anon client and per-user clients see the same data.
+    """
+
+    ANON_AUTHORIZATION = "Bearer local-anon"
+
+    def __init__(self, directory: Optional[str] = None):
+        self.db = _open_database(directory)
+        self.options = SimpleNamespace(headers={"Authorization": self.ANON_AUTHORIZATION})
+        self.storage = LocalStorage(self.db.storage_root)
+        self.auth = LocalAuth(self)
+
+    def table(self, table_name: str) -> LocalQueryBuilder:
+        return LocalQueryBuilder(self.db, table_name)
+
+    def from_(self, table_name: str) -> LocalQueryBuilder:
+        return self.table(table_name)
+
+    def rpc(self, fn: str, params: Optional[Dict] = None, **kwargs) -> LocalRpcCall:
+        return LocalRpcCall(self.db, fn, params)
+
+
+# ============================================================================
+# RPC Functions (SQLite mirrors of the functions in supabase_migrations/)
+# ============================================================================
+
+@local_rpc("get_growth_statistics")
+def _rpc_growth_statistics(conn: sqlite3.Connection, params: Dict) -> List[Dict]:
+    """Mirror of 06_growth_statistics_function.sql."""
+    row = conn.execute(
+        """
+        WITH first_row AS (
+          SELECT measurement_date, weight_kg, height_cm FROM measurements
+          WHERE baby_id = :baby_id
+          ORDER BY measurement_date ASC, measurement_id ASC LIMIT 1
+        ),
+        latest_row AS (
+          SELECT measurement_date, weight_kg, height_cm FROM measurements
+          WHERE baby_id = :baby_id
+          ORDER BY measurement_date DESC, measurement_id DESC LIMIT 1
+        ),
+        totals AS (
+          SELECT count(*) AS total, avg(weight_kg) AS avg_weight, avg(height_cm) AS avg_height
+          FROM measurements WHERE baby_id = :baby_id
+        )
+        SELECT
+          totals.total AS total_measurements,
+          first_row.measurement_date AS first_measurement_date,
+          latest_row.measurement_date AS latest_measurement_date,
+          latest_row.weight_kg - first_row.weight_kg AS weight_change_kg,
+          latest_row.height_cm - first_row.height_cm AS height_change_cm,
+          totals.avg_weight AS avg_weight_kg,
+          totals.avg_height AS avg_height_cm
+        FROM totals
+        LEFT JOIN first_row ON 1
+        LEFT JOIN latest_row ON 1
+        """,
+        {"baby_id": params["p_baby_id"]}
+    ).fetchone()
+
+    return [dict(row)]
+
+
+@local_rpc("get_timeline_month_index")
+def _rpc_timeline_month_index(conn: sqlite3.Connection, params: Dict) -> List[Dict]:
+    """Mirror of 07_timeline_month_index.sql."""
+    rows = conn.execute(
+        """
+        WITH items AS (
+          SELECT photo_date AS item_date, 1 AS is_photo FROM photos WHERE baby_id = :baby_id
+          UNION ALL
+          SELECT measurement_date, 0 FROM measurements WHERE baby_id = :baby_id
+        )
+        SELECT
+          CAST(strftime('%Y', item_date) AS INTEGER) AS year,
+          CAST(strftime('%m', item_date) AS INTEGER) AS month,
+          sum(is_photo) AS photo_count,
+          sum(1 - is_photo) AS measurement_count
+        FROM items
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        """,
+        {"baby_id": params["p_baby_id"]}
+    ).fetchall()
+
+    return [dict(row) for row in rows]
+
+
+# ============================================================================
+# Triggers (SQLite mirrors of the triggers in supabase_migrations/)
+# ============================================================================
+
+# Created together with the schema
+LOCAL_TRIGGERS = [
+    # Mirror of apply_photo_storage_usage() in 10_storage_usage.sql
+    """
+    CREATE TRIGGER photos_storage_usage_insert AFTER INSERT ON photos
+    BEGIN
+      INSERT INTO baby_storage_usage (baby_id, photo_count, total_bytes, unsized_photo_count)
+      VALUES (NEW.baby_id, 1, COALESCE(NEW.byte_size, 0), NEW.byte_size IS NULL)
+      ON CONFLICT (baby_id) DO UPDATE SET
+        photo_count = photo_count + 1,
+        total_bytes = total_bytes + excluded.total_bytes,
+        unsized_photo_count = unsized_photo_count + excluded.unsized_photo_count,
+        updated_at = %(now)s;
+    END
+    """ % {"now": SQLITE_NOW},
+    """
+    CREATE TRIGGER photos_storage_usage_delete AFTER DELETE ON photos
+    BEGIN
+      UPDATE baby_storage_usage SET
+        photo_count = photo_count - 1,
+        total_bytes = total_bytes - COALESCE(OLD.byte_size, 0),
+        unsized_photo_count = unsized_photo_count - (OLD.byte_size IS NULL),
+        updated_at = %(now)s
+      WHERE baby_id = OLD.baby_id;
+    END
+    """ % {"now": SQLITE_NOW},
+    """
+    CREATE TRIGGER photos_storage_usage_update AFTER UPDATE OF byte_size ON photos
+    BEGIN
+      UPDATE baby_storage_usage SET
+        total_bytes = total_bytes - COALESCE(OLD.byte_size, 0) + COALESCE(NEW.byte_size, 0),
+        unsized_photo_count = unsized_photo_count - (OLD.byte_size IS NULL) + (NEW.byte_size IS NULL),
+        updated_at = %(now)s
+      WHERE baby_id = NEW.baby_id;
+    END
+    """ % {"now": SQLITE_NOW}
+]
@@ -0,0 +1,383 @@
+"""
+Near-Duplicate Detection for Baby Timeline
+Perceptual hashes (dHash) of photos and a per-baby BK-tree for finding
+burst shots and other near-identical pictures by Hamming distance.
+"""
+
+import threading
+import time
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+from PIL import Image
+from supabase import Client
+from src.cache import client_scope
+from src.constants import (
+    QUERY_CACHE_TTL_SECONDS,
+    NEAR_DUPLICATE_MAX_DISTANCE,
+    NEAR_DUPLICATE_BACKFILL_BATCH,
+    NEAR_DUPLICATE_INDEX_PAGE_SIZE,
+    NEAR_DUPLICATE_FETCH_CHUNK
+)
+from src.database import resolve_projection
+from src.signed_urls import photo_derivatives, resolve_photo_urls
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# dHash compares each pixel of a 9x8 grayscale thumbnail with its right neighbour
+DHASH_SIZE = 8
+
+
+# ============================================================================
+# Perceptual Hash
+# ============================================================================
+
+def compute_dhash(img: Image.Image) -> str:
+    """
+    64-bit difference hash of an image.
+
+    Args:
+        img: Decoded (upright) PIL image of any size
+
+    Returns:
+        16 hex characters; similar images differ in few bits
+
+    Note:
+        The image is shrunk to 9x8 grayscale first, so the hash ignores
+        resolution, JPEG quality and small exposure changes.
+    """
+    small = img.convert("L").resize((DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.BOX)
+    pixels = list(small.getdata())
+
+    value = 0
+    for row in range(DHASH_SIZE):
+        for col in range(DHASH_SIZE):
+            left = pixels[row * (DHASH_SIZE + 1) + col]
+            right = pixels[row * (DHASH_SIZE + 1) + col + 1]
+            value = (value << 1) | (left > right)
+
+    return f"{value:016x}"
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return (a ^ b).bit_count()
+
+
+# ============================================================================
+# BK-Tree
+# ============================================================================
+
+class BKTree:
+    """
+    Metric tree over 64-bit hashes for Hamming-distance range queries.
+
+    Each child edge is labelled with its distance to the parent, and the
+    triangle inequality lets a search skip every subtree whose edge lies
+    outside [d - max_distance, d + max_distance].
+
+    Usage:
+        tree = BKTree()
+        tree.add(int("f0e1d2c3b4a59687", 16), photo_id)
+        tree.search(int("f0e1d2c3b4a59686", 16), 4)  # → [(1, photo_id)]
+    """
+
+    def __init__(self):
+        # Node = [hash, [item ids], {distance: child node}]
+        self._root: Optional[list] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int, item_id: str) -> None:
+        self._size += 1
+        if self._root is None:
+            self._root = [value, [item_id], {}]
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                node[1].append(item_id)
+                return
+
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item_id], {}]
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, str]]:
+        """
+        Find every item within max_distance bits of value.
+
+        Returns:
+            List of (distance, item_id), closest first
+        """
+        if self._root is None:
+            return []
+
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, node[0])
+            if distance <= max_distance:
+                found.extend((distance, item_id) for item_id in node[1])
+
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+
+        return sorted(found)
+
+
+# ============================================================================
+# Per-Baby Index
+# ============================================================================
+
+class NearDuplicateIndex:
+    """
+    Thread-safe, lazily built BK-trees of photo hashes, one per baby.
+
+    A tree is built from the baby's hashes (paged by photo_id, so PostgREST's
+    max-rows cap can't truncate it) the first time a baby is searched,
+    extended in place as photos are uploaded, and dropped when a photo is
+    deleted (BK-trees don't support removal) or after ttl_seconds, so
+    uploads from other server processes show up eventually.
+    """
+
+    def __init__(self, ttl_seconds: float, page_size: int = NEAR_DUPLICATE_INDEX_PAGE_SIZE):
+        self.ttl_seconds = ttl_seconds
+        self.page_size = page_size
+        # (baby_id, client scope) -> (expires_at, tree, {photo_id: hash})
+        self._trees: Dict[Tuple[str, str], Tuple[float, BKTree, Dict[str, int]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, supabase: Client, baby_id: str) -> Tuple[BKTree, Dict[str, int]]:
+        """Return (tree, {photo_id: hash}) for a baby, building it if needed."""
+        key = (baby_id, client_scope(supabase))
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._trees.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1], entry[2]
+
+        tree = BKTree()
+        hashes = {}
+        last_photo_id = None
+
+        while True:
+            query = supabase.table("photos") \
+                .select("photo_id, perceptual_hash") \
+                .eq("baby_id", baby_id)
+            if last_photo_id:
+                query = query.gt("photo_id", last_photo_id)
+            rows = query.order("photo_id").limit(self.page_size).execute().data or []
+
+            for row in rows:
+                if not row["perceptual_hash"]:
+                    continue  # Uploaded before migration 09, see backfill_perceptual_hashes()
+                value = int(row["perceptual_hash"], 16)
+                tree.add(value, row["photo_id"])
+                hashes[row["photo_id"]] = value
+
+            if len(rows) < self.page_size:
+                break
+            last_photo_id = rows[-1]["photo_id"]
+
+        with self._lock:
+            self._trees[key] = (now + self.ttl_seconds, tree, hashes)
+
+        return tree, hashes
+
+    def add(self, baby_id: str, photo_id: str, perceptual_hash: Optional[str]) -> None:
+        """Add a new photo to every built tree of the baby."""
+        if not perceptual_hash:
+            return
+
+        value = int(perceptual_hash, 16)
+        with self._lock:
+            for (tree_baby_id, _), (_, tree, hashes) in self._trees.items():
+                if tree_baby_id == baby_id and photo_id not in hashes:
+                    tree.add(value, photo_id)
+                    hashes[photo_id] = value
+
+    def forget(self, baby_id: str) -> None:
+        """Drop the baby's trees (rebuilt on next use)."""
+        with self._lock:
+            for key in [key for key in self._trees if key[0] == baby_id]:
+                del self._trees[key]
+
+
+# Process-wide index shared by all sessions
+near_duplicate_index = NearDuplicateIndex(ttl_seconds=QUERY_CACHE_TTL_SECONDS)
+
+
+# ============================================================================
+# Queries
+# ============================================================================
+
+def find_similar_photos(
+    supabase: Client,
+    baby_id: str,
+    perceptual_hash: str,
+    max_distance: int = NEAR_DUPLICATE_MAX_DISTANCE
+) -> List[Tuple[int, str]]:
+    """
+    Find the baby's photos that look like the given hash.
+
+    Args:
+        supabase: Supabase client
+        baby_id: UUID of the baby
+        perceptual_hash: Hash from compute_dhash()
+        max_distance: Maximum number of differing bits
+
+    Returns:
+        List of (distance, photo_id), closest first
+
+    Performance:
+        One BK-tree search in memory (well under a millisecond for
+        thousands of photos) once the baby's tree is built.
+    """
+    try:
+        tree, _ = near_duplicate_index.get(supabase, baby_id)
+    except Exception as e:
+        logger.error(f"Error loading near-duplicate index: {e}", exc_info=True)
+        return []
+
+    return tree.search(int(perceptual_hash, 16), max_distance)
+
+
+def get_near_duplicate_groups(
+    supabase: Client,
+    baby_id: str,
+    max_distance: int = NEAR_DUPLICATE_MAX_DISTANCE
+) -> List[List[Dict]]:
+    """
+    Group the baby's photos into clusters of near-duplicates.
+
+    Args:
+        supabase: Supabase client
+        baby_id: UUID of the baby
+        max_distance: Maximum number of differing bits between neighbours
+
+    Returns:
+        Groups of 2+ photo rows (timeline_card columns, signed URLs), each
+        sorted by photo date; largest groups first
+
+    Note:
+        Photos are linked when they are within max_distance of each other,
+        and linked photos end up in one group (union-find), so a long burst
+        forms a single group even if its first and last shots differ more.
+    """
+    tree, hashes = near_duplicate_index.get(supabase, baby_id)
+
+    parent = {photo_id: photo_id for photo_id in hashes}
+
+    def root(photo_id: str) -> str:
+        while parent[photo_id] != photo_id:
+            parent[photo_id] = parent[parent[photo_id]]
+            photo_id = parent[photo_id]
+        return photo_id
+
+    for photo_id, value in hashes.items():
+        for _, neighbour in tree.search(value, max_distance):
+            if neighbour in parent:
+                parent[root(neighbour)] = root(photo_id)
+
+    clusters: Dict[str, List[str]] = {}
+    for photo_id in hashes:
+        clusters.setdefault(root(photo_id), []).append(photo_id)
+
+    grouped_ids = [ids for ids in clusters.values() if len(ids) > 1]
+    if not grouped_ids:
+        return []
+
+    # Chunked: thousands of ids in one .in_() filter overflow the URL
+    grouped = [photo_id for ids in grouped_ids for photo_id in ids]
+    fetched = []
+    for start in range(0, len(grouped), NEAR_DUPLICATE_FETCH_CHUNK):
+        result = supabase.table("photos") \
+            .select(resolve_projection("photos", "timeline_card")) \
+            .in_("photo_id", grouped[start:start + NEAR_DUPLICATE_FETCH_CHUNK]) \
+            .execute()
+        fetched.extend(result.data or [])
+    rows = {row["photo_id"]: row for row in resolve_photo_urls(supabase, fetched)}
+
+    groups = [
+        sorted((rows[photo_id] for photo_id in ids if photo_id in rows), key=lambda r: (r["photo_date"], r["photo_id"]))
+        for ids in grouped_ids
+    ]
+    return sorted((g for g in groups if len(g) > 1), key=len, reverse=True)
+
+
+def count_unhashed_photos(supabase: Client, baby_id: str) -> int:
+    """
+    Number of the baby's photos uploaded before perceptual hashing.
+
+    Note:
+        Legacy rows without a storage_path can't be downloaded, so they are
+        left out here and in backfill_perceptual_hashes() alike.
+    """
+    result = supabase.table("photos") \
+        .select("photo_id", count="exact") \
+        .eq("baby_id", baby_id) \
+        .is_("perceptual_hash", "null") \
+        .not_.is_("storage_path", "null") \
+        .limit(1) \
+        .execute()
+    return result.count or 0
+
+
+def backfill_perceptual_hashes(
+    supabase: Client,
+    baby_id: str,
+    limit: int = NEAR_DUPLICATE_BACKFILL_BATCH
+) -> Tuple[int, int]:
+    """
+    Hash older photos that were uploaded before migration 09.
+
+    Args:
+        supabase: Authenticated Supabase client (admin)
+        baby_id: UUID of the baby
+        limit: Maximum number of photos to hash in this call
+
+    Returns:
+        Tuple of (photos hashed, photos that failed)
+
+    Note:
+        Downloads the smallest stored copy of each photo (the 9x8 hash
+        doesn't need more), so a batch costs a few MB at most.
+    """
+    # Rows without storage_path would come back on every call and starve the batch
+    result = supabase.table("photos") \
+        .select("photo_id, storage_path, exif_data") \
+        .eq("baby_id", baby_id) \
+        .is_("perceptual_hash", "null") \
+        .not_.is_("storage_path", "null") \
+        .limit(limit) \
+        .execute()
+
+    hashed = failed = 0
+    for row in result.data or []:
+        derivatives = sorted(photo_derivatives(row).values(), key=lambda d: d["width"])
+        path = derivatives[0]["path"] if derivatives else row["storage_path"]
+
+        try:
+            data = supabase.storage.from_("baby-photos").download(path)
+            perceptual_hash = compute_dhash(Image.open(BytesIO(data)))
+            supabase.table("photos") \
+                .update({"perceptual_hash": perceptual_hash}) \
+                .eq("photo_id", row["photo_id"]) \
+                .execute()
+            hashed += 1
+        except Exception as e:
+            logger.warning(f"Could not hash photo {row['photo_id']}: {e}")
+            failed += 1
+
+    near_duplicate_index.forget(baby_id)
+    return hashed, failed
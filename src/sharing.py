@@ -3,17 +3,46 @@ Sharing Module for Baby Timeline
 Handles share link generation, validation, and token-based access control.
 """
 
+import base64
+import hashlib
+import json
+import secrets
+import time
 import uuid
 import streamlit as st
+from datetime import datetime
 from supabase import Client
 from typing import Tuple, Optional
 import bcrypt
 import hmac
 import os
+from src.cache import QueryCache, client_scope
+from src.constants import (
+    QUERY_CACHE_MAX_ENTRIES,
+    SHARE_LINK_CHECK_TTL_SECONDS,
+    VIEWER_SESSION_TTL_SECONDS,
+    SESSION_VIEWER_MODE,
+    SESSION_VIEWER_BABY_ID,
+    SESSION_VIEWER_AUTHENTICATED,
+    SESSION_VIEWER_CREDENTIAL,
+    SESSION_VIEWER_SHARE_TOKEN
+)
 from src.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Environment variable holding the viewer credential signing secret
+VIEWER_SESSION_SECRET_ENV = "VIEWER_SESSION_SECRET"
+
+# Fallback signing key when no secret is configured (valid until restart)
+_PROCESS_SESSION_KEY = secrets.token_bytes(32)
+
+# Active share links by token, re-read at most every SHARE_LINK_CHECK_TTL_SECONDS
+share_link_cache = QueryCache(
+    max_entries=QUERY_CACHE_MAX_ENTRIES,
+    ttl_seconds=SHARE_LINK_CHECK_TTL_SECONDS
+)
+
 
 def generate_share_link(
     supabase: Client,
@@ -56,6 +85,7 @@ def generate_share_link(
         supabase.table("share_links").update({
             "is_active": False
         }).eq("baby_id", baby_id).execute()
+        share_link_cache.invalidate(baby_id)
 
         # Get current user ID
         user_id = st.session_state.get("user").id if st.session_state.get("user") else None
@@ -129,11 +159,8 @@ def validate_share_token(
         link = result.data[0]
 
         # Check if link has expired
-        if link.get("expires_at"):
-            from datetime import datetime
-            expires_at = datetime.fromisoformat(link["expires_at"].replace("Z", "+00:00"))
-            if datetime.now(expires_at.tzinfo) > expires_at:
-                return False, "❌ This share link has expired"
+        if _link_expired(link):
+            return False, "❌ This share link has expired"
 
         # Check password if required
         if link["password_hash"]:
@@ -151,6 +178,218 @@ def validate_share_token(
         return False, f"❌ Validation error: {str(e)}"
 
 
+def _link_expired(link: dict) -> bool:
+    """True if the share link has an expires_at in the past."""
+    if not link.get("expires_at"):
+        return False
+    expires_at = datetime.fromisoformat(link["expires_at"].replace("Z", "+00:00"))
+    return datetime.now(expires_at.tzinfo) > expires_at
+
+
+# ============================================================================
+# Viewer Session Credentials
+# ============================================================================
+
+def _viewer_session_key() -> bytes:
+    """HMAC key from VIEWER_SESSION_SECRET, or the per-process fallback."""
+    secret = os.getenv(VIEWER_SESSION_SECRET_ENV)
+    return secret.encode() if secret else _PROCESS_SESSION_KEY
+
+
+def _token_fingerprint(token: str) -> str:
+    """Short hash binding a credential to its share token (token never embedded)."""
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def issue_viewer_session(token: str, baby_id: str) -> str:
+    """
+    Sign a short-lived viewer credential after a successful validation.
+
+    Args:
+        token: Share token the viewer validated
+        baby_id: UUID returned by validate_share_token()
+
+    Returns:
+        Credential string "<payload>.<signature>" (URL-safe)
+
+    Note:
+        Presenting the credential together with its share token skips
+        validate_share_token(), and with it the bcrypt password check,
+        until VIEWER_SESSION_TTL_SECONDS have passed.
+    """
+    payload = _b64encode(json.dumps({
+        "baby_id": baby_id,
+        "token": _token_fingerprint(token),
+        "exp": int(time.time()) + VIEWER_SESSION_TTL_SECONDS
+    }, separators=(",", ":")).encode())
+    signature = hmac.new(_viewer_session_key(), payload.encode(), hashlib.sha256).digest()
+    return f"{payload}.{_b64encode(signature)}"
+
+
+def verify_viewer_session(credential: str, token: str) -> Optional[str]:
+    """
+    Check a viewer credential's signature, expiry and share token.
+
+    Args:
+        credential: Value from issue_viewer_session()
+        token: Share token from the URL
+
+    Returns:
+        baby_id if the credential is genuine and current, else None
+
+    Note:
+        Only proves the viewer validated this link earlier; call
+        is_share_link_active() to honor revocation.
+    """
+    try:
+        payload, signature = credential.split(".")
+        expected = hmac.new(_viewer_session_key(), payload.encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            return None
+
+        claims = json.loads(_b64decode(payload))
+        if claims["exp"] < time.time():
+            return None
+        if not hmac.compare_digest(claims["token"], _token_fingerprint(token)):
+            return None
+
+        return claims["baby_id"]
+
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def is_share_link_active(supabase: Client, token: str, baby_id: str) -> bool:
+    """
+    Check that a share link is still active, unexpired and for this baby.
+
+    Args:
+        supabase: Supabase client
+        token: Share token from the URL
+        baby_id: UUID the viewer's credential grants
+
+    Returns:
+        True if the link can still be used
+
+    Performance:
+        The link row is cached for SHARE_LINK_CHECK_TTL_SECONDS; revoking or
+        regenerating links drops the cache entry at once in this process.
+    """
+    def fetch() -> Optional[dict]:
+        result = supabase.table("share_links") \
+            .select("baby_id, expires_at") \
+            .eq("share_token", token) \
+            .eq("is_active", True) \
+            .execute()
+        return result.data[0] if result.data else None
+
+    try:
+        link = share_link_cache.get_or_load(
+            baby_id, "share_links", token, client_scope(supabase), fetch
+        )
+    except Exception as e:
+        logger.error(f"Error checking share link: {e}", exc_info=True)
+        return False
+
+    return bool(link) and link["baby_id"] == baby_id and not _link_expired(link)
+
+
+def resume_viewer_session(supabase: Client, token: str, credential: Optional[str]) -> Optional[str]:
+    """
+    Re-admit a viewer from a credential instead of re-validating the token.
+
+    Args:
+        supabase: Supabase client
+        token: Share token from the URL
+        credential: Credential from issue_viewer_session() (or None)
+
+    Returns:
+        baby_id if the credential is valid and the link still active, else None
+
+    Example:
+        baby_id = resume_viewer_session(supabase, token, credential)
+        if baby_id is None:
+            is_valid, result = validate_share_token(supabase, token, password)
+    """
+    if not credential:
+        return None
+
+    baby_id = verify_viewer_session(credential, token)
+    if baby_id is None or not is_share_link_active(supabase, token, baby_id):
+        return None
+
+    return baby_id
+
+
+def start_viewer_session(token: str, baby_id: str, credential: Optional[str] = None) -> None:
+    """
+    Mark this Streamlit session as an authenticated viewer.
+
+    Args:
+        token: Validated share token
+        baby_id: UUID the link grants access to
+        credential: Existing credential to keep (None = issue a new one)
+
+    Note:
+        The credential stays server-side in st.session_state. It is never
+        put in the URL, where it would let anyone holding the link skip the
+        share password (browser history, referrers, forwarded links).
+    """
+    credential = credential or issue_viewer_session(token, baby_id)
+
+    st.session_state[SESSION_VIEWER_AUTHENTICATED] = True
+    st.session_state[SESSION_VIEWER_BABY_ID] = baby_id
+    st.session_state[SESSION_VIEWER_MODE] = True
+    st.session_state[SESSION_VIEWER_SHARE_TOKEN] = token
+    st.session_state[SESSION_VIEWER_CREDENTIAL] = credential
+
+
+def end_viewer_session() -> None:
+    """Forget the viewer session (exit, revoked link or expired credential)."""
+    for key in [
+        SESSION_VIEWER_AUTHENTICATED, SESSION_VIEWER_BABY_ID, SESSION_VIEWER_MODE,
+        SESSION_VIEWER_SHARE_TOKEN, SESSION_VIEWER_CREDENTIAL
+    ]:
+        st.session_state.pop(key, None)
+
+
+def current_viewer_baby_id(supabase: Client) -> Optional[str]:
+    """
+    Baby the current viewer session may see, re-checked against revocation.
+
+    Args:
+        supabase: Supabase client
+
+    Returns:
+        baby_id, or None if this is not a (still valid) viewer session
+
+    Use case:
+        Viewer-accessible pages call this on every run instead of trusting
+        the session flag, so a revoked link locks viewers out within
+        SHARE_LINK_CHECK_TTL_SECONDS.
+    """
+    if not st.session_state.get(SESSION_VIEWER_AUTHENTICATED):
+        return None
+
+    baby_id = resume_viewer_session(
+        supabase,
+        st.session_state.get(SESSION_VIEWER_SHARE_TOKEN, ""),
+        st.session_state.get(SESSION_VIEWER_CREDENTIAL)
+    )
+    if baby_id is None:
+        end_viewer_session()
+
+    return baby_id
+
+
 def revoke_share_link(supabase: Client, baby_id: str) -> Tuple[bool, str]:
     """
     Revoke (deactivate) all active share links for a baby.
@@ -169,6 +408,7 @@ def revoke_share_link(supabase: Client, baby_id: str) -> Tuple[bool, str]:
         result = supabase.table("share_links").update({
             "is_active": False
         }).eq("baby_id", baby_id).eq("is_active", True).execute()
+        share_link_cache.invalidate(baby_id)
 
         if not result.data:
             return False, "❌ No active links found to revoke"
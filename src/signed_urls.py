@@ -0,0 +1,217 @@
+"""
+Signed URL Service for Baby Timeline
+Mints short-lived signed URLs for stored photos on demand, in batches,
+and caches them in memory until shortly before they expire.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from supabase import Client
+from src.constants import (
+    SIGNED_URL_TTL_SECONDS,
+    SIGNED_URL_REFRESH_MARGIN_SECONDS,
+    SIGNED_URL_CACHE_MAX_ENTRIES
+)
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class SignedUrlCache:
+    """
+    Thread-safe cache of signed URLs keyed by storage path.
+
+    Each URL is kept until refresh_margin seconds before its expiry, so a
+    cached URL always has at least that long left when handed to a browser.
+    Missing or stale paths are signed together with one create_signed_urls
+    call.
+
+    Usage:
+        urls = signed_url_cache.get_many(supabase, ["baby/2025/01/a.jpg"])
+        urls["baby/2025/01/a.jpg"]  # → "https://...?token=..."
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, refresh_margin: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = refresh_margin
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, supabase: Client, paths: Iterable[str]) -> Dict[str, str]:
+        """
+        Return a signed URL for every path, minting only the missing ones.
+
+        Args:
+            supabase: Supabase client allowed to read the objects
+            paths: Storage paths inside the baby-photos bucket
+
+        Returns:
+            Dict mapping path to signed URL (paths that failed to sign are omitted)
+        """
+        paths = list(dict.fromkeys(p for p in paths if p))
+        now = time.monotonic()
+        urls = {}
+        missing = []
+
+        with self._lock:
+            for path in paths:
+                entry = self._entries.get(path)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(path)
+                    urls[path] = entry[1]
+                else:
+                    missing.append(path)
+
+        if not missing:
+            return urls
+
+        # Sign outside the lock so one slow request doesn't block other sessions
+        signed = supabase.storage.from_("baby-photos").create_signed_urls(
+            missing,
+            expires_in=self.ttl_seconds
+        )
+        usable_until = now + self.ttl_seconds - self.refresh_margin
+
+        with self._lock:
+            for item in signed:
+                url = item.get("signedURL") or item.get("signedUrl")
+                if item.get("error") or not url:
+                    logger.warning(f"Could not sign {item.get('path')}: {item.get('error')}")
+                    continue
+
+                urls[item["path"]] = url
+                self._entries[item["path"]] = (usable_until, url)
+                self._entries.move_to_end(item["path"])
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return urls
+
+    def discard(self, paths: Iterable[str]) -> None:
+        """Forget URLs for objects that were deleted."""
+        with self._lock:
+            for path in paths:
+                self._entries.pop(path, None)
+
+    def clear(self) -> None:
+        """Drop every cached URL."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Process-wide cache shared by all sessions
+signed_url_cache = SignedUrlCache(
+    max_entries=SIGNED_URL_CACHE_MAX_ENTRIES,
+    ttl_seconds=SIGNED_URL_TTL_SECONDS,
+    refresh_margin=SIGNED_URL_REFRESH_MARGIN_SECONDS
+)
+
+
+def photo_derivatives(photo: dict) -> Dict[str, dict]:
+    """
+    Derivative info of a photo row.
+
+    Full rows keep it in exif_data["derivatives"]; projected rows (see
+    PROJECTIONS in src/database.py) select it as a top-level "derivatives".
+    """
+    if "derivatives" in photo:
+        return photo["derivatives"] or {}
+    return (photo.get("exif_data") or {}).get("derivatives") or {}
+
+
+def photo_storage_paths(photo: dict) -> List[str]:
+    """
+    List every storage object belonging to a photo row.
+
+    Returns:
+        [storage_path, derivative and variant paths...] (empty for legacy
+        rows without a path)
+    """
+    storage_path = photo.get("storage_path")
+    if not storage_path:
+        return []
+
+    paths = [storage_path]
+    for d in photo_derivatives(photo).values():
+        if d.get("path"):
+            paths.append(d["path"])
+        paths.extend(v["path"] for v in (d.get("variants") or {}).values())
+    return paths
+
+
+def resolve_photo_urls(supabase: Client, photos: List[dict]) -> List[dict]:
+    """
+    Attach fresh signed URLs to photo rows.
+
+    Args:
+        supabase: Supabase client
+        photos: Photo rows from the photos table
+
+    Returns:
+        Copies of the rows with file_url, thumbnail_url and the url of each
+        derivative and format variant filled in (rows are never modified
+        in place, since they may be shared through the query cache)
+
+    Performance:
+        All paths of the page are signed with a single batched request, and
+        URLs already in the cache cost no request at all.
+
+    Example:
+        photos = resolve_photo_urls(supabase, get_recent_photos(supabase, baby_id))
+        st.image(get_display_url(photos[0], 320))
+    """
+    paths = [path for photo in photos for path in photo_storage_paths(photo)]
+    if not paths:
+        return photos
+
+    try:
+        urls = signed_url_cache.get_many(supabase, paths)
+    except Exception as e:
+        logger.error(f"Error signing photo URLs: {e}", exc_info=True)
+        urls = {}
+
+    resolved = []
+    for photo in photos:
+        storage_path = photo.get("storage_path")
+        if not storage_path:
+            # Legacy row: keep whatever URL was stored at upload time
+            resolved.append(photo)
+            continue
+
+        photo = dict(photo)
+        photo["file_url"] = urls.get(storage_path)
+
+        derivatives = photo_derivatives(photo)
+        if derivatives:
+            derivatives = {
+                name: {
+                    **d,
+                    "url": urls.get(d.get("path")),
+                    "variants": {
+                        fmt: {**v, "url": urls.get(v["path"])}
+                        for fmt, v in (d.get("variants") or {}).items()
+                    }
+                }
+                for name, d in derivatives.items()
+            }
+            if "derivatives" in photo:
+                photo["derivatives"] = derivatives
+            else:
+                photo["exif_data"] = {**photo["exif_data"], "derivatives": derivatives}
+            photo["thumbnail_url"] = _smallest_url(derivatives)
+
+        resolved.append(photo)
+
+    return resolved
+
+
+def _smallest_url(derivatives: Dict[str, dict]) -> Optional[str]:
+    """URL of the narrowest derivative that has one."""
+    signed = [d for d in derivatives.values() if d.get("url")]
+    if not signed:
+        return None
+    return min(signed, key=lambda d: d["width"])["url"]
@@ -3,73 +3,206 @@ Storage Module for Baby Timeline
 Handles photo upload, optimization, and retrieval from Supabase Storage.
 """
 
+import base64
+import hashlib
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from io import BytesIO
-from PIL import Image
+from PIL import Image, features
 from datetime import datetime
 import streamlit as st
 from supabase import Client
-from typing import Tuple, Optional
+from postgrest.exceptions import APIError
+from typing import Tuple, Optional, Dict, List, Callable
+from src.constants import (
+    MAX_FILE_SIZE_MB,
+    AVG_OPTIMIZED_PHOTO_SIZE_MB,
+    STORAGE_LIMIT_FREE_TIER_MB,
+    UPLOAD_THREAD_WORKERS,
+    DEFAULT_MAX_IMAGE_WIDTH,
+    DEFAULT_IMAGE_QUALITY,
+    ADAPTIVE_IMAGE_QUALITY,
+    THUMBNAIL_SIZES,
+    THUMBNAIL_QUALITY,
+    DERIVATIVE_VARIANT_FORMATS,
+    PLACEHOLDER_WIDTH,
+    PLACEHOLDER_QUALITY
+)
+from src.cache import query_cache, client_scope
+from src.database import resolve_projection, adjust_timeline_month_index
+from src.signed_urls import signed_url_cache, photo_derivatives, photo_storage_paths, resolve_photo_urls
+from src.near_duplicates import compute_dhash, near_duplicate_index
+from src.image_quality import encode_adaptive_jpeg
+from src.image_decode import check_dimensions, clamp_scale, decode_to_size
+from src.image_pool import image_pool
 from src.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Cached query families that change when a photo is written
+PHOTO_CACHE_NAMESPACES = ("photos", "timeline")
 
-def optimize_image(uploaded_file, max_width: int = 1920, quality: int = 85) -> Tuple[BytesIO, dict]:
+# Variant formats this Pillow build can encode
+VARIANT_FORMATS = {fmt: options for fmt, options in DERIVATIVE_VARIANT_FORMATS.items() if features.check(fmt)}
+
+# Content types of stored images by file extension
+IMAGE_CONTENT_TYPES = {"jpg": "image/jpeg", "webp": "image/webp", "avif": "image/avif"}
+
+# Postgres unique_violation (idx_photos_baby_original_sha256, migration 08)
+UNIQUE_VIOLATION_CODE = "23505"
+
+# PostgREST / Postgres "table not found" (baby_storage_usage before migration 10)
+MISSING_TABLE_CODES = ("PGRST205", "42P01")
+
+# Result of process_image(): (optimized JPEG bytes, metadata,
+# {size_name: (JPEG bytes, metadata, {format: variant bytes})})
+ProcessedImage = Tuple[bytes, dict, Dict[str, Tuple[bytes, dict, Dict[str, bytes]]]]
+
+
+# EXIF tags used during ingest
+EXIF_IFD_POINTER = 0x8769
+EXIF_TAG_ORIENTATION = 0x0112
+EXIF_TAG_DATETIME_ORIGINAL = 0x9003
+
+# EXIF orientation → transpose that makes the image upright
+EXIF_ORIENTATION_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90
+}
+
+
+def _parse_exif_date(value) -> Optional[datetime]:
+    """Parse an EXIF date string ("2025:12:09 14:30:45") into a datetime."""
+    if not value:
+        return None
+    date_str = str(value).split()[0].replace(":", "-")
+    return datetime.strptime(date_str, "%Y-%m-%d")
+
+
+def _flatten_to_rgb(img: Image.Image) -> Image.Image:
+    """Convert to RGB, compositing transparent images onto white."""
+    if img.mode in ("RGBA", "P", "LA"):
+        # Create white background for transparent images
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        if img.mode == "P":
+            img = img.convert("RGBA")
+        background.paste(img, mask=img.split()[-1] if img.mode in ("RGBA", "LA") else None)
+        return background
+    elif img.mode != "RGB":
+        return img.convert("RGB")
+    return img
+
+
+def compute_placeholder(img: Image.Image) -> str:
     """
-    Resize image to max width and convert to JPEG for storage optimization.
+    Tiny blurred-preview JPEG of an image, as a data URI.
 
     Args:
-        uploaded_file: Streamlit UploadedFile object
-        max_width: Maximum width in pixels (default 1920 for Full HD)
-        quality: JPEG quality 0-100 (default 85 for good balance)
+        img: Decoded upright RGB image
+
+    Returns:
+        "data:image/jpeg;base64,..." (a few hundred bytes), small enough to
+        inline in the first paint of the timeline
+    """
+    height = max(1, round(img.height * PLACEHOLDER_WIDTH / img.width))
+    small = img.resize((PLACEHOLDER_WIDTH, height), Image.Resampling.BOX)
+
+    buffer = BytesIO()
+    small.save(buffer, format="JPEG", quality=PLACEHOLDER_QUALITY, optimize=True)
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def ingest_image(
+    uploaded_file,
+    max_width: int = DEFAULT_MAX_IMAGE_WIDTH,
+    quality: int = DEFAULT_IMAGE_QUALITY,
+    adaptive: bool = ADAPTIVE_IMAGE_QUALITY
+) -> Tuple[BytesIO, dict]:
+    """
+    Read EXIF and produce the optimized JPEG from a single decode.
+
+    Args:
+        uploaded_file: Streamlit UploadedFile object (or any file-like object)
+        max_width: Maximum width in pixels of the upright image
+        quality: JPEG quality 0-100 (with adaptive, the baseline the
+            savings are measured against)
+        adaptive: Search the lowest quality that meets the SSIM target
+            (see src/image_quality.py) instead of using quality as is
 
     Returns:
         Tuple of (BytesIO buffer with optimized image, metadata dict)
+        metadata includes everything optimize_image() reports plus:
+        - exif_date: "YYYY-MM-DD" from DateTimeOriginal, or None
+        - orientation: EXIF orientation that was applied (1 = upright)
+        - perceptual_hash: dHash of the upright image (see src/near_duplicates.py)
+        - placeholder: Inline LQIP data URI (see compute_placeholder())
+        - quality: JPEG quality actually used
+        - quality_mode: "adaptive" or "fixed"
+        - adaptive_quality: Search report (ssim, baseline_quality,
+          bytes_saved, trials), adaptive mode only
 
     Raises:
-        ValueError: If file is not a valid image
-        IOError: If image processing fails
-
-    Storage Savings:
-        - Original 5MB photo → ~1MB optimized
-        - 1GB storage = ~1,000 photos (vs ~200 originals)
+        ValueError: If file is not a valid image, or declares more pixels
+            than MAX_IMAGE_PIXELS / can't be decoded within DECODE_PIXEL_BUDGET
+
+    Performance:
+        Dimensions and EXIF are read from the header before any pixels are
+        decoded. decode_to_size() then decodes straight to roughly the
+        target size (JPEG draft mode, strip-wise reduce for PNG, TIFF and
+        uncompressed formats), so peak memory stays within
+        DECODE_PIXEL_BUDGET. The remaining resize uses reducing_gap (fast box
+        reduce, then LANCZOS) and orientation is applied to the small image.
     """
     try:
-        # Open image with PIL
         img = Image.open(uploaded_file)
 
-        # Store original dimensions for metadata
-        original_width = img.width
-        original_height = img.height
+        original_width, original_height = img.size
         original_format = img.format or "UNKNOWN"
+        check_dimensions(original_width, original_height)
+
+        # Header-only EXIF read (no pixel decode yet). PngImageFile.getexif()
+        # decodes the whole image to look for an eXIf chunk after the pixel
+        # data; the base class only reads one stored before it
+        exif = Image.Image.getexif(img) if original_format == "PNG" else img.getexif()
+        orientation = exif.get(EXIF_TAG_ORIENTATION, 1)
+        try:
+            exif_date = _parse_exif_date(
+                exif.get_ifd(EXIF_IFD_POINTER).get(EXIF_TAG_DATETIME_ORIGINAL)
+            )
+        except Exception as e:
+            logger.warning(f"EXIF date parsing failed (non-fatal): {e}")
+            exif_date = None
+
+        # Orientations 5-8 swap width and height once the image is upright
+        swaps_axes = orientation in (5, 6, 7, 8)
+        upright_width = original_height if swaps_axes else original_width
+        scale = clamp_scale(original_width, original_height, min(1.0, max_width / upright_width))
+        target_size = (
+            max(1, round(original_width * scale)),
+            max(1, round(original_height * scale))
+        )
+
+        img = decode_to_size(img, target_size)
 
-        # Resize if larger than max_width
-        if img.width > max_width:
-            ratio = max_width / img.width
-            new_height = int(img.height * ratio)
-            new_size = (max_width, new_height)
-
-            # Use LANCZOS for high-quality downscaling
-            img = img.resize(new_size, Image.Resampling.LANCZOS)
-
-        # Convert to RGB (handles RGBA/PNG with transparency)
-        if img.mode in ("RGBA", "P", "LA"):
-            # Create white background for transparent images
-            background = Image.new("RGB", img.size, (255, 255, 255))
-            if img.mode == "P":
-                img = img.convert("RGBA")
-            background.paste(img, mask=img.split()[-1] if img.mode in ("RGBA", "LA") else None)
-            img = background
-        elif img.mode != "RGB":
-            img = img.convert("RGB")
+        if orientation in EXIF_ORIENTATION_TRANSPOSE:
+            img = img.transpose(EXIF_ORIENTATION_TRANSPOSE[orientation])
+
+        img = _flatten_to_rgb(img)
 
         # Save to buffer as optimized JPEG
-        buffer = BytesIO()
-        img.save(buffer, format="JPEG", quality=quality, optimize=True)
-        buffer.seek(0)
+        if adaptive:
+            buffer, report = encode_adaptive_jpeg(img, baseline_quality=quality)
+            quality = report.pop("quality")
+        else:
+            buffer = BytesIO()
+            img.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+            buffer.seek(0)
 
-        # Prepare metadata
         metadata = {
             "original_width": original_width,
             "original_height": original_height,
@@ -77,8 +210,15 @@ def optimize_image(uploaded_file, max_width: int = 1920, quality: int = 85) -> T
             "optimized_width": img.width,
             "optimized_height": img.height,
             "optimized_format": "JPEG",
-            "quality": quality
+            "quality": quality,
+            "quality_mode": "adaptive" if adaptive else "fixed",
+            "orientation": orientation,
+            "exif_date": exif_date.strftime("%Y-%m-%d") if exif_date else None,
+            "perceptual_hash": compute_dhash(img),
+            "placeholder": compute_placeholder(img)
         }
+        if adaptive:
+            metadata["adaptive_quality"] = report
 
         return buffer, metadata
 
@@ -86,6 +226,199 @@ def optimize_image(uploaded_file, max_width: int = 1920, quality: int = 85) -> T
         raise ValueError(f"Failed to process image: {str(e)}")
 
 
+def optimize_image(
+    uploaded_file,
+    max_width: int = DEFAULT_MAX_IMAGE_WIDTH,
+    quality: int = DEFAULT_IMAGE_QUALITY,
+    adaptive: bool = ADAPTIVE_IMAGE_QUALITY
+) -> Tuple[BytesIO, dict]:
+    """
+    Resize image to max width and convert to JPEG for storage optimization.
+
+    Args:
+        uploaded_file: Streamlit UploadedFile object
+        max_width: Maximum width in pixels (default 1920 for Full HD)
+        quality: JPEG quality 0-100 (default 85 for good balance)
+        adaptive: Pick the quality per photo by SSIM (quality = baseline)
+
+    Returns:
+        Tuple of (BytesIO buffer with optimized image, metadata dict)
+
+    Raises:
+        ValueError: If file is not a valid image
+
+    Storage Savings:
+        - Original 5MB photo → ~1MB optimized
+        - 1GB storage = ~1,000 photos (vs ~200 originals)
+
+    Note:
+        Thin wrapper around ingest_image(), which also extracts the EXIF date.
+    """
+    return ingest_image(uploaded_file, max_width=max_width, quality=quality, adaptive=adaptive)
+
+
+def generate_derivatives(
+    optimized_buffer: BytesIO,
+    sizes: Dict[str, int] = THUMBNAIL_SIZES,
+    quality: int = THUMBNAIL_QUALITY,
+    variant_formats: Dict[str, dict] = VARIANT_FORMATS
+) -> Dict[str, Tuple[BytesIO, dict, Dict[str, bytes]]]:
+    """
+    Create smaller display copies (thumbnails) of an optimized photo.
+
+    Args:
+        optimized_buffer: BytesIO with the optimized JPEG from optimize_image()
+        sizes: Mapping of derivative name to max width in pixels
+        quality: JPEG quality for the derivatives
+        variant_formats: Extra formats to encode each derivative in
+            (format -> Pillow save options)
+
+    Returns:
+        Dict mapping derivative name to (BytesIO buffer with progressive
+        JPEG, metadata dict, {format: encoded bytes}). Sizes wider than
+        the source image are skipped. metadata["variants"] has the
+        size_bytes of each format variant; variants that came out larger
+        than the JPEG are dropped.
+
+    Performance:
+        The source is decoded once using JPEG draft mode (DCT scaling straight
+        to the largest requested size), then each smaller derivative is
+        resized from the previous one instead of from the full image.
+        Variants are encoded from the same resized pixels, so each costs
+        one encode and no extra decode.
+    """
+    optimized_buffer.seek(0)
+    img = Image.open(optimized_buffer)
+    source_width, source_height = img.size
+
+    # Largest first so each step downscales from an already-small image
+    wanted = sorted(
+        ((name, width) for name, width in sizes.items() if width < source_width),
+        key=lambda item: item[1],
+        reverse=True
+    )
+
+    derivatives = {}
+    if not wanted:
+        optimized_buffer.seek(0)
+        return derivatives
+
+    largest_width = wanted[0][1]
+    img.draft("RGB", (largest_width, int(source_height * largest_width / source_width)))
+    img = img.convert("RGB")
+
+    for name, width in wanted:
+        height = max(1, int(source_height * width / source_width))
+        img = img.resize((width, height), Image.Resampling.LANCZOS)
+
+        buffer = BytesIO()
+        img.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+        buffer.seek(0)
+        jpeg_size = buffer.getbuffer().nbytes
+
+        variants = {}
+        for fmt, options in variant_formats.items():
+            variant_buffer = BytesIO()
+            img.save(variant_buffer, format=fmt.upper(), **options)
+            if variant_buffer.getbuffer().nbytes < jpeg_size:
+                variants[fmt] = variant_buffer.getvalue()
+
+        derivatives[name] = (buffer, {
+            "width": width,
+            "height": height,
+            "size_bytes": jpeg_size,
+            "variants": {fmt: {"size_bytes": len(data)} for fmt, data in variants.items()}
+        }, variants)
+
+    optimized_buffer.seek(0)
+    return derivatives
+
+
+def get_derivative_path(file_path: str, size_name: str) -> str:
+    """
+    Build the storage path of a derivative next to its full-size photo.
+
+    Example:
+        "baby/2025/12/20251209_143045_smile.jpg", "small"
+        → "baby/2025/12/20251209_143045_smile_small.jpg"
+    """
+    return f"{os.path.splitext(file_path)[0]}_{size_name}.jpg"
+
+
+def get_variant_path(derivative_path: str, fmt: str) -> str:
+    """
+    Build the storage path of a derivative's format variant.
+
+    Example:
+        "baby/2025/12/20251209_143045_smile_small.jpg", "webp"
+        → "baby/2025/12/20251209_143045_smile_small.webp"
+    """
+    return f"{os.path.splitext(derivative_path)[0]}.{fmt}"
+
+
+def stored_byte_size(metadata: dict) -> int:
+    """
+    Bytes a photo occupies in the bucket: optimized JPEG plus derivatives
+    and their format variants.
+
+    Args:
+        metadata: exif_data of a photo with size_bytes and derivatives filled in
+    """
+    derivatives = (metadata.get("derivatives") or {}).values()
+    return metadata["size_bytes"] + sum(
+        d["size_bytes"] + sum(v["size_bytes"] for v in (d.get("variants") or {}).values())
+        for d in derivatives
+    )
+
+
+def get_display_image(photo: dict, display_width: int) -> dict:
+    """
+    Pick the smallest stored image that still fills the display width.
+
+    Args:
+        photo: Photo row passed through resolve_photo_urls()
+        display_width: Width in pixels the image will be rendered at
+
+    Returns:
+        dict with url, width and height of the best-fitting derivative
+        (progressive JPEG), plus sources: its smaller format variants as
+        [{"type": "image/avif", "url": ...}, ...], smallest first, for a
+        <picture> element to let the browser pick one it supports.
+        Photos uploaded before derivatives existed get the full-size
+        file_url, no dimensions (width and height are None) and no sources.
+    """
+    derivatives = photo_derivatives(photo)
+
+    fitting = [
+        d for d in derivatives.values()
+        if d.get("url") and d.get("width", 0) >= display_width
+    ]
+    if fitting:
+        best = min(fitting, key=lambda d: d["width"])
+        variants = sorted(
+            (v["size_bytes"], fmt, v["url"])
+            for fmt, v in (best.get("variants") or {}).items() if v.get("url")
+        )
+        return {
+            "url": best["url"],
+            "width": best["width"],
+            "height": best["height"],
+            "sources": [{"type": IMAGE_CONTENT_TYPES[fmt], "url": url} for _, fmt, url in variants]
+        }
+
+    return {
+        "url": photo.get("thumbnail_url") or photo.get("file_url"),
+        "width": None,
+        "height": None,
+        "sources": []
+    }
+
+
+def get_display_url(photo: dict, display_width: int) -> str:
+    """Signed URL of get_display_image() (for st.image)."""
+    return get_display_image(photo, display_width)["url"]
+
+
 def extract_exif_date(uploaded_file) -> Optional[datetime]:
     """
     Extract photo date from EXIF metadata (if available).
@@ -166,81 +499,256 @@ def generate_filename(baby_id: str, photo_date: datetime, original_filename: str
     return f"{baby_id}/{year}/{month}/{filename}"
 
 
-def upload_photo(
+def _upload_image(supabase: Client, path: str, data: bytes) -> None:
+    """Upload image bytes to the baby-photos bucket (never overwrites)."""
+    supabase.storage.from_("baby-photos").upload(
+        path=path,
+        file=data,
+        file_options={
+            "content-type": IMAGE_CONTENT_TYPES[path.rsplit(".", 1)[-1]],
+            "upsert": "false"  # Don't overwrite existing files
+        }
+    )
+
+
+def _upload_derivatives(
+    supabase: Client,
+    file_path: str,
+    derivatives: Dict[str, Tuple[bytes, dict, Dict[str, bytes]]],
+    uploaded_paths: List[str]
+) -> Dict[str, dict]:
+    """
+    Upload derivatives and their format variants next to a full-size photo.
+
+    Args:
+        supabase: Authenticated Supabase client
+        file_path: Storage path of the full-size photo
+        derivatives: {size_name: (JPEG bytes, metadata, {format: bytes})}
+        uploaded_paths: Every uploaded path is appended (for cleanup on failure)
+
+    Returns:
+        Derivative info for exif_data["derivatives"] (metadata plus paths)
+    """
+    derivative_info = {}
+
+    for size_name, (derivative_bytes, derivative_meta, variants) in derivatives.items():
+        derivative_path = get_derivative_path(file_path, size_name)
+        _upload_image(supabase, derivative_path, derivative_bytes)
+        uploaded_paths.append(derivative_path)
+
+        variant_info = {}
+        for fmt, variant_bytes in variants.items():
+            variant_path = get_variant_path(derivative_path, fmt)
+            _upload_image(supabase, variant_path, variant_bytes)
+            uploaded_paths.append(variant_path)
+            variant_info[fmt] = {**derivative_meta["variants"][fmt], "path": variant_path}
+
+        derivative_info[size_name] = {**derivative_meta, "path": derivative_path, "variants": variant_info}
+
+    return derivative_info
+
+
+def friendly_upload_error(error_msg: str) -> str:
+    """Translate storage/database errors into user-facing messages."""
+    if "already exists" in error_msg.lower():
+        return "❌ A photo with this name already exists. Try renaming the file."
+    elif "quota" in error_msg.lower() or "storage" in error_msg.lower():
+        return "❌ Storage quota exceeded. Consider upgrading your Supabase plan."
+    elif "permission" in error_msg.lower() or "policy" in error_msg.lower():
+        return "❌ Permission denied. Check storage bucket policies in Supabase Dashboard."
+    else:
+        return f"❌ Upload failed: {error_msg}"
+
+
+# ============================================================================
+# Duplicate Detection (content hashes, migration 08)
+# ============================================================================
+
+class DuplicatePhotoError(Exception):
+    """Raised when the baby's timeline already holds a photo with the same content."""
+
+    def __init__(self, photo: dict):
+        super().__init__(f"Photo already uploaded ({photo['photo_date']})")
+        self.photo = photo
+
+
+def hash_file(fileobj) -> str:
+    """
+    SHA-256 of a file-like object, read in chunks.
+
+    Args:
+        fileobj: Binary file object (e.g., Streamlit UploadedFile)
+
+    Returns:
+        Hex digest (the file pointer is reset to the start afterwards)
+    """
+    fileobj.seek(0)
+    digest = hashlib.file_digest(fileobj, "sha256").hexdigest()
+    fileobj.seek(0)
+    return digest
+
+
+def find_duplicate_photos(
     supabase: Client,
     baby_id: str,
-    uploaded_file,
+    hashes: List[str],
+    column: str = "original_sha256"
+) -> Dict[str, dict]:
+    """
+    Look up which content hashes already exist for a baby.
+
+    Args:
+        supabase: Supabase client
+        baby_id: UUID of the baby
+        hashes: Hex digests to check
+        column: "original_sha256" or "optimized_sha256"
+
+    Returns:
+        Dict mapping each hash found to its photo row (timeline_card columns)
+
+    Performance:
+        One indexed query for any number of hashes.
+    """
+    hashes = list(dict.fromkeys(h for h in hashes if h))
+    if not hashes:
+        return {}
+
+    result = supabase.table("photos") \
+        .select(f"{resolve_projection('photos', 'timeline_card')}, {column}") \
+        .eq("baby_id", baby_id) \
+        .in_(column, hashes) \
+        .execute()
+
+    return {row[column]: row for row in result.data or []}
+
+
+def find_duplicate_photo(
+    supabase: Client,
+    baby_id: str,
+    original_sha256: Optional[str] = None,
+    optimized_sha256: Optional[str] = None
+) -> Optional[dict]:
+    """
+    Find a photo of this baby with the same original or optimized content.
+
+    Args:
+        supabase: Supabase client
+        baby_id: UUID of the baby
+        original_sha256: Hash of the uploaded bytes
+        optimized_sha256: Hash of the optimized JPEG
+
+    Returns:
+        Existing photo row with signed URLs, or None
+
+    Example:
+        duplicate = find_duplicate_photo(supabase, baby_id, original_sha256=hash_file(f))
+        if duplicate:
+            st.link_button("Open existing photo", duplicate["file_url"])
+    """
+    def fetch() -> Optional[dict]:
+        for column, digest in (("original_sha256", original_sha256), ("optimized_sha256", optimized_sha256)):
+            found = find_duplicate_photos(supabase, baby_id, [digest], column)
+            if found:
+                return found[digest]
+        return None
+
+    try:
+        photo = query_cache.get_or_load(
+            baby_id, "photos", ("duplicate", original_sha256, optimized_sha256),
+            client_scope(supabase), fetch
+        )
+    except Exception as e:
+        logger.error(f"Error checking for duplicate photo: {e}", exc_info=True)
+        return None
+
+    return resolve_photo_urls(supabase, [photo])[0] if photo else None
+
+
+def duplicate_photo_message(photo: dict) -> str:
+    """User-facing message for a DuplicatePhotoError."""
+    photo_date = datetime.strptime(photo["photo_date"], "%Y-%m-%d").strftime("%B %d, %Y")
+    return f"♻️ Already in the timeline (photo from {photo_date})"
+
+
+def store_photo(
+    supabase: Client,
+    baby_id: str,
+    data: bytes,
+    filename: str,
     photo_date: datetime,
     caption: str = "",
-    user_id: str = None
-) -> Tuple[bool, str, Optional[str]]:
+    user_id: str = None,
+    optimized: Optional[ProcessedImage] = None,
+    original_sha256: Optional[str] = None
+) -> Tuple[str, dict, int]:
     """
-    Upload photo to Supabase Storage and save metadata to database.
+    Optimize, upload and record one photo (raises on failure).
 
     Args:
         supabase: Authenticated Supabase client
         baby_id: UUID of the baby
-        uploaded_file: Streamlit UploadedFile object
+        data: Raw bytes of the uploaded file
+        filename: Original filename (used in the storage path)
         photo_date: Date the photo was taken
         caption: Optional caption (max 500 chars)
         user_id: User ID of uploader
+        optimized: Result of process_image() for these bytes, if already computed
+        original_sha256: SHA-256 of data, if already computed (see hash_file())
 
     Returns:
-        Tuple of (success: bool, message: str, photo_id: str or None)
+        Tuple of (photo_id, metadata, optimized size in bytes)
 
-    Process:
-        1. Optimize image (resize, compress)
-        2. Upload to Supabase Storage bucket
-        3. Save metadata to photos table
-        4. Return success with photo_id
+    Raises:
+        DuplicatePhotoError: The baby already has a photo with the same
+            original or optimized content (nothing is uploaded)
 
-    Storage Path:
-        bucket: baby-photos
-        path: baby_id/YYYY/MM/timestamp_filename.jpg
+    Note:
+        Objects uploaded before a failure are removed again, so a retry
+        starts from a clean slate. Used by upload_photo() and by the
+        background upload queue (src/upload_queue.py).
     """
-    try:
-        # Step 1: Validate file size (before optimization)
-        file_size_mb = uploaded_file.size / (1024 * 1024)
-        if file_size_mb > 10:
-            return False, f"❌ File too large: {file_size_mb:.1f}MB (max 10MB)", None
+    # Skip all work for a photo that is already in the timeline
+    original_sha256 = original_sha256 or hashlib.sha256(data).hexdigest()
+    duplicate = find_duplicate_photo(supabase, baby_id, original_sha256=original_sha256)
+    if duplicate:
+        raise DuplicatePhotoError(duplicate)
 
-        # Step 2: Optimize image
-        uploaded_file.seek(0)  # Reset file pointer
-        optimized_buffer, metadata = optimize_image(uploaded_file)
+    # Optimize image + derivatives (reuse the preview-time result if available)
+    optimized_bytes, metadata, derivatives = optimized if optimized is not None else process_image(data)
+    metadata = dict(metadata)
 
-        optimized_size_mb = optimized_buffer.getbuffer().nbytes / (1024 * 1024)
+    # Same picture re-exported with different metadata optimizes to the same JPEG
+    optimized_sha256 = hashlib.sha256(optimized_bytes).hexdigest()
+    duplicate = find_duplicate_photo(supabase, baby_id, optimized_sha256=optimized_sha256)
+    if duplicate:
+        raise DuplicatePhotoError(duplicate)
 
-        # Step 3: Generate filename and path
-        uploaded_file.seek(0)
-        file_path = generate_filename(baby_id, photo_date, uploaded_file.name)
-
-        # Step 4: Upload to Supabase Storage
-        supabase.storage.from_("baby-photos").upload(
-            path=file_path,
-            file=optimized_buffer.getvalue(),  # Convert BytesIO to bytes
-            file_options={
-                "content-type": "image/jpeg",
-                "upsert": "false"  # Don't overwrite existing files
-            }
-        )
+    file_path = generate_filename(baby_id, photo_date, filename)
+    uploaded_paths = []
 
-        # Step 5: Create signed URL (works with private buckets)
-        # Expires in 10 years (315360000 seconds) - essentially permanent for family photos
-        # Note: For true permanence, consider making bucket public or implementing URL refresh logic
-        signed_url_response = supabase.storage.from_("baby-photos").create_signed_url(
-            file_path,
-            expires_in=315360000  # 10 years in seconds
-        )
-        file_url = signed_url_response.get("signedURL") or signed_url_response.get("signedUrl")
+    try:
+        # Upload to Supabase Storage
+        _upload_image(supabase, file_path, optimized_bytes)
+        uploaded_paths.append(file_path)
+
+        # Upload display derivatives (thumbnails for timeline cards)
+        metadata["derivatives"] = _upload_derivatives(supabase, file_path, derivatives, uploaded_paths)
+        metadata["size_bytes"] = len(optimized_bytes)
+        placeholder = metadata.pop("placeholder", None)  # Own column, not exif_data
 
-        # Step 6: Save metadata to database
+        # Save metadata to database
         photo_data = {
             "baby_id": baby_id,
-            "file_url": file_url,
+            "storage_path": file_path,
             "caption": caption[:500] if caption else None,  # Enforce 500 char limit
             "photo_date": photo_date.strftime("%Y-%m-%d"),
             "uploaded_by": user_id,
-            "exif_data": metadata  # Store optimization metadata
+            "exif_data": metadata,  # Store optimization metadata
+            "original_sha256": original_sha256,
+            "optimized_sha256": optimized_sha256,
+            "perceptual_hash": metadata.get("perceptual_hash"),
+            "byte_size": stored_byte_size(metadata),
+            "placeholder": placeholder
         }
 
         result = supabase.table("photos").insert(photo_data).execute()
@@ -248,7 +756,82 @@ def upload_photo(
         if not result.data:
             raise Exception("Database insert failed - no data returned")
 
-        photo_id = result.data[0]["photo_id"]
+    except Exception as e:
+        if uploaded_paths:
+            try:
+                supabase.storage.from_("baby-photos").remove(uploaded_paths)
+            except Exception as cleanup_error:
+                logger.error(f"Cleanup after failed upload failed: {cleanup_error}", exc_info=True)
+
+        # Lost a race with another upload of the same file
+        if isinstance(e, APIError) and e.code == UNIQUE_VIOLATION_CODE:
+            query_cache.invalidate(baby_id, ["photos"])
+            duplicate = find_duplicate_photo(supabase, baby_id, original_sha256=original_sha256)
+            if duplicate:
+                raise DuplicatePhotoError(duplicate) from e
+        raise
+
+    photo_id = result.data[0]["photo_id"]
+    query_cache.invalidate(baby_id, PHOTO_CACHE_NAMESPACES)
+    adjust_timeline_month_index(baby_id, "photo", photo_data["photo_date"], +1)
+    near_duplicate_index.add(baby_id, photo_id, photo_data["perceptual_hash"])
+
+    return photo_id, metadata, len(optimized_bytes)
+
+
+def upload_photo(
+    supabase: Client,
+    baby_id: str,
+    uploaded_file,
+    photo_date: datetime,
+    caption: str = "",
+    user_id: str = None,
+    optimized: Optional[ProcessedImage] = None
+) -> Tuple[bool, str, Optional[str]]:
+    """
+    Upload photo to Supabase Storage and save metadata to database.
+
+    Args:
+        supabase: Authenticated Supabase client
+        baby_id: UUID of the baby
+        uploaded_file: Streamlit UploadedFile object
+        photo_date: Date the photo was taken
+        caption: Optional caption (max 500 chars)
+        user_id: User ID of uploader
+        optimized: Result of process_image() for this file, if already
+            computed (skips decoding the upload a second time)
+
+    Returns:
+        Tuple of (success: bool, message: str, photo_id: str or None)
+
+    Process:
+        1. Optimize image and generate small/medium derivatives (shared
+           process pool, see process_image())
+        2. Upload to Supabase Storage bucket
+        3. Upload the derivatives
+        4. Save storage paths and metadata to photos table
+        5. Return success with photo_id
+
+    Note:
+        No URLs are stored - resolve_photo_urls() signs short-lived URLs
+        from storage_path when the photo is displayed. To return to the
+        page before storage I/O finishes, submit to upload_queue instead.
+
+    Storage Path:
+        bucket: baby-photos
+        path: baby_id/YYYY/MM/timestamp_filename.jpg
+    """
+    try:
+        # Validate file size (before optimization)
+        file_size_mb = uploaded_file.size / (1024 * 1024)
+        if file_size_mb > 10:
+            return False, f"❌ File too large: {file_size_mb:.1f}MB (max 10MB)", None
+
+        photo_id, metadata, optimized_size = store_photo(
+            supabase, baby_id, uploaded_file.getvalue(), uploaded_file.name,
+            photo_date, caption, user_id, optimized, hash_file(uploaded_file)
+        )
+        optimized_size_mb = optimized_size / (1024 * 1024)
 
         # Success message with optimization stats
         success_msg = (
@@ -261,18 +844,272 @@ def upload_photo(
 
         return True, success_msg, photo_id
 
-    except Exception as e:
-        error_msg = str(e)
+    except DuplicatePhotoError as e:
+        return False, duplicate_photo_message(e.photo), None
 
+    except Exception as e:
         # Provide helpful error messages
-        if "already exists" in error_msg.lower():
-            return False, "❌ A photo with this name already exists. Try renaming the file.", None
-        elif "quota" in error_msg.lower() or "storage" in error_msg.lower():
-            return False, "❌ Storage quota exceeded. Consider upgrading your Supabase plan.", None
-        elif "permission" in error_msg.lower() or "policy" in error_msg.lower():
-            return False, "❌ Permission denied. Check storage bucket policies in Supabase Dashboard.", None
-        else:
-            return False, f"❌ Upload failed: {error_msg}", None
+        return False, friendly_upload_error(str(e)), None
+
+
+def _process_image_bytes(data: bytes) -> ProcessedImage:
+    """
+    Optimize raw image bytes and build derivatives (process-pool worker).
+
+    Returns:
+        Tuple of (optimized JPEG bytes, metadata,
+        {size_name: (JPEG bytes, metadata, {format: variant bytes})})
+
+    Note:
+        Works on plain bytes so arguments and results can be pickled
+        between processes.
+    """
+    buffer, metadata = ingest_image(BytesIO(data))
+    derivatives = generate_derivatives(buffer)
+    return (
+        buffer.getvalue(),
+        metadata,
+        {name: (d_buffer.getvalue(), d_meta, variants) for name, (d_buffer, d_meta, variants) in derivatives.items()}
+    )
+
+
+def process_image(data: bytes) -> ProcessedImage:
+    """
+    Optimize an uploaded photo and build its derivatives off the server process.
+
+    Args:
+        data: Raw bytes of the uploaded file
+
+    Returns:
+        ProcessedImage (see _process_image_bytes())
+
+    Raises:
+        ValueError: If the file is not a valid image, is too large, times
+            out or crashes its worker (see src/image_pool.py)
+
+    Performance:
+        Runs in the shared image_pool, so Pillow holds the GIL of a worker
+        process instead of the Streamlit server: other sessions keep
+        rerunning while photos are being processed.
+    """
+    return image_pool.run(_process_image_bytes, data)
+
+
+def _find_batch_duplicates(supabase: Client, baby_id: str, hashes: List[str], column: str) -> Dict[str, dict]:
+    """
+    find_duplicate_photos() for a batch, treating a failed lookup as "none known".
+
+    Note:
+        Like store_photo()'s lookups, a transient error must not abort the
+        whole batch; the unique index (migration 08) still rejects real
+        duplicates at insert time.
+    """
+    try:
+        return find_duplicate_photos(supabase, baby_id, hashes, column)
+    except Exception as e:
+        logger.error(f"Error checking batch for duplicate photos: {e}", exc_info=True)
+        return {}
+
+
+def upload_photos_batch(
+    supabase: Client,
+    baby_id: str,
+    uploaded_files: List,
+    default_date: datetime,
+    caption: str = "",
+    user_id: str = None,
+    progress_callback: Optional[Callable[[int, str], None]] = None
+) -> List[Dict]:
+    """
+    Upload many photos at once with parallel processing.
+
+    Args:
+        supabase: Authenticated Supabase client
+        baby_id: UUID of the baby
+        uploaded_files: List of Streamlit UploadedFile objects
+        default_date: Photo date for files without an EXIF date
+        caption: Optional caption applied to every photo
+        user_id: User ID of uploader
+        progress_callback: Called as (file_index, status_text) whenever a
+            file changes stage; always invoked from the calling thread
+
+    Returns:
+        One dict per input file, in order:
+        {"name": str, "success": bool, "message": str, "photo_id": str or None}
+
+    Process:
+        1. Skip files already in the timeline (one content-hash query)
+        2. Optimize images + derivatives in the shared process pool (CPU-bound)
+        3. Upload files to storage in a thread pool (I/O-bound)
+        4. Insert all photo rows in one bulk insert
+
+    Note:
+        Failures are reported per file; one bad photo doesn't stop the batch.
+        If the final bulk insert fails, the uploaded files are removed again,
+        and so are a photo's files when one of its uploads fails part-way.
+    """
+    results = [
+        {"name": f.name, "success": False, "message": "", "photo_id": None}
+        for f in uploaded_files
+    ]
+
+    def report(index: int, status: str) -> None:
+        if progress_callback:
+            progress_callback(index, status)
+
+    # Step 1: Validate sizes and read bytes
+    pending = {}
+    for index, uploaded_file in enumerate(uploaded_files):
+        file_size_mb = uploaded_file.size / (1024 * 1024)
+        if file_size_mb > MAX_FILE_SIZE_MB:
+            results[index]["message"] = f"❌ File too large: {file_size_mb:.1f}MB (max {MAX_FILE_SIZE_MB}MB)"
+            report(index, results[index]["message"])
+            continue
+
+        uploaded_file.seek(0)
+        pending[index] = uploaded_file.getvalue()
+
+    # Skip photos already in the timeline (or twice in this batch) before any work
+    original_hashes = {index: hashlib.sha256(data).hexdigest() for index, data in pending.items()}
+    existing = _find_batch_duplicates(supabase, baby_id, list(original_hashes.values()), "original_sha256")
+    seen = set()
+    for index, digest in original_hashes.items():
+        if digest in existing or digest in seen:
+            photo = existing.get(digest)
+            results[index]["message"] = duplicate_photo_message(photo) if photo else "♻️ Duplicate within this batch"
+            report(index, results[index]["message"])
+            del pending[index]
+        seen.add(digest)
+
+    # Step 2: Optimize in the shared process pool (PIL holds the GIL while resizing)
+    processed = {}
+    futures = {image_pool.submit(_process_image_bytes, data): index for index, data in pending.items()}
+    for future in as_completed(futures):
+        index = futures[future]
+        try:
+            processed[index] = future.result()
+            report(index, "🛠️ Optimized")
+        except Exception as e:
+            results[index]["message"] = f"❌ {str(e)}"
+            report(index, results[index]["message"])
+
+    # Same check on the optimized output (re-exports with different metadata)
+    optimized_hashes = {index: hashlib.sha256(item[0]).hexdigest() for index, item in processed.items()}
+    existing = _find_batch_duplicates(supabase, baby_id, list(optimized_hashes.values()), "optimized_sha256")
+    seen = set()
+    for index, digest in sorted(optimized_hashes.items()):
+        if digest in existing or digest in seen:
+            photo = existing.get(digest)
+            results[index]["message"] = duplicate_photo_message(photo) if photo else "♻️ Duplicate within this batch"
+            report(index, results[index]["message"])
+            del processed[index]
+        seen.add(digest)
+
+    # Step 3: Upload to storage in a thread pool
+    def upload_one(index: int) -> dict:
+        optimized_bytes, metadata, derivatives = processed[index]
+        photo_date = datetime.strptime(metadata["exif_date"], "%Y-%m-%d") \
+            if metadata.get("exif_date") else default_date
+
+        file_path = generate_filename(baby_id, photo_date, uploaded_files[index].name)
+        # Timestamped names collide within the same second - keep them unique
+        file_path = file_path[:-4] + f"_{index}.jpg"
+
+        paths = []
+        try:
+            _upload_image(supabase, file_path, optimized_bytes)
+            paths.append(file_path)
+            derivative_info = _upload_derivatives(supabase, file_path, derivatives, paths)
+        except Exception:
+            # No row will reference this photo - don't leave its files behind
+            if paths:
+                try:
+                    supabase.storage.from_("baby-photos").remove(paths)
+                except Exception as cleanup_error:
+                    logger.error(f"Cleanup after failed upload failed: {cleanup_error}", exc_info=True)
+            raise
+
+        return {
+            "date": photo_date.strftime("%Y-%m-%d"),
+            "full": file_path,
+            "derivatives": derivative_info,
+            "paths": paths
+        }
+
+    uploaded = {}
+    with ThreadPoolExecutor(max_workers=UPLOAD_THREAD_WORKERS) as pool:
+        futures = {pool.submit(upload_one, index): index for index in processed}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                uploaded[index] = future.result()
+                report(index, "☁️ Uploaded")
+            except Exception as e:
+                results[index]["message"] = friendly_upload_error(str(e))
+                report(index, results[index]["message"])
+
+    if not uploaded:
+        return results
+
+    order = sorted(uploaded)
+    all_paths = [path for index in order for path in uploaded[index]["paths"]]
+
+    try:
+        # Step 4: Bulk insert photo rows
+        rows = []
+        for index in order:
+            optimized_bytes, metadata, _ = processed[index]
+            upload = uploaded[index]
+            metadata = dict(metadata)
+            metadata["derivatives"] = upload["derivatives"]
+            metadata["size_bytes"] = len(optimized_bytes)
+            placeholder = metadata.pop("placeholder", None)
+
+            rows.append({
+                "baby_id": baby_id,
+                "storage_path": upload["full"],
+                "caption": caption[:500] if caption else None,
+                "photo_date": upload["date"],
+                "uploaded_by": user_id,
+                "exif_data": metadata,
+                "original_sha256": original_hashes[index],
+                "optimized_sha256": optimized_hashes[index],
+                "perceptual_hash": metadata.get("perceptual_hash"),
+                "byte_size": stored_byte_size(metadata),
+                "placeholder": placeholder
+            })
+
+        result = supabase.table("photos").insert(rows).execute()
+
+        if not result.data or len(result.data) != len(rows):
+            raise Exception("Database insert failed - no data returned")
+
+    except Exception as e:
+        # Don't leave orphaned files behind if the rows never made it in
+        try:
+            supabase.storage.from_("baby-photos").remove(all_paths)
+        except Exception as cleanup_error:
+            logger.error(f"Cleanup after failed batch insert failed: {cleanup_error}", exc_info=True)
+
+        for index in order:
+            results[index]["message"] = friendly_upload_error(str(e))
+            report(index, results[index]["message"])
+        return results
+
+    query_cache.invalidate(baby_id, PHOTO_CACHE_NAMESPACES)
+    for row in rows:
+        adjust_timeline_month_index(baby_id, "photo", row["photo_date"], +1)
+
+    for index, row in zip(order, result.data):
+        near_duplicate_index.add(baby_id, row["photo_id"], row.get("perceptual_hash"))
+        results[index].update({
+            "success": True,
+            "message": "✅ Uploaded",
+            "photo_id": row["photo_id"]
+        })
+        report(index, "✅ Uploaded")
+
+    return results
 
 
 def delete_photo(supabase: Client, photo_id: str, baby_id: str) -> Tuple[bool, str]:
@@ -295,7 +1132,7 @@ def delete_photo(supabase: Client, photo_id: str, baby_id: str) -> Tuple[bool, s
     try:
         # Step 1: Get photo metadata
         result = supabase.table("photos") \
-            .select("file_url, baby_id") \
+            .select("storage_path, baby_id, photo_date, exif_data") \
             .eq("photo_id", photo_id) \
             .execute()
 
@@ -308,16 +1145,17 @@ def delete_photo(supabase: Client, photo_id: str, baby_id: str) -> Tuple[bool, s
         if photo["baby_id"] != baby_id:
             return False, "❌ Permission denied"
 
-        # Step 2: Extract file path from URL
-        # URL format: https://xxx.supabase.co/storage/v1/object/public/baby-photos/path/to/file.jpg
-        file_url = photo["file_url"]
-        file_path = file_url.split("/baby-photos/")[-1]
+        # Step 2: Delete the photo and its derivatives from storage
+        paths = photo_storage_paths(photo)
+        if paths:
+            supabase.storage.from_("baby-photos").remove(paths)
+            signed_url_cache.discard(paths)
 
-        # Step 3: Delete from storage
-        supabase.storage.from_("baby-photos").remove([file_path])
-
-        # Step 4: Delete from database
+        # Step 3: Delete from database
         supabase.table("photos").delete().eq("photo_id", photo_id).execute()
+        query_cache.invalidate(baby_id, PHOTO_CACHE_NAMESPACES)
+        adjust_timeline_month_index(baby_id, "photo", photo["photo_date"], -1)
+        near_duplicate_index.forget(baby_id)
 
         return True, "✅ Photo deleted successfully"
 
@@ -325,6 +1163,47 @@ def delete_photo(supabase: Client, photo_id: str, baby_id: str) -> Tuple[bool, s
         return False, f"❌ Delete failed: {str(e)}"
 
 
+def get_recent_photos(
+    supabase: Client,
+    baby_id: str,
+    limit: int = 5,
+    columns: str = "timeline_card"
+) -> list:
+    """
+    Get the most recently uploaded photos for a baby.
+
+    Args:
+        supabase: Supabase client
+        baby_id: UUID of the baby
+        limit: Maximum number of photos to return
+        columns: Projection name from PROJECTIONS or explicit column list
+
+    Returns:
+        List of photo dictionaries with signed URLs (newest upload first)
+    """
+    select = resolve_projection("photos", columns)
+
+    def fetch() -> list:
+        result = supabase.table("photos") \
+            .select(select) \
+            .eq("baby_id", baby_id) \
+            .order("upload_date", desc=True) \
+            .limit(limit) \
+            .execute()
+
+        return result.data if result.data else []
+
+    try:
+        photos = query_cache.get_or_load(
+            baby_id, "photos", ("recent", limit, select), client_scope(supabase), fetch
+        )
+        return resolve_photo_urls(supabase, photos)
+
+    except Exception as e:
+        logger.error(f"Error fetching recent photos: {e}", exc_info=True)
+        return []
+
+
 def get_storage_usage(supabase: Client, baby_id: str) -> dict:
     """
     Get storage usage statistics for a baby.
@@ -336,37 +1215,55 @@ def get_storage_usage(supabase: Client, baby_id: str) -> dict:
     Returns:
         dict with keys:
         - photo_count: Number of photos
-        - total_size_mb: Estimated total size in MB
+        - total_size_mb: Total size in MB of stored photos and derivatives
         - storage_limit_mb: Free tier limit (1000 MB)
         - percentage_used: Percentage of limit used
+        - estimated: True if some photos have no measured size yet
 
     Note:
-        Size is estimated based on average optimized photo size (~1MB)
-        For exact size, would need to query storage bucket metadata
-    """
-    try:
-        # Count photos
-        result = supabase.table("photos") \
-            .select("photo_id", count="exact") \
-            .eq("baby_id", baby_id) \
-            .execute()
+        Sizes come from the baby_storage_usage running totals (migration
+        10). Photos uploaded before that migration count as
+        AVG_OPTIMIZED_PHOTO_SIZE_MB each until reconcile_storage_usage.py
+        has measured them.
 
-        photo_count = result.count or 0
+    Performance:
+        One primary-key lookup instead of counting the photos table.
+    """
+    def load_usage() -> dict:
+        try:
+            result = supabase.table("baby_storage_usage") \
+                .select("photo_count, total_bytes, unsized_photo_count") \
+                .eq("baby_id", baby_id) \
+                .execute()
+        except APIError as e:
+            if e.code not in MISSING_TABLE_CODES:
+                raise
+            # Migration 10 not applied yet: count photos, estimate sizes
+            result = supabase.table("photos") \
+                .select("photo_id", count="exact") \
+                .eq("baby_id", baby_id) \
+                .execute()
+            count = result.count or 0
+            return {"photo_count": count, "total_bytes": 0, "unsized_photo_count": count}
 
-        # Estimate size (avg optimized photo = 1MB)
-        estimated_size_mb = photo_count * 1.0
+        if not result.data:
+            return {"photo_count": 0, "total_bytes": 0, "unsized_photo_count": 0}
+        return result.data[0]
 
-        # Free tier limit
-        storage_limit_mb = 1000  # 1GB
+    try:
+        usage = query_cache.get_or_load(
+            baby_id, "photos", ("usage",), client_scope(supabase), load_usage
+        )
 
-        # Calculate percentage
-        percentage_used = (estimated_size_mb / storage_limit_mb) * 100
+        total_size_mb = usage["total_bytes"] / (1024 * 1024) \
+            + usage["unsized_photo_count"] * AVG_OPTIMIZED_PHOTO_SIZE_MB
 
         return {
-            "photo_count": photo_count,
-            "total_size_mb": estimated_size_mb,
-            "storage_limit_mb": storage_limit_mb,
-            "percentage_used": percentage_used
+            "photo_count": usage["photo_count"],
+            "total_size_mb": total_size_mb,
+            "storage_limit_mb": STORAGE_LIMIT_FREE_TIER_MB,
+            "percentage_used": (total_size_mb / STORAGE_LIMIT_FREE_TIER_MB) * 100,
+            "estimated": usage["unsized_photo_count"] > 0
         }
 
     except Exception as e:
@@ -374,6 +1271,7 @@ def get_storage_usage(supabase: Client, baby_id: str) -> dict:
         return {
             "photo_count": 0,
             "total_size_mb": 0,
-            "storage_limit_mb": 1000,
-            "percentage_used": 0
+            "storage_limit_mb": STORAGE_LIMIT_FREE_TIER_MB,
+            "percentage_used": 0,
+            "estimated": False
         }
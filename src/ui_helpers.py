@@ -5,7 +5,9 @@ Utilities for loading external assets and styling.
 
 import streamlit as st
 import os
+from html import escape
 from pathlib import Path
+from typing import Dict, List, Optional
 
 
 def load_css(file_path: str = "assets/styles.css") -> None:
@@ -34,3 +36,50 @@ def load_css(file_path: str = "assets/styles.css") -> None:
             st.markdown(f"<style>{css_content}</style>", unsafe_allow_html=True)
     except Exception as e:
         st.error(f"❌ Failed to load CSS: {str(e)}")
+
+
+def render_progressive_image(
+    url: str,
+    placeholder: Optional[str],
+    width: Optional[int],
+    height: Optional[int],
+    alt_text: str,
+    sources: Optional[List[Dict[str, str]]] = None
+) -> None:
+    """
+    Show an image over its blurred inline placeholder.
+
+    Args:
+        url: Signed URL of the image (JPEG, supported by every browser)
+        placeholder: Data URI from compute_placeholder() (None = no placeholder)
+        width: Pixel width of the image at url (for the aspect ratio)
+        height: Pixel height of the image at url
+        alt_text: Accessible description, also shown as the caption
+        sources: Smaller alternatives, preferred first, as [{"type", "url"}]
+            (see get_display_image()); the browser loads the first type it
+            supports, else url
+
+    Note:
+        The placeholder arrives with the page itself, so the card has its
+        final size and a blurred preview in the first paint; the browser
+        then draws the real image on top once it has downloaded. Falls back
+        to st.image() for photos without a placeholder or dimensions, and
+        for local file paths (local backend), which browsers can't load.
+    """
+    if not (placeholder and width and height and url.startswith(("http://", "https://"))):
+        st.image(url, caption=alt_text, use_container_width=True)
+        return
+
+    source_tags = "".join(
+        f'<source type="{escape(source["type"])}" srcset="{escape(source["url"])}">'
+        for source in sources or []
+    )
+    st.markdown(
+        f'<div class="progressive-photo" style="aspect-ratio: {width} / {height}">'
+        f'<img class="progressive-photo-placeholder" src="{escape(placeholder)}" alt="" aria-hidden="true">'
+        f'<picture>{source_tags}'
+        f'<img src="{escape(url)}" alt="{escape(alt_text)}" width="{width}" height="{height}" loading="lazy" decoding="async">'
+        f'</picture></div>',
+        unsafe_allow_html=True
+    )
+    st.caption(alt_text)
@@ -0,0 +1,268 @@
+"""
+Upload Queue for Baby Timeline
+Runs photo ingest (optimize, upload, insert) on background worker threads
+so the Upload page returns as soon as the bytes are received.
+"""
+
+import queue
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpx
+from postgrest.exceptions import APIError
+from storage3.exceptions import StorageApiError
+from supabase import Client
+
+from src.constants import (
+    UPLOAD_QUEUE_WORKERS,
+    UPLOAD_MAX_ATTEMPTS,
+    UPLOAD_RETRY_BASE_SECONDS,
+    UPLOAD_JOB_RETENTION_SECONDS
+)
+from src.storage import (
+    store_photo,
+    friendly_upload_error,
+    ProcessedImage,
+    DuplicatePhotoError,
+    duplicate_photo_message
+)
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Job states
+JOB_QUEUED = "queued"
+JOB_PROCESSING = "processing"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_DUPLICATE = "duplicate"  # Content already in the timeline; nothing uploaded
+ACTIVE_JOB_STATES = (JOB_QUEUED, JOB_PROCESSING)
+
+# HTTP statuses worth retrying (timeouts, rate limits, server errors)
+TRANSIENT_HTTP_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+# Postgres / PostgREST codes worth retrying (connection loss, overload,
+# serialization failures, PostgREST unable to reach the database)
+TRANSIENT_DB_CODE_PREFIXES = ("08", "53", "57P", "40001", "40P01", "PGRST000", "PGRST001", "PGRST002", "PGRST003")
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Decide whether a failed upload attempt is worth retrying.
+
+    Args:
+        error: Exception raised by store_photo()
+
+    Returns:
+        True for network errors, timeouts, rate limits and 5xx responses;
+        False for bad images, permission errors, duplicates, etc.
+    """
+    if isinstance(error, (httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+
+    if isinstance(error, StorageApiError):
+        try:
+            return int(error.status) in TRANSIENT_HTTP_STATUSES
+        except (TypeError, ValueError):
+            return False
+
+    if isinstance(error, APIError):
+        return str(error.code or "").startswith(TRANSIENT_DB_CODE_PREFIXES)
+
+    return False
+
+
+@dataclass
+class UploadJob:
+    """Status of one queued photo (snapshots are handed to the UI)."""
+    job_id: str
+    baby_id: str
+    filename: str
+    photo_date: datetime
+    caption: str
+    state: str = JOB_QUEUED
+    message: str = "⏳ Queued"
+    attempts: int = 0
+    photo_id: Optional[str] = None
+    duplicate_of: Optional[dict] = None  # Existing photo row for JOB_DUPLICATE
+    submitted_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+
+class UploadQueue:
+    """
+    In-process job queue with retrying worker threads.
+
+    Jobs live in memory, so their status is visible to every Streamlit
+    session of this server process (the Upload page lists its own jobs,
+    the timeline shows placeholders for a baby's in-flight photos).
+    Transient failures are retried with exponential backoff plus jitter;
+    finished jobs are kept for retention_seconds, then forgotten.
+
+    Usage:
+        job_id = upload_queue.submit(supabase, baby_id, data, "IMG_001.jpg", photo_date)
+        upload_queue.get_jobs([job_id])[0].state  # → "queued" ... "done"
+    """
+
+    def __init__(self, workers: int, max_attempts: int, retry_base_seconds: float, retention_seconds: float):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retention_seconds = retention_seconds
+        self._jobs: Dict[str, UploadJob] = {}
+        # job_id -> (client, raw bytes, user_id, optimized, original_sha256); dropped once finished
+        self._payloads: Dict[str, Tuple[Client, bytes, Optional[str], Optional[ProcessedImage], Optional[str]]] = {}
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        supabase: Client,
+        baby_id: str,
+        data: bytes,
+        filename: str,
+        photo_date: datetime,
+        caption: str = "",
+        user_id: str = None,
+        optimized: Optional[ProcessedImage] = None,
+        original_sha256: Optional[str] = None
+    ) -> str:
+        """
+        Queue a photo for background ingest.
+
+        Args:
+            supabase: Authenticated Supabase client (used from a worker thread)
+            baby_id: UUID of the baby
+            data: Raw bytes of the uploaded file
+            filename: Original filename
+            photo_date: Date the photo was taken
+            caption: Optional caption
+            user_id: User ID of uploader
+            optimized: Result of process_image() for these bytes, if already computed
+            original_sha256: SHA-256 of data, if already computed
+
+        Returns:
+            job_id for get_jobs()
+        """
+        job = UploadJob(
+            job_id=str(uuid.uuid4()),
+            baby_id=baby_id,
+            filename=filename,
+            photo_date=photo_date,
+            caption=caption
+        )
+
+        with self._lock:
+            self._purge_finished()
+            self._jobs[job.job_id] = job
+            self._payloads[job.job_id] = (supabase, data, user_id, optimized, original_sha256)
+            self._ensure_workers()
+
+        self._queue.put(job.job_id)
+        return job.job_id
+
+    def get_jobs(self, job_ids: Iterable[str]) -> List[UploadJob]:
+        """Snapshots of the given jobs (unknown or purged ids are skipped)."""
+        with self._lock:
+            return [replace(self._jobs[job_id]) for job_id in job_ids if job_id in self._jobs]
+
+    def active_jobs(self, baby_id: str) -> List[UploadJob]:
+        """Snapshots of a baby's queued and processing jobs, oldest first."""
+        with self._lock:
+            jobs = [
+                replace(job) for job in self._jobs.values()
+                if job.baby_id == baby_id and job.state in ACTIVE_JOB_STATES
+            ]
+        return sorted(jobs, key=lambda job: job.submitted_at)
+
+    def _ensure_workers(self) -> None:
+        """Start worker threads on first use (caller must hold the lock)."""
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name="upload-queue-worker", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _purge_finished(self) -> None:
+        """Forget jobs finished more than retention_seconds ago (caller holds the lock)."""
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [j.job_id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def _update(self, job_id: str, **changes) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            for name, value in changes.items():
+                setattr(job, name, value)
+
+    def _work(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run(job_id)
+            except Exception as e:
+                # Never let one job kill the worker
+                logger.error(f"Upload job {job_id} crashed: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job_id: str) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            supabase, data, user_id, optimized, original_sha256 = self._payloads[job_id]
+            job.state = JOB_PROCESSING
+            job.attempts += 1
+            job.message = "⚙️ Optimizing and uploading..."
+            attempt = job.attempts
+
+        try:
+            photo_id, _, _ = store_photo(
+                supabase, job.baby_id, data, job.filename,
+                job.photo_date, job.caption, user_id, optimized, original_sha256
+            )
+
+        except DuplicatePhotoError as e:
+            self._finish(job_id, state=JOB_DUPLICATE, message=duplicate_photo_message(e.photo), duplicate_of=e.photo)
+            return
+
+        except Exception as e:
+            if is_transient_error(e) and attempt < self.max_attempts:
+                delay = self.retry_base_seconds * 2 ** (attempt - 1)
+                delay += random.uniform(0, self.retry_base_seconds)
+                logger.warning(f"Upload of {job.filename} failed (attempt {attempt}), retrying in {delay:.1f}s: {e}")
+                self._update(
+                    job_id,
+                    state=JOB_QUEUED,
+                    message=f"🔁 Retrying in {delay:.0f}s (attempt {attempt + 1}/{self.max_attempts})"
+                )
+
+                timer = threading.Timer(delay, self._queue.put, args=(job_id,))
+                timer.daemon = True
+                timer.start()
+                return
+
+            logger.error(f"Upload of {job.filename} failed: {e}", exc_info=True)
+            self._finish(job_id, state=JOB_FAILED, message=friendly_upload_error(str(e)))
+            return
+
+        self._finish(job_id, state=JOB_DONE, message="✅ Uploaded", photo_id=photo_id)
+
+    def _finish(self, job_id: str, **changes) -> None:
+        with self._lock:
+            self._payloads.pop(job_id, None)
+        self._update(job_id, finished_at=time.time(), **changes)
+
+
+# Process-wide queue shared by all sessions
+upload_queue = UploadQueue(
+    workers=UPLOAD_QUEUE_WORKERS,
+    max_attempts=UPLOAD_MAX_ATTEMPTS,
+    retry_base_seconds=UPLOAD_RETRY_BASE_SECONDS,
+    retention_seconds=UPLOAD_JOB_RETENTION_SECONDS
+)
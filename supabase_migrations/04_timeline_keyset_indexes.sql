@@ -0,0 +1,21 @@
+-- ============================================================================
+-- Baby Timeline - Timeline Keyset Pagination Indexes
+-- Migration 04: Composite (baby_id, date, id) indexes
+-- ============================================================================
+-- The timeline is paginated with a keyset cursor of (date, id):
+--   WHERE baby_id = ? AND (date < d OR (date = d AND id < i))
+--   ORDER BY date DESC, id DESC LIMIT n
+--
+-- These indexes let Postgres answer each page with a single index range scan,
+-- so the cost of "Load more" stays constant however much history exists.
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_photos_baby_date_id
+  ON photos(baby_id, photo_date DESC, photo_id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_measurements_baby_date_id
+  ON measurements(baby_id, measurement_date DESC, measurement_id DESC);
+
+-- ============================================================================
+-- Migration Complete!
+-- ============================================================================
@@ -0,0 +1,50 @@
+-- ============================================================================
+-- Baby Timeline - Photo Storage Paths
+-- Migration 05: Store object paths instead of long-lived signed URLs
+-- ============================================================================
+-- Photos used to store a 10-year signed URL in file_url. The app now stores
+-- the object path in storage_path and mints short-lived (1 hour) signed URLs
+-- when a page is displayed, so leaked links expire quickly and no mass URL
+-- refresh is ever needed.
+--
+-- Derivative paths already live in exif_data->'derivatives'->*->'path'.
+-- file_url/thumbnail_url are kept (nullable) for rows that predate this.
+-- ============================================================================
+
+ALTER TABLE photos ADD COLUMN IF NOT EXISTS storage_path TEXT;
+
+-- Backfill from existing URLs:
+--   .../storage/v1/object/sign/baby-photos/<path>?token=...
+--   .../storage/v1/object/public/baby-photos/<path>
+UPDATE photos
+SET storage_path = substring(file_url FROM '/baby-photos/([^?]+)')
+WHERE storage_path IS NULL
+  AND file_url IS NOT NULL;
+
+ALTER TABLE photos ALTER COLUMN file_url DROP NOT NULL;
+
+-- Every photo must point at a stored object one way or the other
+ALTER TABLE photos ADD CONSTRAINT check_photo_location
+  CHECK (storage_path IS NOT NULL OR file_url IS NOT NULL);
+
+-- ============================================================================
+-- Storage policy: let share-link viewers sign URLs
+-- ============================================================================
+-- Signing a URL requires SELECT on storage.objects. Viewers are anonymous,
+-- so allow reads of objects under a baby folder (<baby_id>/...) that has an
+-- active share link - the same rule as "Shared access photos" above.
+
+CREATE POLICY "Shared read photos" ON storage.objects
+  FOR SELECT
+  USING (
+    bucket_id = 'baby-photos'
+    AND (storage.foldername(name))[1] IN (
+      SELECT baby_id::text FROM share_links
+      WHERE is_active = true
+      AND (expires_at IS NULL OR expires_at > now())
+    )
+  );
+
+-- ============================================================================
+-- Migration Complete!
+-- ============================================================================
@@ -0,0 +1,69 @@
+-- ============================================================================
+-- Baby Timeline - Growth Statistics Function
+-- Migration 06: Aggregate measurement stats in the database
+-- ============================================================================
+-- get_growth_statistics() used to download every measurement row (notes
+-- included) to compute a handful of numbers in Python. This function returns
+-- them as one small row, so dashboard stats cost the same however long the
+-- history is.
+--
+-- Called via: supabase.rpc("get_growth_statistics", {"p_baby_id": ...})
+--
+-- SECURITY INVOKER: runs with the caller's permissions, so the RLS policies
+-- on measurements still decide which babies a caller can see.
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION get_growth_statistics(p_baby_id UUID)
+RETURNS TABLE (
+  total_measurements BIGINT,
+  first_measurement_date DATE,
+  latest_measurement_date DATE,
+  weight_change_kg NUMERIC,
+  height_change_cm NUMERIC,
+  avg_weight_kg NUMERIC,
+  avg_height_cm NUMERIC
+)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+AS $$
+  WITH first_row AS (
+    SELECT measurement_date, weight_kg, height_cm
+    FROM measurements
+    WHERE baby_id = p_baby_id
+    ORDER BY measurement_date ASC, measurement_id ASC
+    LIMIT 1
+  ),
+  latest_row AS (
+    SELECT measurement_date, weight_kg, height_cm
+    FROM measurements
+    WHERE baby_id = p_baby_id
+    ORDER BY measurement_date DESC, measurement_id DESC
+    LIMIT 1
+  ),
+  totals AS (
+    SELECT count(*) AS total, avg(weight_kg) AS avg_weight, avg(height_cm) AS avg_height
+    FROM measurements
+    WHERE baby_id = p_baby_id
+  )
+  SELECT
+    totals.total,
+    first_row.measurement_date,
+    latest_row.measurement_date,
+    latest_row.weight_kg - first_row.weight_kg,
+    latest_row.height_cm - first_row.height_cm,
+    totals.avg_weight,
+    totals.avg_height
+  FROM totals
+  LEFT JOIN first_row ON true
+  LEFT JOIN latest_row ON true;
+$$;
+
+GRANT EXECUTE ON FUNCTION get_growth_statistics(UUID) TO anon, authenticated;
+
+-- Example:
+-- SELECT * FROM get_growth_statistics('uuid-here');
+
+-- ============================================================================
+-- Migration Complete!
+-- ============================================================================
@@ -0,0 +1,53 @@
+-- ============================================================================
+-- Baby Timeline - Timeline Month Index Function
+-- Migration 07: Per-month item counts for jump-to-date navigation
+-- ============================================================================
+-- The timeline month picker needs to know which months have photos or
+-- measurements, and how many. This function groups both tables by month in
+-- the database, so the app receives one small row per month instead of
+-- every item date.
+--
+-- Called via: supabase.rpc("get_timeline_month_index", {"p_baby_id": ...})
+--
+-- SECURITY INVOKER: runs with the caller's permissions, so the RLS policies
+-- on photos and measurements still decide which babies a caller can see.
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION get_timeline_month_index(p_baby_id UUID)
+RETURNS TABLE (
+  year INT,
+  month INT,
+  photo_count BIGINT,
+  measurement_count BIGINT
+)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+AS $$
+  WITH items AS (
+    SELECT photo_date AS item_date, true AS is_photo
+    FROM photos
+    WHERE baby_id = p_baby_id
+    UNION ALL
+    SELECT measurement_date, false
+    FROM measurements
+    WHERE baby_id = p_baby_id
+  )
+  SELECT
+    EXTRACT(YEAR FROM item_date)::INT,
+    EXTRACT(MONTH FROM item_date)::INT,
+    count(*) FILTER (WHERE is_photo),
+    count(*) FILTER (WHERE NOT is_photo)
+  FROM items
+  GROUP BY 1, 2
+  ORDER BY 1, 2;
+$$;
+
+GRANT EXECUTE ON FUNCTION get_timeline_month_index(UUID) TO anon, authenticated;
+
+-- Example:
+-- SELECT * FROM get_timeline_month_index('uuid-here');
+
+-- ============================================================================
+-- Migration Complete!
+-- ============================================================================
@@ -0,0 +1,30 @@
+-- ============================================================================
+-- Baby Timeline - Photo Content Hashes
+-- Migration 08: Detect duplicate uploads by content
+-- ============================================================================
+-- Uploading the same phone photo twice used to store a second optimized copy
+-- under a new timestamped path. The app now records two SHA-256 hashes:
+--
+--   original_sha256  - hash of the bytes as uploaded (checked before any
+--                      optimization or upload work is done)
+--   optimized_sha256 - hash of the optimized JPEG (catches re-exports of the
+--                      same picture whose metadata, and so original bytes,
+--                      differ)
+--
+-- Rows uploaded before this migration keep NULL hashes; NULLs never collide
+-- in a unique index, so they are simply not deduplicated.
+-- ============================================================================
+
+ALTER TABLE photos ADD COLUMN IF NOT EXISTS original_sha256 TEXT;
+ALTER TABLE photos ADD COLUMN IF NOT EXISTS optimized_sha256 TEXT;
+
+-- One copy of an upload per baby (also closes the race between two tabs)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_photos_baby_original_sha256
+  ON photos(baby_id, original_sha256);
+
+CREATE INDEX IF NOT EXISTS idx_photos_baby_optimized_sha256
+  ON photos(baby_id, optimized_sha256);
+
+-- ============================================================================
+-- Migration Complete!
+-- ============================================================================
@@ -0,0 +1,18 @@
+-- ============================================================================
+-- Baby Timeline - Photo Perceptual Hash
+-- Migration 09: Find near-duplicate photos (burst shots)
+-- ============================================================================
+-- perceptual_hash holds a 64-bit difference hash (dHash) of the optimized
+-- photo as 16 hex characters. Similar pictures have hashes that differ in
+-- only a few bits; the app loads a baby's hashes once into an in-memory
+-- BK-tree and searches it by Hamming distance, so no index is needed here.
+--
+-- Older photos get a hash when an admin runs "Index older photos" on the
+-- Duplicates page.
+-- ============================================================================
+
+ALTER TABLE photos ADD COLUMN IF NOT EXISTS perceptual_hash TEXT;
+
+-- ============================================================================
+-- Migration Complete!
+-- ============================================================================
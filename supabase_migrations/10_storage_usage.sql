@@ -0,0 +1,103 @@
+-- ============================================================================
+-- Baby Timeline - Exact Storage Usage
+-- Migration 10: Per-baby running totals of stored bytes
+-- ============================================================================
+-- The Upload page used to estimate storage as photo count x 1 MB, which was
+-- off by 2-3x. Now:
+--
+--   photos.byte_size    - bytes stored for the photo: optimized JPEG plus
+--                         every derivative (NULL for photos uploaded before
+--                         this migration until reconcile_storage_usage.py
+--                         has measured them)
+--   baby_storage_usage  - one row per baby with running totals, kept up to
+--                         date by a trigger on photos, so reading usage is a
+--                         single primary-key lookup
+--
+-- Drift (e.g. files removed by hand in the dashboard) is corrected by
+-- running: python reconcile_storage_usage.py
+-- ============================================================================
+
+ALTER TABLE photos ADD COLUMN IF NOT EXISTS byte_size BIGINT;
+
+CREATE TABLE IF NOT EXISTS baby_storage_usage (
+  baby_id UUID PRIMARY KEY REFERENCES babies(baby_id) ON DELETE CASCADE,
+  photo_count BIGINT NOT NULL DEFAULT 0,
+  total_bytes BIGINT NOT NULL DEFAULT 0,
+  unsized_photo_count BIGINT NOT NULL DEFAULT 0,  -- Photos with byte_size NULL
+  updated_at TIMESTAMPTZ DEFAULT now()
+);
+
+-- ============================================================================
+-- Trigger: apply each photo insert / delete / resize to the totals
+-- ============================================================================
+-- SECURITY DEFINER: callers have no write policy on baby_storage_usage.
+-- Deletes and updates only UPDATE the row, so cascading deletes of a baby
+-- (which also removes its usage row) never try to re-create it.
+
+CREATE OR REPLACE FUNCTION apply_photo_storage_usage()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO baby_storage_usage (baby_id, photo_count, total_bytes, unsized_photo_count)
+    VALUES (NEW.baby_id, 1, COALESCE(NEW.byte_size, 0), (NEW.byte_size IS NULL)::INT)
+    ON CONFLICT (baby_id) DO UPDATE SET
+      photo_count = baby_storage_usage.photo_count + 1,
+      total_bytes = baby_storage_usage.total_bytes + EXCLUDED.total_bytes,
+      unsized_photo_count = baby_storage_usage.unsized_photo_count + EXCLUDED.unsized_photo_count,
+      updated_at = now();
+    RETURN NEW;
+
+  ELSIF TG_OP = 'DELETE' THEN
+    UPDATE baby_storage_usage SET
+      photo_count = photo_count - 1,
+      total_bytes = total_bytes - COALESCE(OLD.byte_size, 0),
+      unsized_photo_count = unsized_photo_count - (OLD.byte_size IS NULL)::INT,
+      updated_at = now()
+    WHERE baby_id = OLD.baby_id;
+    RETURN OLD;
+
+  ELSE
+    UPDATE baby_storage_usage SET
+      total_bytes = total_bytes - COALESCE(OLD.byte_size, 0) + COALESCE(NEW.byte_size, 0),
+      unsized_photo_count = unsized_photo_count
+        - (OLD.byte_size IS NULL)::INT + (NEW.byte_size IS NULL)::INT,
+      updated_at = now()
+    WHERE baby_id = NEW.baby_id;
+    RETURN NEW;
+  END IF;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS photos_storage_usage ON photos;
+CREATE TRIGGER photos_storage_usage
+  AFTER INSERT OR DELETE OR UPDATE OF byte_size ON photos
+  FOR EACH ROW EXECUTE FUNCTION apply_photo_storage_usage();
+
+-- Totals for photos that already exist
+INSERT INTO baby_storage_usage (baby_id, photo_count, total_bytes, unsized_photo_count)
+SELECT baby_id, count(*), COALESCE(sum(byte_size), 0), count(*) FILTER (WHERE byte_size IS NULL)
+FROM photos
+GROUP BY baby_id
+ON CONFLICT (baby_id) DO NOTHING;
+
+-- ============================================================================
+-- RLS: same readers as the photos themselves, no direct writes
+-- ============================================================================
+
+ALTER TABLE baby_storage_usage ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Admins read storage usage" ON baby_storage_usage
+  FOR SELECT
+  USING (
+    baby_id IN (
+      SELECT baby_id FROM babies WHERE created_by = auth.uid()
+    )
+  );
+
+-- ============================================================================
+-- Migration Complete!
+-- ============================================================================
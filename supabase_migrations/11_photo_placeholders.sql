@@ -0,0 +1,17 @@
+-- ============================================================================
+-- Baby Timeline - Photo Placeholders
+-- Migration 11: Inline low-quality image placeholders (LQIP)
+-- ============================================================================
+-- placeholder holds a 16px-wide JPEG of the photo as a data URI (a few
+-- hundred bytes). The timeline selects it with the card columns and paints
+-- it, blurred, in the first render; the real image replaces it once it has
+-- downloaded, so cards never sit empty on slow connections.
+--
+-- Photos uploaded before this migration keep NULL and render as before.
+-- ============================================================================
+
+ALTER TABLE photos ADD COLUMN IF NOT EXISTS placeholder TEXT;
+
+-- ============================================================================
+-- Migration Complete!
+-- ============================================================================